@@ -1,35 +1,93 @@
-from flask import Flask, render_template, request, session, redirect, url_for, flash
+from flask import Flask, render_template, request, session, redirect, url_for, flash, jsonify
+import functools
 import json # For pretty printing in placeholders
 import os
-from werkzeug.utils import secure_filename
-import pytesseract
-from PIL import Image
+import time
+import threading
 
 app = Flask(__name__)
 app.secret_key = 'super secret key' # Important for session management
-
-# Configure Upload Folder
-UPLOAD_FOLDER = 'uploads'
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+# Queued OCR jobs keep the uploaded bytes in memory until they run, so one request may not carry more than this
+MAX_UPLOAD_MEGABYTES = 32
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_MEGABYTES * 1024 * 1024
 
 # Import your existing analysis and prediction functions
 # Assuming they are in roulette_analyzer/src/
 import sys
-sys.path.append('src') # Add src to path to find modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')) # Add src to path to find modules
 # from input_handler import validate_and_parse_input # We'll need a web-specific parser
 # For now, direct import from analysis_engine and prediction_engine, assuming they are in src
 from analysis_engine import (
-    calculate_frequencies, identify_trends, detect_patterns,
-    detect_biases, analyze_wheel_clusters, WHEEL_ORDER, ROULETTE_WHEEL
+    identify_trends, detect_biases, analyze_wheel_clusters,
+    SpinStatsAccumulator, WHEEL_ORDER, ROULETTE_WHEEL
 )
-from prediction_engine import generate_predictions
-from src.database_manager import init_db, add_multiple_spin_results, get_total_spins_count # DB functions
-from src.train_models import train_predict_next_dozen_model # For triggering training
-
-# Initialize DB (creates table if it doesn't exist)
-init_db()
+from streak_engine import StreakState
+from range_index import recent_window_table, DEFAULT_WINDOW_SIZES
+from history_merge import merge_new_spins
+from src.database_manager import init_db, add_multiple_spin_results, get_total_spins_count, get_database_frequencies # DB functions
+from src.database_manager import ( # Server-side session history store
+    create_history_session, history_session_exists, append_session_spins, get_session_spins,
+    get_session_info, delete_history_session, evict_idle_sessions
+)
+from src.training_jobs import TrainingJobManager
+from src.ocr_jobs import OcrJobManager, OcrQueueFull, RETRY_AFTER_SECONDS
+from src.lazy_loader import LazyModule
+
+# Heavy subsystems are imported on first use, so a cold start (and a plain
+# GET /) does not pay for OCR, scikit-learn or unpickling models.
+# benchmarks/startup.py checks the import time and first-request latency.
+ocr_pipeline = LazyModule('src.ocr_pipeline') # OCR (Pillow, pytesseract)
+prediction_engine = LazyModule('prediction_engine') # ML inference (joblib, trained models)
+train_models = LazyModule('src.train_models') # Training (scikit-learn)
+
+# Load trained models into prediction_engine's cache in the background once the
+# first request came in, so the first /analyze request does not pay for loading them
+PRELOAD_MODELS_AT_STARTUP = True
+_app_initialized = False
+_app_initialization_lock = threading.Lock()
+
+@app.before_request
+def initialize_app():
+    """Creates the database tables (if needed) before the first request is handled."""
+    global _app_initialized
+    if _app_initialized:
+        return
+    with _app_initialization_lock:
+        if _app_initialized:
+            return
+        init_db() # Creates tables if they don't exist
+        if PRELOAD_MODELS_AT_STARTUP:
+            # Importing prediction_engine happens in the thread as well, off the request path
+            threading.Thread(target=lambda: prediction_engine.preload_models(background=False),
+                             name="model-preload", daemon=True).start()
+        _app_initialized = True
+
+# The session cookie only holds a history id; the spins themselves live in the database
+HISTORY_DISPLAY_SPINS = 50 # Number of recent spins shown on the page
+SESSION_IDLE_TIMEOUT_SECONDS = 24 * 60 * 60 # Histories unused for this long are deleted
+SESSION_EVICTION_INTERVAL_SECONDS = 10 * 60 # How often to look for idle histories
+_last_eviction_time = 0.0
+
+def get_history_session_id(create: bool = True) -> str:
+    """
+    Returns the server-side history id of the current browser session.
+    Creates a new, empty history if the session has none (or its history was
+    evicted) and create is True; otherwise returns None in that case.
+    """
+    global _last_eviction_time
+    now = time.time()
+    if now - _last_eviction_time > SESSION_EVICTION_INTERVAL_SECONDS:
+        _last_eviction_time = now
+        evict_idle_sessions(SESSION_IDLE_TIMEOUT_SECONDS)
+
+    history_id = session.get('history_id')
+    if history_id and history_session_exists(history_id):
+        return history_id
+    if not create:
+        return None
+    history_id = create_history_session()
+    session['history_id'] = history_id
+    return history_id
 
 def parse_web_input(input_string: str) -> tuple[list[int], list[str]]:
     """
@@ -80,113 +138,126 @@ def parse_web_input(input_string: str) -> tuple[list[int], list[str]]:
     return valid_numbers, messages
 
 
-# Helper function to parse numbers from OCR text
-def parse_numbers_from_ocr_text(text: str) -> str:
-    # This is a very basic parser. It will need significant improvement
-    # based on typical OCR output for roulette screenshots.
-    # It looks for sequences of digits, possibly separated by common delimiters.
-    import re
-    # Remove anything that's not a digit or a common delimiter (space, comma, newline, semicolon)
-    # This is a very naive first pass.
-    cleaned_text = re.sub(r'[^0-9\s,;\n]', '', text)
-    # Find sequences of 1 or 2 digits. Using \b for word boundaries might be too restrictive if numbers are close.
-    # Instead, split by common delimiters then validate.
-    potential_numbers = re.split(r'[\s,;\n]+', cleaned_text)
-
-    valid_roulette_numbers = []
-    for num_str in potential_numbers:
-        if num_str.isdigit(): # Check if it's purely digits after split
-            try:
-                num = int(num_str)
-                if 0 <= num <= 36:
-                    valid_roulette_numbers.append(str(num))
-            except ValueError:
-                continue
+# Re-uploaded screenshots are answered from an LRU cache of OCR results keyed by
+# their decoded pixels (stored next to the database, see src/ocr_cache.py)
+OCR_CACHE_ENABLED = True
 
-    return ", ".join(valid_roulette_numbers) # Return as a comma-separated string
+# Uploads are OCRed as background jobs on ocr_job_manager; the page polls /ocr_jobs/<job_id>.
+# At most DEFAULT_MAX_PENDING jobs wait at a time, further uploads get a 503.
+ocr_job_manager = OcrJobManager()
+
+def ocr_uploaded_images(filenames: list[str], images: list[bytes]) -> dict:
+    """
+    OCRs uploaded screenshots (run as an OCR job). Decoding, the cache's pixel
+    hash, preprocessing and Tesseract run in the OCR worker processes; the job
+    thread only hashes the uploaded bytes to find identical files in the cache.
 
+    Returns:
+        A dictionary with the merged "numbers" (in upload order), a per-image
+        summary in "images" (numbers, confidence, timings or error), the
+        total "elapsed_ms" and "messages", a list of [category, text] pairs
+        to show on the page.
+    """
+    start_time = time.perf_counter()
+    results = ocr_pipeline.ocr_images(images, cache=ocr_pipeline.get_ocr_cache() if OCR_CACHE_ENABLED else None,
+                                      in_worker_processes=True)
+    elapsed_ms = round((time.perf_counter() - start_time) * 1000, 2)
+
+    extracted_numbers = ocr_pipeline.merge_batch_numbers(results)
+    images_summary, messages = [], []
+    tesseract_missing = any(result.get("tesseract_missing") for result in results)
+    if tesseract_missing:
+        messages.append(["error", "OCR Error: Tesseract OCR engine is not installed or not found in PATH. Please install Tesseract to use this feature (see README for details)."])
+    for filename, result in zip(filenames, results):
+        summary = {"filename": filename, "error": result.get("error")}
+        if "error" not in result:
+            summary.update(numbers=result["numbers"], confidence=result["confidence"], timings=result["timings"],
+                           cached=result.get("cached", False))
+            print(f"OCR of {filename}: {len(result['numbers'])} numbers, confidence {result['confidence']}, timings (ms): {result['timings']}")
+            if len(filenames) > 1:
+                messages.append(["info", f"{filename}: {len(result['numbers'])} number(s), confidence {result['confidence']}, "
+                                         f"{result['timings']['total']:.0f} ms"])
+        elif not result.get("tesseract_missing"):
+            messages.append(["error", f"An error occurred processing the image file {filename}: {result['error']}"])
+        images_summary.append(summary)
+    print(f"OCR of {len(filenames)} image(s) took {elapsed_ms} ms")
+
+    if extracted_numbers:
+        messages.append(["info", "Numbers extracted via OCR and filled in above. Please review and click 'Analyze Results' if correct."])
+    elif not any(summary["error"] for summary in images_summary):
+        messages.append(["warning", "OCR did not find any recognizable roulette numbers (0-36) in the image. Please try manual input or a clearer image."])
+    return {"numbers": extracted_numbers, "images": images_summary, "elapsed_ms": elapsed_ms, "messages": messages}
 
 @app.route('/ocr_upload', methods=['POST'])
 def ocr_upload_route():
-    # flash("Debug: Testing flash message directly from ocr_upload_route.", "debug") # DEBUG FLASH - REMOVING THIS FOR ACTUAL TEST
-    if 'screenshot_image' not in request.files:
+    # Several screenshots can be uploaded at once; their numbers are merged in upload order, dropping the spins where consecutive screenshots overlap.
+    # The upload returns at once: the page (or, with ?format=json, the client) polls the OCR job.
+    files = [f for f in request.files.getlist('screenshot_images') + request.files.getlist('screenshot_image') if f.filename]
+    wants_json = request.args.get('format') == 'json'
+    if not files:
+        if wants_json:
+            return jsonify({"error": "No image file selected for upload."}), 400
         flash('No image file selected for upload.', 'error')
         return redirect(url_for('home'))
 
-    file = request.files['screenshot_image']
-    if file.filename == '':
-        flash('No image file selected for upload.', 'error')
+    filenames = [f.filename for f in files]
+    images = [f.read() for f in files] # Decoded from memory; nothing is written to disk
+    try:
+        job = ocr_job_manager.submit(filenames, images, functools.partial(ocr_uploaded_images, filenames))
+    except OcrQueueFull as e:
+        if wants_json:
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(RETRY_AFTER_SECONDS)}
+        flash(f"OCR is busy: {e}", 'warning')
         return redirect(url_for('home'))
 
-    if file: # Basic check if file exists
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        try:
-            file.save(filepath) # File is saved, but not processed by PIL for these tests
-
-            file.save(filepath)
-
-            # OCR Processing
-            img = Image.open(filepath) # Restored
-            img = img.convert('L') # Convert to grayscale # Restored
-
-            # --- OCR-dependent part ---
-            try:
-                ocr_text = pytesseract.image_to_string(img) # Restored
-                extracted_numbers_str = parse_numbers_from_ocr_text(ocr_text)
-
-                if extracted_numbers_str:
-                    flash(f"Numbers extracted via OCR. Please review and click 'Analyze Results' if correct. Extracted: {extracted_numbers_str}", 'info')
-                    session['ocr_extracted_numbers'] = extracted_numbers_str
-                else:
-                    flash("OCR did not find any recognizable roulette numbers (0-36) in the image. Please try manual input or a clearer image.", 'warning')
-                    session.pop('ocr_extracted_numbers', None)
-
-            except pytesseract.TesseractNotFoundError: # Restored this specific exception
-                flash("OCR Error: Tesseract OCR engine is not installed or not found in PATH. Please install Tesseract to use this feature (see README for details).", 'error')
-                session.pop('ocr_extracted_numbers', None)
-            except Exception as e_ocr:
-                flash(f"An error occurred during OCR processing: {str(e_ocr)}", 'error') # General OCR error
-                session.pop('ocr_extracted_numbers', None)
-            # --- End of OCR-dependent part ---
-
-        except Exception as e_file: # For file saving or Image.open errors
-            flash(f"An error occurred processing the image file: {str(e_file)}", 'error')
-            session.pop('ocr_extracted_numbers', None)
-        finally:
-            if os.path.exists(filepath):
-                try:
-                    os.remove(filepath)
-                except Exception as e_remove:
-                    print(f"Error removing uploaded file {filepath}: {e_remove}") # Log this error
-    else:
-        flash('Invalid file or file type for upload.', 'error') # Should be caught by browser accept ideally
+    if wants_json:
+        return jsonify({"job_id": job.job_id, "status_url": url_for('ocr_job_status_route', job_id=job.job_id)}), 202
+    session['ocr_job_id'] = job.job_id
+    flash("Screenshot(s) uploaded. OCR is running in the background; the extracted numbers will be filled in above.", 'info')
+    return redirect(url_for('home'))
 
+@app.errorhandler(413)
+def upload_too_large(e):
+    message = f"The upload is too large (at most {MAX_UPLOAD_MEGABYTES} MB per request). Please upload fewer or smaller screenshots."
+    if request.args.get('format') == 'json':
+        return jsonify({"error": message}), 413
+    flash(message, 'error')
     return redirect(url_for('home'))
 
+@app.route('/ocr_jobs/<job_id>', methods=['GET'])
+def ocr_job_status_route(job_id):
+    job = ocr_job_manager.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown OCR job."}), 404
+    return jsonify(job.to_dict())
+
 
 @app.route('/')
 def home():
-    session.setdefault('roulette_numbers_history', [])
-    history_display = ", ".join(map(str, session.get('roulette_numbers_history', [])[-50:]))
+    history_id = get_history_session_id(create=False)
+    recent_spins = get_session_spins(history_id, last_n=HISTORY_DISPLAY_SPINS) if history_id else []
+    history_display = ", ".join(map(str, recent_spins))
 
-    # Get OCR extracted numbers if available and then clear from session
-    ocr_prefill_numbers = session.pop('ocr_extracted_numbers', '') # Pop to use it once
+    ocr_job_id = session.pop('ocr_job_id', None) # OCR still running; the page polls it and fills in the numbers
 
     # Get any flashed parsing messages (e.g. from previous direct POST to /analyze if it were to redirect)
     # Note: flash messages are typically handled by get_flashed_messages in template directly.
     # This specific session.pop for 'parsing_messages' was from an earlier design idea.
-    # For OCR prefill, 'ocr_prefill_numbers' is now the primary mechanism.
+    # OCR results are filled into the input by the page itself, from the polled OCR job.
     # Parsing messages from manual input are handled within the /analyze POST itself.
     # Flashed messages from /ocr_upload will be handled by Jinja's get_flashed_messages.
-    total_db_spins = get_total_spins_count()
+    # Database-wide frequencies come from the aggregate table in O(37), however many spins are stored
+    db_frequencies = get_database_frequencies()
+    total_db_spins = db_frequencies["total_spins"]
+    db_trends = identify_trends(db_frequencies, total_db_spins) if total_db_spins else None
 
     return render_template('index.html',
                            results_available=False,
                            numbers_history_display=history_display,
                            color_map=ROULETTE_WHEEL,
-                           ocr_prefill_numbers=ocr_prefill_numbers,
-                           total_db_spins=total_db_spins) # Pass this to template
+                           ocr_job_id=ocr_job_id,
+                           total_db_spins=total_db_spins, # Pass this to template
+                           db_trends=db_trends)
 
 @app.route('/analyze', methods=['POST'])
 def analyze_results():
@@ -194,13 +265,13 @@ def analyze_results():
 
     numbers_from_input, parsing_messages = parse_web_input(user_input_string)
 
-    current_history = session.get('roulette_numbers_history', [])
-
     if not numbers_from_input:
         # If no valid numbers were parsed, re-render home with messages
         # Store parsing messages in session to display after redirect or on current render
         # session['parsing_messages'] = parsing_messages # If redirecting
-        history_display = ", ".join(map(str, current_history[-50:]))
+        history_id = get_history_session_id(create=False)
+        recent_spins = get_session_spins(history_id, last_n=HISTORY_DISPLAY_SPINS) if history_id else []
+        history_display = ", ".join(map(str, recent_spins))
         return render_template('index.html',
                                error_message="No valid numbers were processed from your input.",
                                parsing_messages=parsing_messages, # show why
@@ -209,30 +280,64 @@ def analyze_results():
                                color_map=ROULETTE_WHEEL,
                                total_db_spins=get_total_spins_count()) # Added color_map and total_db_spins
 
-    # Add valid numbers from this input to the persistent database
+    history_id = get_history_session_id()
+    session_info = get_session_info(history_id) or {}
+    stored_spins = session_info.get('spin_count', 0)
+    # Only the tail is read: enough for the overlap merge, the windows table, the display and the ML features
+    recent_history = get_session_spins(history_id, last_n=max(max(DEFAULT_WINDOW_SIZES), len(numbers_from_input),
+                                                                prediction_engine.FEATURE_WINDOW_SIZE, HISTORY_DISPLAY_SPINS))
+
+    # Consecutive screenshots of a history board overlap: skip the input's leading spins that
+    # repeat the end of the stored history, unless the user asked to keep every number
+    numbers_entered = len(numbers_from_input)
+    skipped_spins = 0
+    if not request.form.get('keep_repeated_input'):
+        numbers_from_input, skipped_spins = merge_new_spins(recent_history, numbers_from_input)
+        if skipped_spins:
+            parsing_messages.append(f"Skipped {skipped_spins} number(s) at the start of your input that repeat the end of your "
+                                    f"history (e.g. from an overlapping screenshot).")
+
+    # Add the new numbers from this input to the persistent database
     if numbers_from_input:
         add_multiple_spin_results(numbers_from_input)
 
-    # Update session history
-    current_history.extend(numbers_from_input)
-    session['roulette_numbers_history'] = current_history # current_history now includes numbers_from_input
-    session.modified = True
-
-    updated_history_display = ", ".join(map(str, current_history[-50:])) # Display last 50 from session
+    # Restore the running frequency counts and streaks; rebuild them from the full history
+    # (the only full read) if they no longer match it
+    analysis_state = session_info.get('analysis_state') or {}
+    spin_stats = SpinStatsAccumulator.from_state(analysis_state['spin_stats']) if 'spin_stats' in analysis_state else None
+    streaks = StreakState.from_state(analysis_state['streaks']) if 'streaks' in analysis_state else None
+    if spin_stats is None or spin_stats.total_spins != stored_spins or streaks is None or streaks.total_spins != stored_spins:
+        full_history = get_session_spins(history_id)
+        if spin_stats is None or spin_stats.total_spins != stored_spins:
+            spin_stats = SpinStatsAccumulator(full_history)
+        if streaks is None or streaks.total_spins != stored_spins:
+            streaks = StreakState(full_history)
+
+    # Update the server-side history (append-only) together with the analysis state
+    recent_history.extend(numbers_from_input)
+    spin_stats.extend(numbers_from_input)
+    streaks.update(numbers_from_input)
+    append_session_spins(history_id, numbers_from_input,
+                         {'spin_stats': spin_stats.to_state(), 'streaks': streaks.to_state()})
+
+    updated_history_display = ", ".join(map(str, recent_history[-HISTORY_DISPLAY_SPINS:])) # Display last 50 spins
 
     # --- Call Analysis Functions ---
     analysis_results_dict = {}
-    total_spins = len(current_history)
+    total_spins = stored_spins + len(numbers_from_input)
     general_error_message = None # For errors during analysis phase
 
     try:
-        frequencies = calculate_frequencies(current_history)
+        frequencies = spin_stats.frequencies()
         analysis_results_dict['frequencies'] = frequencies
 
+        # Category counts over the last 50/200/1000 spins next to the full history, from just those spins
+        analysis_results_dict['windows'] = recent_window_table(recent_history[-max(DEFAULT_WINDOW_SIZES):], frequencies)
+
         trends = identify_trends(frequencies, total_spins)
         analysis_results_dict['trends'] = trends
 
-        patterns = detect_patterns(current_history, frequencies)
+        patterns = streaks.to_patterns() # Same result as detect_patterns(full history, frequencies)
         analysis_results_dict['patterns'] = patterns
 
         number_deviations = trends.get('number_deviations', {})
@@ -242,7 +347,7 @@ def analyze_results():
         clusters = analyze_wheel_clusters(frequencies, total_spins, WHEEL_ORDER)
         analysis_results_dict['clusters'] = clusters
 
-        predictions_output = generate_predictions(analysis_results_dict, current_history)
+        predictions_output = prediction_engine.generate_predictions(analysis_results_dict, recent_history) # Models only read the last spins
 
     except Exception as e:
         print(f"Error during analysis: {str(e)}") # Log error
@@ -253,7 +358,9 @@ def analyze_results():
 
 
     # Prepare success message, including count of numbers processed
-    success_message = f"Successfully processed {len(numbers_from_input)} number(s) from your input."
+    success_message = f"Successfully processed {numbers_entered} number(s) from your input."
+    if skipped_spins:
+        success_message += f" {len(numbers_from_input)} new, {skipped_spins} already in your history."
     if general_error_message: # If analysis error, parsing messages might be less relevant than the analysis error
         parsing_messages = [general_error_message] # Prioritize general_error_message
         success_message = None # No success if analysis failed
@@ -271,42 +378,67 @@ def analyze_results():
 
 @app.route('/reset', methods=['POST'])
 def reset_session():
-    # Clear the specific session variable for roulette numbers history
-    session.pop('roulette_numbers_history', None)
-    # session['roulette_numbers_history'] = [] # Alternative
-    # session.modified = True
+    # Drop this session's server-side history; a new one is created on the next analysis
+    history_id = session.pop('history_id', None)
+    if history_id:
+        delete_history_session(history_id)
 
     flash('Session cleared. You can start a new analysis with fresh numbers.', 'info')
 
     # Redirect back to the home page
     return redirect(url_for('home'))
 
-if __name__ == '__main__':
-    app.run(debug=True)
+# --- Background model training ---
+# Training runs on training_manager's worker threads; the page polls /training_jobs/<job_id>.
+def train_all_models_incrementally(progress=None) -> dict:
+    """
+    Dozen, column, section and number models, fitted in parallel from one feature matrix.
+    Incremental: only spins stored since the last training are learned, with periodic full refits.
+    Returns {model: trained}, so the job reports which models could not be trained.
+    """
+    return train_models.train_all_models(progress=progress, incremental=True)
 
+TRAINING_FUNCTIONS = {
+    "all models": train_all_models_incrementally,
+}
+training_manager = TrainingJobManager()
 
 @app.route('/train_ml_models', methods=['POST'])
 def trigger_model_training_route():
-    flash("AI/ML model training started. This might take a few moments...", "info")
-
+    job_ids = []
     try:
-        # For now, only the dozen model training is called.
-        # This function is expected to print its own logs to the console.
-        # It returns True on success, False on failure/issues.
-        if train_predict_next_dozen_model():
-            flash("AI/ML Training Process (Next Dozen Model) Completed. Check server logs for details of accuracy and other metrics.", "success")
-        else:
-            flash("AI/ML Training Process (Next Dozen Model) may have encountered issues, had insufficient data, or the model performance was very low. Check server logs.", "warning")
-
-        # TODO: When other models (column, section, number) are created, add their training calls here:
-        # if train_predict_next_column_model():
-        #     flash("Column Model training completed.", "success")
-        # else:
-        #     flash("Column Model training failed or had issues.", "warning")
-        # ... and so on for other models.
-
+        for model_name, train_function in TRAINING_FUNCTIONS.items():
+            job, started = training_manager.submit(model_name, train_function)
+            job_ids.append(job.job_id)
+            if started:
+                flash(f"AI/ML model training ({model_name}) started in the background. Progress is shown below.", "info")
+            else:
+                flash(f"AI/ML model training ({model_name}) is already running. Progress is shown below.", "info")
     except Exception as e:
         flash(f"An unexpected error occurred during the training process trigger: {str(e)}", "error")
         print(f"Error during trigger_model_training_route: {e}") # Log to server console
 
+    session['training_job_ids'] = job_ids
     return redirect(url_for('home'))
+
+@app.route('/training_jobs', methods=['GET'])
+def list_training_jobs_route():
+    return jsonify([job.to_dict() for job in training_manager.list_jobs()])
+
+@app.route('/training_jobs/<job_id>', methods=['GET'])
+def training_job_status_route(job_id):
+    job = training_manager.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown training job."}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/training_jobs/<job_id>/cancel', methods=['POST'])
+def cancel_training_job_route(job_id):
+    if training_manager.get_job(job_id) is None:
+        return jsonify({"error": "Unknown training job."}), 404
+    cancelled = training_manager.cancel(job_id)
+    return jsonify({"cancel_requested": cancelled, "job": training_manager.get_job(job_id).to_dict()})
+
+
+if __name__ == '__main__':
+    app.run(debug=True)
@@ -0,0 +1,88 @@
+# Benchmark: concurrent readers and writers against database_manager.
+#
+# Compares the persistent per-thread WAL connections of database_manager with
+# the previous approach of opening a fresh connection (default rollback
+# journal) for every call. Readers do what a page load does (total spin count
+# plus the last 50 session spins); writers append spins like /analyze.
+#
+# Usage (from the roulette_analyzer directory):
+#     python benchmarks/db_concurrency.py [--readers 8] [--writers 2] [--seconds 3]
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src import database_manager
+
+
+def _connect_per_call() -> sqlite3.Connection:
+    """The old behaviour: a new, unconfigured connection for every operation."""
+    return sqlite3.connect(database_manager.DATABASE_NAME)
+
+
+def run_workload(readers: int, writers: int, seconds: float) -> dict:
+    session_id = database_manager.create_history_session()
+    database_manager.append_session_spins(session_id, list(range(37)) * 10)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def reader():
+        done = errors = 0
+        while time.perf_counter() < stop_at:
+            try:
+                database_manager.get_total_spins_count()
+                database_manager.get_session_spins(session_id, last_n=50)
+                done += 1
+            except sqlite3.Error:
+                errors += 1
+        with lock:
+            counts["reads"] += done
+            counts["errors"] += errors
+
+    def writer():
+        done = errors = 0
+        while time.perf_counter() < stop_at:
+            try:
+                database_manager.add_multiple_spin_results([1, 2, 3, 4, 5])
+                done += 1
+            except sqlite3.Error:
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {key: value / seconds for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent database_manager readers and writers.")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    original_get_connection = database_manager.get_connection
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, connection_factory in [("connect per call", _connect_per_call), ("per-thread WAL", original_get_connection)]:
+            database_manager.DATABASE_NAME = os.path.join(temp_dir, f"{label.replace(' ', '_')}.db")
+            database_manager.get_connection = connection_factory
+            database_manager.init_db()
+            rates = run_workload(args.readers, args.writers, args.seconds)
+            print(f"{label:>18}: {rates['reads']:9.0f} reads/s  {rates['writes']:7.0f} writes/s  "
+                  f"({rates['errors']:.1f} errors/s, {args.readers} readers, {args.writers} writers)")
+            database_manager.close_connection()
+    database_manager.get_connection = original_get_connection
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Benchmark: OCR throughput per backend.
+#
+# Renders synthetic result strips (random roulette numbers, light digits on a
+# dark table) and OCRs them with every available backend of
+# src/ocr_backends.py: pytesseract (one tesseract process per image) and
+# tesserocr (one persistent Tesseract API). Reports images per second and
+# how many numbers were read back correctly. Backends that cannot run here
+# (tesserocr not installed, tesseract not in PATH) are reported as skipped.
+#
+# Usage (from the roulette_analyzer directory):
+#     python benchmarks/ocr_backends.py [--images 30] [--numbers-per-image 12]
+import argparse
+import os
+import random
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src import ocr_backends
+from src.ocr_pipeline import preprocess_image, parse_numbers_from_ocr_text
+
+
+def render_strip(numbers: list[int], font_size: int = 40) -> Image.Image:
+    """A screenshot-sized image with a row of result numbers in the middle."""
+    image = Image.new("RGB", (1600, 900), (15, 70, 30))
+    draw = ImageDraw.Draw(image)
+    draw.text((100, 420), "  ".join(map(str, numbers)), fill=(245, 245, 245), font=ImageFont.load_default(size=font_size))
+    return image
+
+
+def benchmark_backend(name: str, images: list[Image.Image], expected: list[list[int]]) -> dict:
+    """OCRs the preprocessed images with one backend; returns images/s and accuracy, or the reason it was skipped."""
+    try:
+        backend = ocr_backends.create_backend(name)
+        backend.recognize(images[0]) # Warm-up, and a check that the engine works at all
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    start_time = time.perf_counter()
+    recognized = [parse_numbers_from_ocr_text(backend.recognize(image)[0]) for image in images]
+    elapsed = time.perf_counter() - start_time
+    backend.close()
+    correct = sum(numbers == expected_numbers for numbers, expected_numbers in zip(recognized, expected))
+    return {"images_per_second": len(images) / elapsed, "correct": correct}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR backends by images per second.")
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--numbers-per-image", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    expected = [[rng.randint(0, 36) for _ in range(args.numbers_per_image)] for _ in range(args.images)]
+    images = [preprocess_image(render_strip(numbers)) for numbers in expected]
+
+    for name in ("pytesseract", "tesserocr"):
+        result = benchmark_backend(name, images, expected)
+        if "skipped" in result:
+            print(f"{name:>12}: skipped ({result['skipped']})")
+        else:
+            print(f"{name:>12}: {result['images_per_second']:7.1f} images/s, "
+                  f"{result['correct']}/{args.images} images read correctly")
+
+
+if __name__ == '__main__':
+    main()
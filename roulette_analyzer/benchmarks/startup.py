@@ -0,0 +1,90 @@
+# Benchmark: web app cold start.
+#
+# Starts fresh interpreters that import app.py and serve one GET / through
+# Flask's test client, like a serverless instance handling its first request.
+# Reports the median import time and first-request latency, and which heavy
+# modules (OCR, scikit-learn, joblib) got imported along the way; app.py
+# should load those only for the requests that need them.
+#
+# Exits with status 1 if a median exceeds its budget or a heavy module was
+# imported, so it can run as a check in CI.
+#
+# Usage (from the roulette_analyzer directory):
+#     python benchmarks/startup.py [--runs 5] [--import-budget-ms 1000] [--first-request-budget-ms 500]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_IMPORT_BUDGET_MS = 1000
+DEFAULT_FIRST_REQUEST_BUDGET_MS = 500
+HEAVY_MODULES = ("sklearn", "scipy", "joblib", "pytesseract", "PIL")
+
+# Runs in the child interpreter, with the working directory set to a scratch
+# directory so the database and upload folder are created there
+_CHILD_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {app_directory!r})
+start_time = time.perf_counter()
+import app
+imported_time = time.perf_counter()
+app.PRELOAD_MODELS_AT_STARTUP = {preload!r}
+response = app.app.test_client().get('/')
+done_time = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported_time - start_time) * 1000,
+    "first_request_ms": (done_time - imported_time) * 1000,
+    "status_code": response.status_code,
+    "heavy_modules": [name for name in {heavy_modules!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure_cold_start(preload_models: bool = False) -> dict:
+    """Imports the app and serves GET / in a new interpreter; returns its timings."""
+    script = _CHILD_SCRIPT.format(app_directory=os.path.abspath(APP_DIRECTORY), preload=preload_models,
+                                  heavy_modules=HEAVY_MODULES)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        completed = subprocess.run([sys.executable, "-c", script], cwd=temp_dir, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the web app's import time and first-request latency.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS)
+    parser.add_argument("--first-request-budget-ms", type=float, default=DEFAULT_FIRST_REQUEST_BUDGET_MS)
+    parser.add_argument("--preload-models", action="store_true",
+                        help="Keep the background model preload enabled (it shares the CPU with the first request).")
+    args = parser.parse_args()
+
+    runs = [measure_cold_start(args.preload_models) for _ in range(args.runs)]
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+    first_request_ms = statistics.median(run["first_request_ms"] for run in runs)
+    heavy_modules = sorted({name for run in runs for name in run["heavy_modules"]})
+    failed_requests = [run["status_code"] for run in runs if run["status_code"] != 200]
+
+    print(f"{'import app':>14}: {import_ms:8.1f} ms median (budget {args.import_budget_ms:.0f} ms, {args.runs} runs)")
+    print(f"{'first GET /':>14}: {first_request_ms:8.1f} ms median (budget {args.first_request_budget_ms:.0f} ms)")
+    print(f"{'heavy modules':>14}: {', '.join(heavy_modules) if heavy_modules else 'none'}")
+
+    problems = []
+    if import_ms > args.import_budget_ms:
+        problems.append(f"import time {import_ms:.1f} ms exceeds the budget of {args.import_budget_ms:.0f} ms")
+    if first_request_ms > args.first_request_budget_ms:
+        problems.append(f"first request {first_request_ms:.1f} ms exceeds the budget of {args.first_request_budget_ms:.0f} ms")
+    if heavy_modules and not args.preload_models: # The preload thread imports prediction_engine on purpose
+        problems.append(f"heavy modules imported during startup: {', '.join(heavy_modules)}")
+    if failed_requests:
+        problems.append(f"GET / returned status {failed_requests[0]}")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,15 @@
 import json
 from src.input_handler import get_manual_input
 from src.analysis_engine import (
-    calculate_frequencies,
+    SpinStatsAccumulator,
     identify_trends,
-    detect_patterns,
     detect_biases,
     analyze_wheel_clusters,
     WHEEL_ORDER, # Constant for wheel layout
     ROULETTE_WHEEL # For colors
 )
+from src.streak_engine import StreakState
+from src.range_index import SpinRangeIndex
 from src.prediction_engine import generate_predictions
 
 # --- Display Helper Functions ---
@@ -41,6 +42,16 @@ def display_frequencies(freq_data):
         for item, count in freq_data.get(key_name, {}).items():
             print(f"{cat_name} {item}: {count} time(s)")
 
+def display_windows(window_table):
+    print_section_header("Recent Windows")
+    if not window_table or len(window_table.get("labels", [])) < 2:
+        print("Not enough spins yet to compare recent windows.")
+        return
+
+    print("".join(["Category".ljust(14)] + [label.rjust(12) for label in window_table["labels"]]))
+    for row in window_table["rows"]:
+        print("".join([row["label"].ljust(14)] + [str(count).rjust(12) for count in row["counts"]]))
+
 def display_trends(trend_data):
     print_section_header("Trend Analysis")
     if not trend_data or trend_data.get("message", "").startswith("Insufficient data"):
@@ -118,6 +129,7 @@ def display_biases(bias_data):
         print("\n--- Chi-Squared Test for Number Distribution ---")
         print(f"  Statistic: {cs_test['statistic']:.2f}")
         print(f"  Critical Value (p=0.05, df=36): {cs_test['critical_value']:.2f}")
+        if cs_test.get("p_value") is not None: print(f"  p-value: {cs_test['p_value']:.4f}")
         print(f"  Suggestion: {'Potential bias' if cs_test['is_biased_suggestion'] else 'No strong bias'} suggested.")
         if cs_test.get("message"): print(f"  Note: {cs_test['message']}")
 
@@ -128,6 +140,7 @@ def display_biases(bias_data):
             print(f"  Section: {section}")
             print(f"    Observed Hits: {data['observed_hits']}, Expected Hits: {data['expected_hits']:.1f}")
             print(f"    Deviation: {data['deviation_percent']:.1f}%, Status: {data['status']}")
+            if data.get("p_value") is not None: print(f"    p-value: {data['p_value']:.4f}")
 
 def display_clusters(cluster_data):
     print_section_header("Wheel Cluster Analysis")
@@ -214,6 +227,9 @@ def show_main_menu():
 def main():
     print("Welcome to the Roulette Analyzer CLI!")
     roulette_numbers = []
+    spin_stats = SpinStatsAccumulator() # Running frequency counts, updated as numbers are entered
+    streaks = StreakState() # Running streaks for pattern detection
+    range_index = SpinRangeIndex() # Prefix counts for "last N spins" windows
     analysis_results = {} # To store all analysis outputs
     predictions = {}
 
@@ -226,6 +242,9 @@ def main():
             new_numbers = get_manual_input()
             if new_numbers:
                 roulette_numbers.extend(new_numbers)
+                spin_stats.extend(new_numbers)
+                streaks.update(new_numbers)
+                range_index.append(new_numbers)
                 print(f"Added {len(new_numbers)} new results. Total results: {len(roulette_numbers)}")
                 needs_recalculation = True
             else:
@@ -236,12 +255,14 @@ def main():
                 print("\nNo results entered yet. Please enter results first (Option 1).")
                 continue
 
-            if needs_recalculation or not analysis_results.get("frequencies"): # Recalculate if new numbers or first time
+            # Recalculate if new numbers were added since the last analysis or first time
+            if needs_recalculation or analysis_results.get("frequencies", {}).get("total_spins") != spin_stats.total_spins:
                 print("\nCalculating new analysis...")
                 total_spins = len(roulette_numbers)
-                analysis_results["frequencies"] = calculate_frequencies(roulette_numbers)
+                analysis_results["frequencies"] = spin_stats.frequencies()
                 analysis_results["trends"] = identify_trends(analysis_results["frequencies"], total_spins)
-                analysis_results["patterns"] = detect_patterns(roulette_numbers, analysis_results["frequencies"])
+                analysis_results["windows"] = range_index.window_table()
+                analysis_results["patterns"] = streaks.to_patterns()
                 number_deviations_data = analysis_results["trends"].get("number_deviations", {})
                 analysis_results["biases"] = detect_biases(analysis_results["frequencies"], total_spins, number_deviations_data)
                 analysis_results["clusters"] = analyze_wheel_clusters(analysis_results["frequencies"], total_spins, WHEEL_ORDER)
@@ -251,6 +272,7 @@ def main():
 
             if choice == '2':
                 display_frequencies(analysis_results.get("frequencies", {}))
+                display_windows(analysis_results.get("windows", {}))
                 display_trends(analysis_results.get("trends", {}))
                 display_patterns(analysis_results.get("patterns", {}))
                 display_biases(analysis_results.get("biases", {}))
@@ -1,25 +1,24 @@
 # Handles analysis logic for Roulette Analyzer.
 from collections import Counter
 
-# --- Helper Data ---
-ROULETTE_WHEEL = {
-    0: 'green',
-    1: 'red', 2: 'black', 3: 'red', 4: 'black', 5: 'red', 6: 'black', 7: 'red', 8: 'black', 9: 'red',
-    10: 'black', 11: 'black', 12: 'red', 13: 'black', 14: 'red', 15: 'black', 16: 'red', 17: 'black', 18: 'red',
-    19: 'red', 20: 'black', 21: 'red', 22: 'black', 23: 'red', 24: 'black', 25: 'red', 26: 'black', 27: 'red',
-    28: 'black', 29: 'black', 30: 'red', 31: 'black', 32: 'red', 33: 'black', 34: 'red', 35: 'black', 36: 'red'
-}
-
-NUMBER_TO_DOZEN = {n: ( (n-1)//12 ) + 1 for n in range(1, 37)} # 1st, 2nd, 3rd dozen
-NUMBER_TO_DOZEN[0] = None # 0 is not in any dozen
-
-NUMBER_TO_COLUMN = {n: ( (n-1)%3 ) + 1 for n in range(1, 37)} # 1st, 2nd, 3rd column
-NUMBER_TO_COLUMN[0] = None # 0 is not in any column
-
-# Simplified sections (halves and even/odd for now)
-# More complex sections like Voisins, Tiers, Orphelins can be added later
-NUMBER_TO_HALF = {n: 1 if 1 <= n <= 18 else (2 if 19 <= n <= 36 else None) for n in range(0, 37)} # 1st half (1-18), 2nd half (19-36)
-NUMBER_TO_EVEN_ODD = {n: 'even' if n != 0 and n % 2 == 0 else ('odd' if n != 0 and n % 2 != 0 else None) for n in range(0, 37)}
+try:
+    from .wheel_layout import (
+        ROULETTE_WHEEL, NUMBER_TO_DOZEN, NUMBER_TO_COLUMN, NUMBER_TO_HALF, NUMBER_TO_EVEN_ODD,
+        VOISINS_DU_ZERO, TIERS_DU_CYLINDRE, ORPHELINS, VOISINS_NUMBERS, TIERS_NUMBERS, ORPHELINS_NUMBERS,
+        WHEEL_SECTIONS, WHEEL_ORDER
+    )
+    from .streak_engine import StreakState, insufficient_pattern_data, MIN_SPINS_FOR_PATTERNS
+    from .bias_testing import chi_squared_p_value
+    from .sector_scan import arc_sums, number_counts_from_frequencies
+except ImportError:
+    from wheel_layout import (
+        ROULETTE_WHEEL, NUMBER_TO_DOZEN, NUMBER_TO_COLUMN, NUMBER_TO_HALF, NUMBER_TO_EVEN_ODD,
+        VOISINS_DU_ZERO, TIERS_DU_CYLINDRE, ORPHELINS, VOISINS_NUMBERS, TIERS_NUMBERS, ORPHELINS_NUMBERS,
+        WHEEL_SECTIONS, WHEEL_ORDER
+    )
+    from streak_engine import StreakState, insufficient_pattern_data, MIN_SPINS_FOR_PATTERNS
+    from bias_testing import chi_squared_p_value
+    from sector_scan import arc_sums, number_counts_from_frequencies
 
 
 def calculate_frequencies(results: list[int]) -> dict:
@@ -73,6 +72,90 @@ def calculate_frequencies(results: list[int]) -> dict:
         "total_spins": total_spins
     }
 
+
+class SpinStatsAccumulator:
+    """
+    Keeps running frequency counts for a growing list of roulette results.
+
+    Each added spin updates the number, color, dozen, column, half and
+    even/odd counts in O(1), so a live session does not have to re-run
+    calculate_frequencies over its whole history after every spin.
+    frequencies() returns exactly what calculate_frequencies would return
+    for all spins added so far (including key insertion order).
+    """
+
+    # (frequencies key, lookup map) for the categories that exclude zero
+    _ZERO_EXCLUDED_CATEGORIES = (
+        ("dozen_frequencies", NUMBER_TO_DOZEN),
+        ("column_frequencies", NUMBER_TO_COLUMN),
+        ("half_frequencies", NUMBER_TO_HALF),
+        ("even_odd_frequencies", NUMBER_TO_EVEN_ODD),
+    )
+    _FREQUENCY_KEYS = ("number_frequencies", "color_frequencies") + tuple(key for key, _ in _ZERO_EXCLUDED_CATEGORIES)
+
+    def __init__(self, results: list[int] = None):
+        self.total_spins = 0
+        self._counts = {key: {} for key in self._FREQUENCY_KEYS}
+        if results:
+            self.extend(results)
+
+    def add(self, number: int):
+        """Adds a single spin result to the running counts."""
+        self.total_spins += 1
+        counts = self._counts
+        number_counts = counts["number_frequencies"]
+        number_counts[number] = number_counts.get(number, 0) + 1
+
+        color = ROULETTE_WHEEL.get(number)
+        if color is not None:
+            color_counts = counts["color_frequencies"]
+            color_counts[color] = color_counts.get(color, 0) + 1
+
+        if number == 0:
+            return
+        for key, lookup in self._ZERO_EXCLUDED_CATEGORIES:
+            item = lookup.get(number)
+            if item is not None:
+                category_counts = counts[key]
+                category_counts[item] = category_counts.get(item, 0) + 1
+
+    def extend(self, numbers: list[int]):
+        """Adds several spin results, in order."""
+        for number in numbers:
+            self.add(number)
+
+    def frequencies(self) -> dict:
+        """
+        Returns the current counts in the calculate_frequencies format.
+        The returned dictionaries are copies and safe to modify.
+        """
+        if not self.total_spins:
+            return calculate_frequencies([])
+        result = {key: dict(self._counts[key]) for key in self._FREQUENCY_KEYS}
+        result["total_spins"] = self.total_spins
+        return result
+
+    def to_state(self) -> dict:
+        """
+        Returns a JSON-serializable snapshot of the accumulator.
+        Counts are stored as [key, count] pairs so integer keys and insertion
+        order survive serializers (such as Flask's session) that only accept
+        string dictionary keys.
+        """
+        state = {key: [[item, count] for item, count in self._counts[key].items()] for key in self._FREQUENCY_KEYS}
+        state["total_spins"] = self.total_spins
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict) -> "SpinStatsAccumulator":
+        """Rebuilds an accumulator from a to_state() snapshot."""
+        accumulator = cls()
+        accumulator.total_spins = int(state.get("total_spins", 0))
+        for key in cls._FREQUENCY_KEYS:
+            accumulator._counts[key] = {item: count for item, count in state.get(key, [])}
+        return accumulator
+
+
 if __name__ == '__main__':
     # Example Usage for testing
     sample_results_1 = [0, 10, 20, 30, 36, 1, 2, 3, 1, 1, 13, 25, 13, 0, 19, 22]
@@ -268,7 +351,6 @@ if __name__ == '__main__':
     print(json.dumps(trends_biased, indent=4))
 
 # --- Pattern Detection ---
-MIN_SPINS_FOR_PATTERNS = 5 # Minimum spins for some basic pattern detection
 
 def detect_patterns(results: list[int], frequencies: dict) -> dict:
     """
@@ -282,150 +364,12 @@ def detect_patterns(results: list[int], frequencies: dict) -> dict:
     Returns:
         A dictionary summarizing detected patterns.
     """
-    patterns = {
-        "message": "",
-        "number_repeats": {"counts": Counter(), "longest_streak": 0, "number_for_longest_streak": None, "total_immediate_repeats": 0},
-        "alternating_color_streak": {"longest_streak": 0, "current_streak": 0, "last_color": None},
-        "consecutive_dozen_streak": {"longest_streak": 0, "current_streak": 0, "dozen_for_longest_streak": None, "current_dozen": None},
-        "consecutive_column_streak": {"longest_streak": 0, "current_streak": 0, "column_for_longest_streak": None, "current_column": None},
-    }
-
+    # All streaks are computed in one run-length pass by the streak engine.
+    # Callers that receive spins incrementally can keep a StreakState instead.
     if len(results) < MIN_SPINS_FOR_PATTERNS:
-        patterns["message"] = f"Insufficient data for pattern detection (minimum {MIN_SPINS_FOR_PATTERNS} spins required, got {len(results)})."
-        # Return early with counts initialized to 0 or empty
-        patterns["alternating_color_streak"] = 0
-        patterns["consecutive_dozen_streak"] = {"longest_streak":0, "dozen": None}
-        patterns["consecutive_column_streak"] = {"longest_streak":0, "column": None}
-        patterns["number_repeats"] = {"longest_streak":0, "number":None, "total_immediate_repeats":0}
-        return patterns
-
-    # 1. Number Repeats and Longest Streak of a Single Number
-    if not results: # Should be caught by MIN_SPINS_FOR_PATTERNS but good practice
-        return patterns
-
-    current_streak_val = results[0]
-    current_streak_len = 0
-
-    for i in range(len(results)):
-        # Immediate repeats
-        if i > 0 and results[i] == results[i-1]:
-            patterns["number_repeats"]["total_immediate_repeats"] += 1
-            patterns["number_repeats"]["counts"][results[i]] = patterns["number_repeats"]["counts"].get(results[i], 0) + 1
-
-        # Longest streak of a single number
-        if results[i] == current_streak_val:
-            current_streak_len += 1
-        else:
-            if current_streak_len > patterns["number_repeats"]["longest_streak"]:
-                patterns["number_repeats"]["longest_streak"] = current_streak_len
-                patterns["number_repeats"]["number_for_longest_streak"] = current_streak_val
-            current_streak_val = results[i]
-            current_streak_len = 1
-
-    # Check last streak
-    if current_streak_len > patterns["number_repeats"]["longest_streak"]:
-        patterns["number_repeats"]["longest_streak"] = current_streak_len
-        patterns["number_repeats"]["number_for_longest_streak"] = current_streak_val
-    if patterns["number_repeats"]["longest_streak"] == 1 and len(set(results)) == len(results): # if all numbers are unique, longest streak is 1 of any number.
-        patterns["number_repeats"]["number_for_longest_streak"] = None if len(results) == 0 else results[0]
-
-
-    # 2. Alternating Colors (Red/Black)
-    # Re-initialize for this specific pattern logic
-    current_alternating_streak = 0
-    longest_alternating_streak = 0
-    last_color_for_alternating = None
-
-    for num in results:
-        color = ROULETTE_WHEEL.get(num)
-        if color in ['red', 'black']:
-            if last_color_for_alternating is None or color != last_color_for_alternating:
-                current_alternating_streak += 1
-            else: # Color repeated, reset streak
-                if current_alternating_streak > longest_alternating_streak:
-                    longest_alternating_streak = current_alternating_streak
-                current_alternating_streak = 1 # Start new streak with the current color
-            last_color_for_alternating = color
-        else: # Green or invalid number, breaks the red/black alternating streak
-            if current_alternating_streak > longest_alternating_streak:
-                longest_alternating_streak = current_alternating_streak
-            current_alternating_streak = 0
-            last_color_for_alternating = None # Reset for next R/B sequence
-
-    if current_alternating_streak > longest_alternating_streak: # Check after loop
-        longest_alternating_streak = current_alternating_streak
-    patterns["alternating_color_streak"] = longest_alternating_streak
-
-
-    # 3. Consecutive Dozens/Columns
-    current_dozen_streak = 0
-    longest_dozen_streak = 0
-    current_dozen_val = None
-    dozen_for_longest = None
-
-    current_column_streak = 0
-    longest_column_streak = 0
-    current_column_val = None
-    column_for_longest = None
-
-    for num in results:
-        if num == 0: # Zero resets streaks for dozens/columns
-            if current_dozen_streak > longest_dozen_streak:
-                longest_dozen_streak = current_dozen_streak
-                dozen_for_longest = current_dozen_val
-            current_dozen_streak = 0
-            current_dozen_val = None
-
-            if current_column_streak > longest_column_streak:
-                longest_column_streak = current_column_streak
-                column_for_longest = current_column_val
-            current_column_streak = 0
-            current_column_val = None
-            continue
-
-        dozen = NUMBER_TO_DOZEN.get(num)
-        column = NUMBER_TO_COLUMN.get(num)
-
-        # Dozen streak
-        if dozen == current_dozen_val:
-            current_dozen_streak += 1
-        else:
-            if current_dozen_streak > longest_dozen_streak:
-                longest_dozen_streak = current_dozen_streak
-                dozen_for_longest = current_dozen_val
-            current_dozen_val = dozen
-            current_dozen_streak = 1
-
-        # Column streak
-        if column == current_column_val:
-            current_column_streak += 1
-        else:
-            if current_column_streak > longest_column_streak:
-                longest_column_streak = current_column_streak
-                column_for_longest = current_column_val
-            current_column_val = column
-            current_column_streak = 1
-
-    # Final checks for dozen/column streaks
-    if current_dozen_streak > longest_dozen_streak:
-        longest_dozen_streak = current_dozen_streak
-        dozen_for_longest = current_dozen_val
-    patterns["consecutive_dozen_streak"] = {"longest_streak": longest_dozen_streak, "dozen": dozen_for_longest}
-
-    if current_column_streak > longest_column_streak:
-        longest_column_streak = current_column_streak
-        column_for_longest = current_column_val
-    patterns["consecutive_column_streak"] = {"longest_streak": longest_column_streak, "column": column_for_longest}
-
-    if not patterns["message"]:
-         patterns["message"] = "Pattern detection complete."
-
-    # Clean up initial structures if they remained empty
-    if not patterns["number_repeats"]["counts"]:
-        del patterns["number_repeats"]["counts"]
+        return insufficient_pattern_data(len(results))
 
-
-    return patterns
+    return StreakState(results).to_patterns()
 
 
 if __name__ == '__main__':
@@ -484,30 +428,6 @@ if __name__ == '__main__':
 
 # --- Bias Detection ---
 
-# More detailed wheel sections
-# Voisins du Zéro (Neighbors of Zero): 0, 2, 3, 4, 7, 12, 15, 18, 19, 21, 22, 25, 26, 28, 29, 32, 35 (17 numbers)
-VOISINS_DU_ZERO = {0, 2, 3, 4, 7, 12, 15, 18, 19, 21, 22, 25, 26, 28, 29, 32, 35}
-# Tiers du Cylindre (Third of the Wheel): 5, 6, 8, 10, 11, 13, 16, 17, 23, 24, 27, 30, 33, 36 (12 numbers, but typically 6 numbers are bet with 6 splits)
-# For frequency analysis, we consider all numbers in the section.
-TIERS_DU_CYLINDRE = {5, 6, 8, 10, 11, 13, 16, 17, 23, 24, 27, 30, 33, 36} # Actually 12 numbers on the wheel: 27,13,36,11,30,8,23,10,5,24,16,33
-# Orphelins (Orphans): 1, 9, 14, 20, 31, 34 (6 numbers, but typically 5 numbers are bet, 1 straight up, 4 splits)
-# For frequency analysis, we consider all numbers in the section.
-ORPHELINS = {1, 9, 14, 20, 31, 34} # Actually 8 numbers on the wheel: 1,20,14,31,9,17,34,6 (17&6 are also Tiers/Voisins based on some layouts)
-# Let's use a common definition:
-# Voisins: 22,18,29,7,28,12,35,3,26,0,32,15,19,4,21,2,25 (17 numbers)
-VOISINS_NUMBERS = {22,18,29,7,28,12,35,3,26,0,32,15,19,4,21,2,25}
-# Tiers: 33,16,24,5,10,23,8,30,11,36,13,27 (12 numbers)
-TIERS_NUMBERS = {33,16,24,5,10,23,8,30,11,36,13,27}
-# Orphelins: 17,34,6,1,20,14,31,9 (8 numbers)
-ORPHELINS_NUMBERS = {17,34,6,1,20,14,31,9}
-
-# Sanity check: 17 + 12 + 8 = 37 numbers. All numbers covered.
-WHEEL_SECTIONS = {
-    "Voisins du Zero": VOISINS_NUMBERS,
-    "Tiers du Cylindre": TIERS_NUMBERS,
-    "Orphelins": ORPHELINS_NUMBERS
-}
-
 MIN_SPINS_FOR_BIAS = 5 # Minimum spins for bias detection
 LOW_SPIN_WARNING_THRESHOLD_BIAS = 30 # Threshold for low data warning for bias
 CHI_SQUARED_CRITICAL_VALUE_P005_DF36 = 51.0 # Approximate critical value for p=0.05 and df=36
@@ -528,7 +448,7 @@ def detect_biases(frequencies: dict, total_spins: int, number_deviations: dict)
     """
     bias_analysis = {
         "message": "",
-        "chi_squared_test": {"statistic": None, "critical_value": CHI_SQUARED_CRITICAL_VALUE_P005_DF36, "is_biased_suggestion": False, "message": ""},
+        "chi_squared_test": {"statistic": None, "critical_value": CHI_SQUARED_CRITICAL_VALUE_P005_DF36, "p_value": None, "is_biased_suggestion": False, "message": ""},
         "sectional_bias": {},
         "interpretation": ""
     }
@@ -583,6 +503,7 @@ def detect_biases(frequencies: dict, total_spins: int, number_deviations: dict)
                 chi_squared_statistic += ((observed_freq - expected_freq_per_number)**2) / expected_freq_per_number
 
         bias_analysis["chi_squared_test"]["statistic"] = round(chi_squared_statistic, 2)
+        bias_analysis["chi_squared_test"]["p_value"] = round(chi_squared_p_value(chi_squared_statistic, 36), 4)
         if chi_squared_statistic > CHI_SQUARED_CRITICAL_VALUE_P005_DF36:
             bias_analysis["chi_squared_test"]["is_biased_suggestion"] = True
             bias_analysis["chi_squared_test"]["message"] = "Chi-Squared statistic exceeds critical value, suggesting potential number distribution bias. " + chi_squared_specific_msg
@@ -601,6 +522,10 @@ def detect_biases(frequencies: dict, total_spins: int, number_deviations: dict)
         deviation = observed_section_hits - expected_section_hits
         percent_deviation = (deviation / expected_section_hits) if expected_section_hits > 0 else float('inf') if observed_section_hits > 0 else 0
 
+        # Section vs. rest of the wheel chi-squared test (df=1)
+        section_probability = len(section_numbers) / 37.0
+        section_chi_squared = (deviation ** 2) / (expected_section_hits * (1 - section_probability)) if expected_section_hits > 0 else 0
+
         status = "as_expected"
         if percent_deviation > SECTION_BIAS_THRESHOLD:
             status = "over_represented"
@@ -611,6 +536,7 @@ def detect_biases(frequencies: dict, total_spins: int, number_deviations: dict)
             "observed_hits": observed_section_hits,
             "expected_hits": round(expected_section_hits, 2),
             "deviation_percent": round(percent_deviation * 100, 1),
+            "p_value": round(chi_squared_p_value(section_chi_squared, 1), 4),
             "status": status
         }
 
@@ -693,10 +619,6 @@ if __name__ == '__main__':
 
 # --- Wheel Clustering Analysis ---
 
-# Physical order of numbers on a standard European roulette wheel
-WHEEL_ORDER = [0, 32, 15, 19, 4, 21, 2, 25, 17, 34, 6, 27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33, 1, 20, 14, 31, 9, 22, 18, 29, 7, 28, 12, 35, 3, 26]
-# len(WHEEL_ORDER) should be 37
-
 MIN_SPINS_FOR_CLUSTERS = 5 # Minimum spins for cluster analysis
 LOW_SPIN_WARNING_THRESHOLD_CLUSTERS = 20 # Threshold for low data warning for clusters
 CLUSTER_ARC_SIZE = 5 # Number of adjacent numbers on the wheel to consider as a cluster/arc (e.g., 5 means center + 2 neighbors each side)
@@ -753,6 +675,9 @@ def analyze_wheel_clusters(frequencies: dict, total_spins: int, wheel_order: lis
     neighbors_on_each_side = (CLUSTER_ARC_SIZE - 1) // 2
     padded_wheel = wheel_order[-neighbors_on_each_side:] + wheel_order + wheel_order[:neighbors_on_each_side]
 
+    # Hit counts of every arc come from one prefix-sum pass (see sector_scan)
+    arc_hits = arc_sums(number_counts_from_frequencies(frequencies), [CLUSTER_ARC_SIZE], wheel_order)[0]
+
     for i in range(num_wheel_slots):
         center_num_index_in_original_wheel = i
         center_num = wheel_order[center_num_index_in_original_wheel]
@@ -761,9 +686,8 @@ def analyze_wheel_clusters(frequencies: dict, total_spins: int, wheel_order: lis
         # The actual index in padded_wheel for wheel_order[0] is neighbors_on_each_side
         arc_numbers = padded_wheel[center_num_index_in_original_wheel : center_num_index_in_original_wheel + CLUSTER_ARC_SIZE]
 
-        observed_arc_freq = 0
-        for num in arc_numbers:
-            observed_arc_freq += frequencies["number_frequencies"].get(str(num), frequencies["number_frequencies"].get(num, 0))
+        # arc_hits is indexed by the arc's first wheel position
+        observed_arc_freq = int(arc_hits[(i - neighbors_on_each_side) % num_wheel_slots])
 
         deviation = observed_arc_freq - expected_arc_freq
         percent_deviation = (deviation / expected_arc_freq) if expected_arc_freq > 0 else float('inf') if observed_arc_freq > 0 else 0
@@ -0,0 +1,120 @@
+# Background jobs shared by training and OCR.
+#
+# Work too slow for an HTTP request (training a model, OCR of screenshots) is
+# run by a JobManager on a small thread pool. The manager keeps a record per
+# job (status, message, elapsed time) that the web UI can poll by job id,
+# and forgets the oldest finished jobs once more than max_finished_jobs are
+# kept. training_jobs and ocr_jobs subclass BackgroundJob and JobManager with
+# what is specific to them (per-model jobs and cancellation, a bounded queue).
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work function to stop it; the job ends as cancelled."""
+
+
+class BackgroundJob:
+    """State of one job. Read it through to_dict() from other threads."""
+
+    def __init__(self):
+        self.job_id = uuid.uuid4().hex
+        self.status = JOB_QUEUED
+        self.message = ""
+        self.created_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    def describe(self) -> str:
+        """How the job is named in server logs."""
+        return self.job_id
+
+    def elapsed_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "elapsed_seconds": round(self.elapsed_seconds(), 2),
+            "message": self.message,
+        }
+
+
+class JobManager:
+    """
+    Runs jobs on a thread pool and keeps their records for polling.
+
+    Subclasses create the job and call _start(job, *args) from their own
+    submit(), implement _execute(job, *args) to do the work and set the
+    job's final status and message, and may override _job_finished(job) to
+    update their own bookkeeping (it runs under the manager's lock).
+    """
+
+    job_kind = "background" # For log messages
+
+    def __init__(self, max_workers: int, max_finished_jobs: int, thread_name_prefix: str):
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._jobs = {} # job_id -> job, in submission order
+
+    def _add_job(self, job: BackgroundJob):
+        """Records a new job. Call with the lock held."""
+        self._jobs[job.job_id] = job
+        self._forget_old_jobs()
+
+    def _start(self, job: BackgroundJob, *args):
+        self._executor.submit(self._run, job, *args)
+
+    def _run(self, job: BackgroundJob, *args):
+        job.started_at = time.monotonic()
+        job.status = JOB_RUNNING
+        try:
+            self._execute(job, *args)
+        except JobCancelled as e:
+            job.status = JOB_CANCELLED
+            job.message = str(e)
+        except Exception as e:
+            print(f"Error in {self.job_kind} job {job.describe()}: {e}")
+            job.status = JOB_FAILED
+            job.message = f"Error: {e}"
+        finally:
+            job.finished_at = time.monotonic()
+            with self._lock:
+                self._job_finished(job)
+
+    def _execute(self, job: BackgroundJob, *args):
+        raise NotImplementedError
+
+    def _job_finished(self, job: BackgroundJob):
+        pass
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES]
+        for job_id in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self._jobs[job_id]
+
+    def get_job(self, job_id: str) -> BackgroundJob:
+        """Returns the job with this id, or None if unknown."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[BackgroundJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,184 @@
+# Vectorized frequency analysis over many roulette histories at once.
+import numpy as np
+
+try:
+    from .analysis_engine import (
+        ROULETTE_WHEEL, NUMBER_TO_DOZEN, NUMBER_TO_COLUMN, NUMBER_TO_HALF, NUMBER_TO_EVEN_ODD, WHEEL_ORDER,
+        calculate_frequencies, identify_trends, detect_biases, analyze_wheel_clusters
+    )
+    from .streak_engine import StreakState
+except ImportError:
+    from analysis_engine import (
+        ROULETTE_WHEEL, NUMBER_TO_DOZEN, NUMBER_TO_COLUMN, NUMBER_TO_HALF, NUMBER_TO_EVEN_ODD, WHEEL_ORDER,
+        calculate_frequencies, identify_trends, detect_biases, analyze_wheel_clusters
+    )
+    from streak_engine import StreakState
+
+NUM_POCKETS = 37 # Numbers 0-36 on a European wheel
+PAD_VALUE = -1 # Filler for ragged histories; any value outside 0-36 is treated as padding
+
+# Derived categories, one column each in CATEGORY_MEMBERSHIP: (frequencies key, category item, number -> item map)
+_CATEGORY_SOURCES = [
+    ("color_frequencies", ['red', 'black', 'green'], ROULETTE_WHEEL),
+    ("dozen_frequencies", [1, 2, 3], NUMBER_TO_DOZEN),
+    ("column_frequencies", [1, 2, 3], NUMBER_TO_COLUMN),
+    ("half_frequencies", [1, 2], NUMBER_TO_HALF),
+    ("even_odd_frequencies", ['even', 'odd'], NUMBER_TO_EVEN_ODD),
+]
+CATEGORY_COLUMNS = [(key, item) for key, items, _ in _CATEGORY_SOURCES for item in items]
+
+
+def _build_category_membership() -> np.ndarray:
+    membership = np.zeros((NUM_POCKETS, len(CATEGORY_COLUMNS)), dtype=np.int64)
+    col = 0
+    for _, items, lookup in _CATEGORY_SOURCES:
+        for item in items:
+            for n in range(NUM_POCKETS):
+                if lookup.get(n) == item:
+                    membership[n, col] = 1
+            col += 1
+    return membership
+
+# CATEGORY_MEMBERSHIP[n, k] is 1 when number n belongs to CATEGORY_COLUMNS[k].
+# Multiplying a (tables x 37) number histogram by this matrix gives every
+# derived category histogram in a single matrix product.
+CATEGORY_MEMBERSHIP = _build_category_membership()
+
+
+def to_padded_array(histories: list[list[int]], pad_value: int = PAD_VALUE) -> np.ndarray:
+    """
+    Packs a list of (possibly different length) histories into one 2-D array.
+
+    Args:
+        histories: A list of histories, each a list of roulette numbers (0-36).
+        pad_value: Value used to fill the end of shorter rows.
+
+    Returns:
+        A (len(histories) x longest history) int16 array.
+    """
+    width = max((len(h) for h in histories), default=0)
+    packed = np.full((len(histories), width), pad_value, dtype=np.int16)
+    for row, history in enumerate(histories):
+        packed[row, :len(history)] = history
+    return packed
+
+
+def batch_number_histograms(histories) -> np.ndarray:
+    """
+    Counts how often each number 0-36 appears in every history.
+
+    Args:
+        histories: A 2-D array (one history per row) or a list of histories.
+                   Entries outside 0-36 (e.g. PAD_VALUE) are ignored.
+
+    Returns:
+        A (num_histories x 37) int64 array of counts.
+    """
+    if not isinstance(histories, np.ndarray):
+        histories = to_padded_array(histories)
+    histories = np.atleast_2d(histories).astype(np.int64, copy=False)
+    num_rows = histories.shape[0]
+
+    valid = (histories >= 0) & (histories < NUM_POCKETS)
+    # Offset each row into its own block of 37 bins so one bincount covers every history
+    row_offsets = (np.arange(num_rows, dtype=np.int64) * NUM_POCKETS)[:, None]
+    flat_bins = (histories + row_offsets)[valid]
+    counts = np.bincount(flat_bins, minlength=num_rows * NUM_POCKETS)
+    return counts.reshape(num_rows, NUM_POCKETS)
+
+
+def batch_category_histograms(histories) -> dict:
+    """
+    Computes number and derived category histograms for many histories in one call.
+
+    Args:
+        histories: A 2-D array (one history per row, padded with values outside 0-36)
+                   or a list of histories.
+
+    Returns:
+        A dictionary with:
+        - "number_counts": (num_histories x 37) counts per number.
+        - "category_counts": (num_histories x len(CATEGORY_COLUMNS)) counts per
+          derived category, columns ordered as CATEGORY_COLUMNS.
+        - "total_spins": (num_histories,) number of valid spins per history.
+    """
+    number_counts = batch_number_histograms(histories)
+    return {
+        "number_counts": number_counts,
+        "category_counts": number_counts @ CATEGORY_MEMBERSHIP,
+        "total_spins": number_counts.sum(axis=1),
+    }
+
+
+def histograms_to_frequencies(number_counts, category_counts, total_spins: int) -> dict:
+    """
+    Converts one row of histogram output into the calculate_frequencies dictionary format.
+    Items with a zero count are left out, as calculate_frequencies does.
+    """
+    if not total_spins:
+        return calculate_frequencies([])
+
+    frequencies = {key: {} for key, _, _ in _CATEGORY_SOURCES}
+    for (key, item), count in zip(CATEGORY_COLUMNS, category_counts.tolist()):
+        if count:
+            frequencies[key][item] = count
+    result = {"number_frequencies": {n: c for n, c in enumerate(number_counts.tolist()) if c}}
+    result.update(frequencies)
+    result["total_spins"] = int(total_spins)
+    return result
+
+
+def batch_calculate_frequencies(histories) -> list[dict]:
+    """
+    Dictionary-based wrapper around batch_category_histograms.
+
+    Returns one calculate_frequencies-style dictionary per history. The
+    dictionaries compare equal to calculate_frequencies output; keys are
+    ordered by category rather than by first appearance.
+    """
+    histograms = batch_category_histograms(histories)
+    return [
+        histograms_to_frequencies(number_counts, category_counts, total)
+        for number_counts, category_counts, total in zip(
+            histograms["number_counts"], histograms["category_counts"], histograms["total_spins"]
+        )
+    ]
+
+
+def batch_analyze_histories(histories: list[list[int]]) -> list[dict]:
+    """
+    Runs the /analyze analyses (frequencies, trends, patterns, biases and
+    clusters) for many histories. Frequencies for all histories come from one
+    batch_calculate_frequencies call. Trends, biases and clusters work on those
+    frequencies, so they cost O(37) per history whatever its length; patterns
+    need a single StreakState pass over the history, so they are O(n).
+
+    Returns:
+        One dictionary per history with the keys "frequencies", "trends",
+        "patterns", "biases" and "clusters", as built by app.py.
+    """
+    analyses = []
+    for history, frequencies in zip(histories, batch_calculate_frequencies(histories)):
+        total_spins = frequencies["total_spins"]
+        trends = identify_trends(frequencies, total_spins)
+        analyses.append({
+            "frequencies": frequencies,
+            "trends": trends,
+            "patterns": StreakState([int(n) for n in history if 0 <= n < NUM_POCKETS]).to_patterns(),
+            "biases": detect_biases(frequencies, total_spins, trends.get("number_deviations", {})),
+            "clusters": analyze_wheel_clusters(frequencies, total_spins, WHEEL_ORDER),
+        })
+    return analyses
+
+
+if __name__ == '__main__':
+    import json
+    rng = np.random.default_rng(7)
+    sample_histories = [rng.integers(0, 37, size=size).tolist() for size in (0, 5, 40, 200)]
+    packed = to_padded_array(sample_histories)
+    print(f"Packed histories shape: {packed.shape}")
+    histograms = batch_category_histograms(packed)
+    print(f"Total spins per history: {histograms['total_spins'].tolist()}")
+    for history, frequencies in zip(sample_histories, batch_calculate_frequencies(packed)):
+        print(f"Matches calculate_frequencies: {frequencies == calculate_frequencies(history)}")
+    print(json.dumps(batch_calculate_frequencies(packed)[1], indent=4))
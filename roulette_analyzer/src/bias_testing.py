@@ -0,0 +1,175 @@
+# Statistical bias tests with exact and Monte Carlo p-values.
+#
+# detect_biases compares the chi-squared statistic against a fixed critical
+# value. This module gives the actual p-value for any degrees of freedom
+# (number test and sectional tests), and a Monte Carlo mode for small
+# samples, where the chi-squared approximation is unreliable (expected
+# counts below 5): it simulates null histories with multinomial draws in
+# chunked NumPy batches and reports the share of simulated statistics at
+# least as extreme as the observed one.
+import os
+
+import numpy as np
+
+try:
+    from .wheel_layout import WHEEL_SECTIONS
+    from .utils import new_process_pool
+except ImportError:
+    from wheel_layout import WHEEL_SECTIONS
+    from utils import new_process_pool
+
+NUMBER_TEST_DF = 36 # 37 pockets - 1
+SIGNIFICANCE_LEVEL = 0.05
+DEFAULT_SIMULATIONS = 100_000
+DEFAULT_CHUNK_SIZE = 10_000 # Simulated histories per batch (and per process pool task)
+
+NUMBER_PROBABILITIES = np.full(37, 1 / 37.0)
+SECTION_NAMES = list(WHEEL_SECTIONS)
+# SECTION_MEMBERSHIP[n, k] is 1 when number n is in section SECTION_NAMES[k]
+SECTION_MEMBERSHIP = np.array([[1 if n in WHEEL_SECTIONS[name] else 0 for name in SECTION_NAMES] for n in range(37)])
+SECTION_PROBABILITIES = SECTION_MEMBERSHIP.sum(axis=0) / 37.0
+
+
+def chi_squared_p_value(statistic: float, df: int) -> float:
+    """Returns P(X >= statistic) for a chi-squared distribution with df degrees of freedom."""
+    from scipy.special import chdtrc # Imported lazily; only needed when p-values are requested
+    return float(chdtrc(df, statistic))
+
+
+def _test_statistics(number_counts: np.ndarray, total_spins: int) -> np.ndarray:
+    """
+    Computes every test statistic for one or more count vectors.
+
+    Args:
+        number_counts: Counts indexed by number, shape (..., 37).
+        total_spins: Number of spins each count vector was built from.
+
+    Returns:
+        An array of shape (..., 2 + len(SECTION_NAMES)): the number test
+        (df 36), the three-way section test (df 2), then one section-vs-rest
+        test (df 1) per section.
+    """
+    number_counts = np.asarray(number_counts, dtype=np.float64)
+    expected_numbers = total_spins * NUMBER_PROBABILITIES
+    number_stat = ((number_counts - expected_numbers) ** 2 / expected_numbers).sum(axis=-1)
+
+    section_counts = number_counts @ SECTION_MEMBERSHIP
+    expected_sections = total_spins * SECTION_PROBABILITIES
+    section_terms = (section_counts - expected_sections) ** 2 / expected_sections
+    section_stat = section_terms.sum(axis=-1)
+    # Two-cell (section vs. rest of the wheel) statistic for each section
+    single_section_stats = section_terms / (1 - SECTION_PROBABILITIES)
+
+    return np.concatenate((number_stat[..., None], section_stat[..., None], single_section_stats), axis=-1)
+
+
+_TEST_DFS = [NUMBER_TEST_DF, len(SECTION_NAMES) - 1] + [1] * len(SECTION_NAMES)
+
+
+def _format_results(statistics, p_values, total_spins: int, method: str) -> dict:
+    results = {
+        "method": method,
+        "total_spins": total_spins,
+        "number_test": {"statistic": round(float(statistics[0]), 2), "df": _TEST_DFS[0], "p_value": p_values[0]},
+        "section_test": {"statistic": round(float(statistics[1]), 2), "df": _TEST_DFS[1], "p_value": p_values[1]},
+        "sections": {}
+    }
+    for k, name in enumerate(SECTION_NAMES):
+        results["sections"][name] = {"statistic": round(float(statistics[2 + k]), 2), "df": 1, "p_value": p_values[2 + k]}
+    for test in [results["number_test"], results["section_test"]] + list(results["sections"].values()):
+        test["is_significant"] = test["p_value"] < SIGNIFICANCE_LEVEL
+    return results
+
+
+def exact_bias_tests(number_counts) -> dict:
+    """
+    Chi-squared tests with p-values from the chi-squared distribution.
+
+    Args:
+        number_counts: 37 counts indexed by number.
+
+    Returns:
+        A dictionary with the number test, the three-way section test and a
+        per-section test, each holding statistic, df, p_value and is_significant.
+    """
+    number_counts = np.asarray(number_counts)
+    total_spins = int(number_counts.sum())
+    if total_spins == 0:
+        return {"method": "exact", "total_spins": 0, "message": "No spins to test."}
+    statistics = _test_statistics(number_counts, total_spins)
+    p_values = [chi_squared_p_value(stat, df) for stat, df in zip(statistics, _TEST_DFS)]
+    return _format_results(statistics, p_values, total_spins, "exact")
+
+
+def _simulate_chunk(task: tuple) -> np.ndarray:
+    """Simulates one batch of null histories and counts statistics >= the observed ones."""
+    total_spins, size, seed_sequence, observed = task
+    rng = np.random.default_rng(seed_sequence)
+    simulated_counts = rng.multinomial(total_spins, NUMBER_PROBABILITIES, size=size)
+    simulated = _test_statistics(simulated_counts, total_spins)
+    # Tolerance so ties with the observed statistic are not lost to float rounding
+    return (simulated >= observed - 1e-9).sum(axis=0)
+
+
+def monte_carlo_bias_tests(number_counts, simulations: int = DEFAULT_SIMULATIONS,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE, seed: int = None, max_workers: int = None) -> dict:
+    """
+    Empirical p-values from simulated fair-wheel histories of the same length.
+
+    Chunks of chunk_size histories are drawn with np.random.multinomial and
+    spread over a process pool. Each chunk has its own seed derived from
+    `seed`, so results are reproducible and do not depend on max_workers.
+
+    Args:
+        number_counts: 37 counts indexed by number.
+        simulations: Number of null histories to simulate.
+        chunk_size: Histories simulated per batch.
+        seed: Optional seed for reproducible results.
+        max_workers: Process count (default: all cores). 1 runs in-process.
+
+    Returns:
+        The exact_bias_tests dictionary layout with empirical p-values
+        ((exceedances + 1) / (simulations + 1)) and the simulation count.
+
+    Raises:
+        ValueError: If simulations or chunk_size is less than 1.
+    """
+    if simulations < 1:
+        raise ValueError(f"simulations must be at least 1, got {simulations}.")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}.")
+    number_counts = np.asarray(number_counts)
+    total_spins = int(number_counts.sum())
+    if total_spins == 0:
+        return {"method": "monte_carlo", "total_spins": 0, "message": "No spins to test."}
+
+    observed = _test_statistics(number_counts, total_spins)
+    chunk_sizes = [chunk_size] * (simulations // chunk_size)
+    if simulations % chunk_size:
+        chunk_sizes.append(simulations % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [(total_spins, size, chunk_seed, observed) for size, chunk_seed in zip(chunk_sizes, seeds)]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        exceedances = sum(_simulate_chunk(task) for task in tasks)
+    else:
+        with new_process_pool(workers) as executor:
+            exceedances = sum(executor.map(_simulate_chunk, tasks))
+
+    p_values = [float(p) for p in (exceedances + 1) / (simulations + 1)]
+    results = _format_results(observed, p_values, total_spins, "monte_carlo")
+    results["simulations"] = simulations
+    return results
+
+
+if __name__ == '__main__':
+    import json
+    import time
+    rng = np.random.default_rng(1)
+    small_sample = np.bincount(rng.integers(0, 37, size=60), minlength=37) # expected count per number < 5
+    print(json.dumps(exact_bias_tests(small_sample), indent=4))
+    start = time.perf_counter()
+    mc = monte_carlo_bias_tests(small_sample, seed=1)
+    print(f"Monte Carlo ({mc['simulations']} simulations, {time.perf_counter() - start:.2f}s):")
+    print(json.dumps(mc, indent=4))
@@ -1,94 +1,374 @@
 import sqlite3
 import datetime
+import json
+import threading
+import uuid
+
+import numpy as np
+
+try:
+    from .batch_analysis import CATEGORY_MEMBERSHIP, histograms_to_frequencies
+except ImportError:
+    from batch_analysis import CATEGORY_MEMBERSHIP, histograms_to_frequencies
 
 DATABASE_NAME = 'roulette_data.db' # This will be created in the root roulette_analyzer directory
 
+# --- Connection management ---
+# Each thread keeps one open connection instead of connecting per call.
+# sqlite3 caches the compiled form of every SQL string per connection
+# (up to STATEMENT_CACHE_SIZE), so with long-lived connections and the SQL
+# kept in constants below, repeated queries skip parsing/planning entirely.
+STATEMENT_CACHE_SIZE = 128
+BUSY_TIMEOUT_SECONDS = 5.0 # How long a writer waits for a lock before failing
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL", # Readers do not block the writer and vice versa
+    "PRAGMA synchronous=NORMAL", # Safe with WAL; skips an fsync per commit
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000", # ~8 MB page cache per connection
+)
+
+_thread_local = threading.local()
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Returns this thread's connection to DATABASE_NAME, opening and configuring
+    it on first use (or when DATABASE_NAME has changed since).
+    """
+    conn = getattr(_thread_local, 'connection', None)
+    if conn is not None and _thread_local.database_name == DATABASE_NAME:
+        return conn
+    if conn is not None:
+        conn.close()
+    conn = sqlite3.connect(DATABASE_NAME, timeout=BUSY_TIMEOUT_SECONDS, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    _thread_local.connection = conn
+    _thread_local.database_name = DATABASE_NAME
+    return conn
+
+def close_connection():
+    """Closes this thread's connection, if any (e.g. at worker shutdown or in tests)."""
+    conn = getattr(_thread_local, 'connection', None)
+    if conn is not None:
+        conn.close()
+        _thread_local.connection = None
+
+# --- SQL ---
+INSERT_SPIN_SQL = "INSERT INTO spins (number_spun, timestamp) VALUES (?, ?)"
+COUNT_SPINS_SQL = "SELECT COALESCE(SUM(spin_count), 0) FROM spin_number_counts" # Reads <= 37 rows, not the spins table
+SELECT_NUMBER_COUNTS_SQL = "SELECT number_spun, spin_count FROM spin_number_counts"
+ACTUAL_NUMBER_COUNTS_SQL = "SELECT number_spun, COUNT(*) FROM spins GROUP BY number_spun"
+# id is the INTEGER PRIMARY KEY (the rowid), so ORDER BY id walks the table's own b-tree: no sort step
+SELECT_SPINS_FOR_TRAINING_SQL = "SELECT number_spun, timestamp FROM spins ORDER BY id ASC"
+SPIN_RANGE_SQL = "SELECT COUNT(*), MAX(id) FROM spins WHERE id > ?"
+# Spins with id <= ?: the aggregate total minus only the newer rows, in one statement (one snapshot)
+COUNT_SPINS_UP_TO_SQL = "SELECT (SELECT COALESCE(SUM(spin_count), 0) FROM spin_number_counts) - (SELECT COUNT(*) FROM spins WHERE id > ?)"
+SELECT_SPIN_NUMBERS_SQL = "SELECT number_spun FROM spins WHERE id > ? AND id <= ? ORDER BY id"
+TRAINING_CHUNK_SIZE = 65536 # Rows fetched per round trip by the streaming loader
+
+# Triggers keeping spin_number_counts in step with every write to spins
+_INCREMENT_COUNT_SQL = """
+    INSERT INTO spin_number_counts (number_spun, spin_count) VALUES (NEW.number_spun, 1)
+    ON CONFLICT (number_spun) DO UPDATE SET spin_count = spin_count + 1;"""
+_DECREMENT_COUNT_SQL = """
+    UPDATE spin_number_counts SET spin_count = spin_count - 1 WHERE number_spun = OLD.number_spun;"""
+SPIN_COUNT_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS spins_count_insert AFTER INSERT ON spins BEGIN {_INCREMENT_COUNT_SQL} END",
+    f"CREATE TRIGGER IF NOT EXISTS spins_count_delete AFTER DELETE ON spins BEGIN {_DECREMENT_COUNT_SQL} END",
+    f"CREATE TRIGGER IF NOT EXISTS spins_count_update AFTER UPDATE OF number_spun ON spins "
+    f"BEGIN {_DECREMENT_COUNT_SQL} {_INCREMENT_COUNT_SQL} END",
+)
+
 def init_db():
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS spins (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            number_spun INTEGER NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    conn = get_connection()
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS spins (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                number_spun INTEGER NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        # Server-side per-browser-session history (the session cookie only holds the session_id)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS history_sessions (
+                session_id TEXT PRIMARY KEY,
+                spin_count INTEGER NOT NULL DEFAULT 0,
+                analysis_state TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                last_seen DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS session_spins (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                number_spun INTEGER NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_sessions_last_seen ON history_sessions (last_seen)")
+
+        # Materialized per-number counts of the spins table, kept in sync by triggers,
+        # so database-wide totals and frequencies never scan spins
+        has_aggregate = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'spin_number_counts'").fetchone()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS spin_number_counts (
+                number_spun INTEGER PRIMARY KEY,
+                spin_count INTEGER NOT NULL
+            )
+        ''')
+        for trigger_sql in SPIN_COUNT_TRIGGERS:
+            conn.execute(trigger_sql)
+        if not has_aggregate: # Database created before the aggregate existed
+            _rebuild_spin_number_counts(conn)
 
 def add_spin_result(number: int): # Not directly used by app.py currently, but good utility
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
+    conn = get_connection()
     try:
-        cursor.execute("INSERT INTO spins (number_spun, timestamp) VALUES (?, ?)",
-                       (number, datetime.datetime.now()))
-        conn.commit()
+        with conn:
+            conn.execute(INSERT_SPIN_SQL, (number, datetime.datetime.now()))
     except sqlite3.Error as e:
         print(f"Database error adding single spin: {e}")
-    finally:
-        conn.close()
 
 def add_multiple_spin_results(numbers: list[int]):
     if not numbers:
-        return # Don't bother connecting if list is empty
+        return # Nothing to insert
 
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    spins_to_insert = []
-    for number in numbers:
-        spins_to_insert.append((number, datetime.datetime.now()))
+    spins_to_insert = [(number, datetime.datetime.now()) for number in numbers]
 
+    conn = get_connection()
     try:
-        cursor.executemany("INSERT INTO spins (number_spun, timestamp) VALUES (?, ?)",
-                           spins_to_insert)
-        conn.commit()
+        with conn:
+            conn.executemany(INSERT_SPIN_SQL, spins_to_insert)
     except sqlite3.Error as e:
         print(f"Database error on multiple insert: {e}")
-    finally:
-        conn.close()
 
 def get_total_spins_count() -> int:
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
     try:
-        cursor.execute("SELECT COUNT(*) FROM spins")
-        count = cursor.fetchone()[0]
-        return count
+        return get_connection().execute(COUNT_SPINS_SQL).fetchone()[0]
     except sqlite3.Error as e:
         print(f"Database error getting count: {e}")
         return 0
-    finally:
-        conn.close()
+
+def count_spins_up_to(spin_id: int) -> int:
+    """
+    Number of stored spins with an id up to spin_id. Ids are never reused
+    (AUTOINCREMENT), so this drops below a count taken earlier exactly when
+    some of those spins have been deleted since.
+    """
+    try:
+        return get_connection().execute(COUNT_SPINS_UP_TO_SQL, (spin_id,)).fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"Database error counting spins: {e}")
+        return 0
+
+def _rows_to_number_counts(rows) -> np.ndarray:
+    counts = np.zeros(37, dtype=np.int64)
+    for number, count in rows:
+        if 0 <= number <= 36:
+            counts[number] = count
+    return counts
+
+def get_number_counts() -> np.ndarray:
+    """Returns the 37 per-number counts of the whole spins table, indexed by number."""
+    try:
+        return _rows_to_number_counts(get_connection().execute(SELECT_NUMBER_COUNTS_SQL))
+    except sqlite3.Error as e:
+        print(f"Database error getting number counts: {e}")
+        return np.zeros(37, dtype=np.int64)
+
+def get_database_frequencies() -> dict:
+    """
+    Returns calculate_frequencies-style results for every spin in the database,
+    built from the aggregate table in O(37), so it can feed detect_biases,
+    analyze_wheel_clusters and the other frequency-based analyses.
+    """
+    counts = get_number_counts()
+    return histograms_to_frequencies(counts, counts @ CATEGORY_MEMBERSHIP, int(counts.sum()))
+
+def _rebuild_spin_number_counts(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM spin_number_counts")
+    conn.execute(f"INSERT INTO spin_number_counts (number_spun, spin_count) {ACTUAL_NUMBER_COUNTS_SQL}")
+
+def rebuild_spin_number_counts():
+    """Recomputes the aggregate table from a full scan of spins."""
+    conn = get_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE") # No inserts between the scan and the rewrite
+        _rebuild_spin_number_counts(conn)
+
+def verify_spin_number_counts() -> dict:
+    """
+    Compares the aggregate table against a full scan of spins.
+
+    Returns:
+        A dictionary mapping each number whose counts differ to a tuple
+        (aggregate_count, actual_count). Empty when the aggregate is in sync.
+    """
+    conn = get_connection()
+    stored = _rows_to_number_counts(conn.execute(SELECT_NUMBER_COUNTS_SQL))
+    actual = _rows_to_number_counts(conn.execute(ACTUAL_NUMBER_COUNTS_SQL))
+    return {n: (int(stored[n]), int(actual[n])) for n in np.flatnonzero(stored != actual).tolist()}
 
 def get_all_spins_for_training() -> list[tuple[int, str]]:
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
     try:
-        # Order by timestamp ASC to get data in chronological order
-        cursor.execute("SELECT number_spun, timestamp FROM spins ORDER BY timestamp ASC")
-        spins = cursor.fetchall()
-        return spins
+        # Order by id (insertion order) to get data in chronological order
+        return get_connection().execute(SELECT_SPINS_FOR_TRAINING_SQL).fetchall()
     except sqlite3.Error as e:
         print(f"Database error getting all spins: {e}")
         return []
-    finally:
-        conn.close()
+
+def iter_spin_chunks(after_id: int = 0, last_id: int = None, chunk_size: int = TRAINING_CHUNK_SIZE):
+    """
+    Streams spin numbers in id order as uint8 NumPy chunks of up to chunk_size.
+
+    Args:
+        after_id: Only spins with id > after_id are read.
+        last_id: Optional upper bound (inclusive) on the id.
+        chunk_size: Rows fetched per round trip.
+    """
+    if last_id is None:
+        last_id = get_connection().execute(SPIN_RANGE_SQL, (after_id,)).fetchone()[1] or after_id
+    cursor = get_connection().execute(SELECT_SPIN_NUMBERS_SQL, (after_id, last_id))
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield np.fromiter((row[0] for row in rows), dtype=np.uint8, count=len(rows))
+
+def load_spins_array(after_id: int = 0, chunk_size: int = TRAINING_CHUNK_SIZE) -> tuple[np.ndarray, int]:
+    """
+    Loads spin numbers (id > after_id) in chronological order into a uint8 array.
+
+    The array is allocated once from a COUNT(*) and filled chunk by chunk, so
+    memory stays near one byte per spin instead of a list of row tuples.
+
+    Returns:
+        A tuple (numbers, last_id): the uint8 array and the id of the last spin
+        loaded (after_id if there were none), usable as the next after_id.
+    """
+    try:
+        count, last_id = get_connection().execute(SPIN_RANGE_SQL, (after_id,)).fetchone()
+        if not count:
+            return np.zeros(0, dtype=np.uint8), after_id
+        numbers = np.empty(count, dtype=np.uint8)
+        filled = 0
+        for chunk in iter_spin_chunks(after_id, last_id, chunk_size):
+            numbers[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        return numbers[:filled], last_id # Rows may have been deleted since the count
+    except sqlite3.Error as e:
+        print(f"Database error loading spins: {e}")
+        return np.zeros(0, dtype=np.uint8), after_id
 
 def clear_all_spins_from_db():
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
+    conn = get_connection()
     try:
-        cursor.execute("DELETE FROM spins")
-        conn.commit()
+        with conn:
+            conn.execute("DELETE FROM spins")
         print("All spins cleared from the database.") # For server log
         return True
     except sqlite3.Error as e:
         print(f"Database error clearing spins: {e}")
         return False
-    finally:
-        conn.close()
+
+# --- Session history store ---
+
+def create_history_session() -> str:
+    """Creates an empty server-side history and returns its session_id."""
+    session_id = uuid.uuid4().hex
+    conn = get_connection()
+    with conn:
+        conn.execute("INSERT INTO history_sessions (session_id, last_seen) VALUES (?, ?)",
+                     (session_id, datetime.datetime.now()))
+    return session_id
+
+def history_session_exists(session_id: str) -> bool:
+    row = get_connection().execute("SELECT 1 FROM history_sessions WHERE session_id = ?", (session_id,)).fetchone()
+    return row is not None
+
+def append_session_spins(session_id: str, numbers: list[int], analysis_state: dict = None):
+    """
+    Appends spins to a session's history (append-only) and optionally replaces
+    its saved analysis state, in one transaction.
+    """
+    conn = get_connection()
+    with conn: # Commits on success, rolls back on error
+        conn.execute("BEGIN IMMEDIATE") # Take the write lock before reading spin_count
+        row = conn.execute("SELECT spin_count FROM history_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown history session: {session_id}")
+        start = row[0]
+        conn.executemany("INSERT INTO session_spins (session_id, seq, number_spun) VALUES (?, ?, ?)",
+                         [(session_id, start + i, number) for i, number in enumerate(numbers)])
+        state_json = json.dumps(analysis_state) if analysis_state is not None else None
+        conn.execute(
+            "UPDATE history_sessions SET spin_count = ?, last_seen = ?, analysis_state = COALESCE(?, analysis_state) WHERE session_id = ?",
+            (start + len(numbers), datetime.datetime.now(), state_json, session_id))
+
+def get_session_spins(session_id: str, last_n: int = None) -> list[int]:
+    """Returns a session's spins in order; only the last last_n if given."""
+    conn = get_connection()
+    if last_n is None:
+        rows = conn.execute("SELECT number_spun FROM session_spins WHERE session_id = ? ORDER BY seq",
+                            (session_id,)).fetchall()
+        return [row[0] for row in rows]
+    # Reads the tail straight off the (session_id, seq) primary key
+    rows = conn.execute("SELECT number_spun FROM session_spins WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                        (session_id, last_n)).fetchall()
+    return [row[0] for row in reversed(rows)]
+
+def get_session_info(session_id: str) -> dict:
+    """Returns spin_count and the saved analysis state of a session and marks it as active, or None if unknown."""
+    conn = get_connection()
+    with conn:
+        row = conn.execute("SELECT spin_count, analysis_state FROM history_sessions WHERE session_id = ?",
+                           (session_id,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE history_sessions SET last_seen = ? WHERE session_id = ?",
+                     (datetime.datetime.now(), session_id))
+    return {"spin_count": row[0], "analysis_state": json.loads(row[1]) if row[1] else None}
+
+def delete_history_session(session_id: str):
+    conn = get_connection()
+    with conn:
+        conn.execute("DELETE FROM session_spins WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM history_sessions WHERE session_id = ?", (session_id,))
+
+def evict_idle_sessions(max_idle_seconds: int) -> int:
+    """Deletes sessions not used for max_idle_seconds. Returns the number of sessions removed."""
+    cutoff = datetime.datetime.now() - datetime.timedelta(seconds=max_idle_seconds)
+    conn = get_connection()
+    try:
+        with conn:
+            idle = [row[0] for row in conn.execute("SELECT session_id FROM history_sessions WHERE last_seen < ?", (cutoff,))]
+            conn.executemany("DELETE FROM session_spins WHERE session_id = ?", [(sid,) for sid in idle])
+            conn.executemany("DELETE FROM history_sessions WHERE session_id = ?", [(sid,) for sid in idle])
+        return len(idle)
+    except sqlite3.Error as e:
+        print(f"Database error evicting idle sessions: {e}")
+        return 0
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Initialize the spins database, or check its aggregate table.")
+    parser.add_argument('--verify', action='store_true', help="Compare the per-number aggregate with the spins table.")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute the per-number aggregate from the spins table.")
+    args = parser.parse_args()
+    if args.verify or args.rebuild:
+        init_db()
+        if args.rebuild:
+            rebuild_spin_number_counts()
+            print(f"Aggregate rebuilt. Total spins: {get_total_spins_count()}")
+        mismatches = verify_spin_number_counts()
+        for number, (stored, actual) in mismatches.items():
+            print(f"Number {number}: aggregate {stored}, spins table {actual}")
+        print("Aggregate is out of sync." if mismatches else "Aggregate matches the spins table.")
+        raise SystemExit(1 if mismatches else 0)
+
     # Basic test and initialization when run directly
     print("Initializing database...")
     init_db()
@@ -0,0 +1,155 @@
+# Persistent, append-only store of the spins table's numbers for training.
+#
+# The models in train_models take the last FEATURE_WINDOW_SIZE spins as
+# their inputs (which is also all prediction_engine builds from a session
+# history), so the one column they need is the spin numbers themselves. The
+# store keeps them, in spins-table id order, in a .npy file that is read
+# back memory-mapped, so training reads them straight from disk instead of
+# loading the whole table from SQL on every run. sync() appends only the
+# spins stored since the last sync.
+import json
+import os
+import threading
+
+import numpy as np
+
+try:
+    from . import database_manager
+except ImportError:
+    import database_manager
+
+INITIAL_CAPACITY = 4096 # Rows allocated in the numbers file; doubled when full
+NUMBER_DTYPE = np.uint8
+
+_NUMBERS_FILENAME = "number.npy"
+_METADATA_FILENAME = "metadata.json"
+_sync_lock = threading.Lock()
+
+
+def default_store_directory() -> str:
+    """The feature store of the current database lives next to it."""
+    return f"{database_manager.DATABASE_NAME}.features"
+
+
+class FeatureStore:
+    """
+    Memory-mapped spin numbers for every spin in the spins table.
+
+    The numbers file is preallocated (INITIAL_CAPACITY rows, doubled when
+    full). metadata.json records how many rows are valid and the id of the
+    last spin included; it is replaced atomically after the data is
+    written, so an interrupted append is simply redone by the next sync().
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or default_store_directory()
+        self._load_metadata()
+
+    def _load_metadata(self):
+        path = os.path.join(self.directory, _METADATA_FILENAME)
+        metadata = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                metadata = json.load(f)
+        if metadata.get("columns") != ["number"]:
+            metadata = {} # Built by a version that stored derived columns too: start over
+        self.length = metadata.get("length", 0)
+        self.capacity = metadata.get("capacity", 0)
+        self.last_spin_id = metadata.get("last_spin_id", 0)
+
+    def _save_metadata(self):
+        metadata = {
+            "length": self.length,
+            "capacity": self.capacity,
+            "last_spin_id": self.last_spin_id,
+            "columns": ["number"],
+        }
+        path = os.path.join(self.directory, _METADATA_FILENAME)
+        with open(path + ".tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(path + ".tmp", path)
+
+    def _numbers_path(self) -> str:
+        return os.path.join(self.directory, _NUMBERS_FILENAME)
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self.capacity:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        capacity = max(rows, 2 * self.capacity, INITIAL_CAPACITY)
+        path = self._numbers_path()
+        grown = np.lib.format.open_memmap(path + ".tmp", mode='w+', dtype=NUMBER_DTYPE, shape=(capacity,))
+        if self.length:
+            grown[:self.length] = np.load(path, mmap_mode='r')[:self.length]
+        grown.flush()
+        del grown
+        os.replace(path + ".tmp", path)
+        self.capacity = capacity
+
+    def numbers(self) -> np.ndarray:
+        """Returns a read-only memory-mapped view of the stored spin numbers (length rows)."""
+        if self.length == 0:
+            return np.zeros(0, dtype=NUMBER_DTYPE)
+        return np.load(self._numbers_path(), mmap_mode='r')[:self.length]
+
+    def append(self, numbers, last_spin_id: int = None):
+        """
+        Stores new spins after the existing rows.
+
+        Args:
+            numbers: The new spin numbers (0-36), in order.
+            last_spin_id: The spins-table id of the last new spin, if they came from the database.
+        """
+        numbers = np.asarray(numbers, dtype=NUMBER_DTYPE)
+        if len(numbers):
+            self._ensure_capacity(self.length + len(numbers))
+            stored = np.load(self._numbers_path(), mmap_mode='r+')
+            stored[self.length:self.length + len(numbers)] = numbers
+            stored.flush()
+            self.length += len(numbers)
+        if last_spin_id is not None:
+            self.last_spin_id = int(last_spin_id)
+        if len(numbers) or last_spin_id is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._save_metadata()
+
+    def clear(self):
+        """Forgets every row (the numbers file is kept and overwritten)."""
+        self.length = 0
+        self.last_spin_id = 0
+        if os.path.isdir(self.directory):
+            self._save_metadata()
+
+    def sync(self) -> int:
+        """
+        Appends the spins stored in the database since the last sync.
+        Rebuilds the store if spins it contains have since been deleted,
+        i.e. if the database no longer holds exactly `length` spins with an
+        id up to last_spin_id.
+
+        Returns:
+            The number of spins appended.
+        """
+        with _sync_lock:
+            self._load_metadata() # Another FeatureStore object may have synced since
+            if database_manager.count_spins_up_to(self.last_spin_id) != self.length:
+                print("Spins were deleted from the database; rebuilding the feature store.")
+                self.clear()
+            new_numbers, last_spin_id = database_manager.load_spins_array(after_id=self.last_spin_id)
+            self.append(new_numbers, last_spin_id)
+            return len(new_numbers)
+
+
+if __name__ == '__main__':
+    import tempfile
+    import time
+    rng = np.random.default_rng(3)
+    history = rng.integers(0, 37, size=500_000)
+    with tempfile.TemporaryDirectory() as directory:
+        store = FeatureStore(directory)
+        start = time.perf_counter()
+        for batch in np.array_split(history, 5):
+            store.append(batch)
+        print(f"Appended {store.length} spins in {time.perf_counter() - start:.2f}s")
+        print(f"Matches the history: {np.array_equal(store.numbers(), history)}")
+        print(f"Reopened length: {FeatureStore(directory).length}")
@@ -0,0 +1,90 @@
+# Pure-NumPy inference for exported random forests.
+#
+# train_models.export_forest flattens a fitted RandomForestClassifier into a
+# handful of arrays (split feature, threshold, child indices and leaf class
+# probabilities for every node of every tree) saved as an .npz file next to
+# the joblib model. CompactForest evaluates them with vectorized NumPy, so
+# serving predictions needs neither scikit-learn nor unpickling estimator
+# objects. The evaluation mirrors scikit-learn's arithmetic step by step
+# (float32 features, per-tree probabilities summed in tree order, then
+# divided by the tree count), so the results are bit-identical.
+import os
+
+import numpy as np
+
+COMPACT_MODEL_EXTENSION = ".npz"
+_ARRAY_NAMES = ("roots", "feature", "threshold", "children_left", "children_right", "leaf_index", "leaf_values", "classes")
+
+
+def compact_model_filename(model_filename: str) -> str:
+    """Returns the compact export's file name for a joblib model file."""
+    return os.path.splitext(model_filename)[0] + COMPACT_MODEL_EXTENSION
+
+
+class CompactForest:
+    """
+    A random forest classifier as flat arrays over all trees' nodes.
+
+    Attributes:
+        roots: Node index of each tree's root, in tree order.
+        feature, threshold: Split of each internal node (go left if x[feature] <= threshold).
+        children_left, children_right: Child node indices (leaves point to themselves).
+        leaf_index: Row of each leaf in leaf_values (-1 for internal nodes).
+        leaf_values: Class probabilities of each leaf, columns in classes order.
+        classes: The class labels (the forest's classes_).
+    """
+
+    def __init__(self, roots, feature, threshold, children_left, children_right, leaf_index, leaf_values, classes):
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children_left = np.asarray(children_left, dtype=np.int32)
+        self.children_right = np.asarray(children_right, dtype=np.int32)
+        self.leaf_index = np.asarray(leaf_index, dtype=np.int32)
+        self.leaf_values = np.asarray(leaf_values, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+
+    @classmethod
+    def load(cls, filename: str) -> "CompactForest":
+        with np.load(filename, allow_pickle=False) as arrays:
+            return cls(*(arrays[name] for name in _ARRAY_NAMES))
+
+    def save(self, filename: str):
+        """Saves the arrays as an uncompressed .npz, via a temporary file and an atomic rename."""
+        temp_filename = f"{filename}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(temp_filename, **{name: getattr(self, name if name != "classes" else "classes_") for name in _ARRAY_NAMES})
+            os.replace(temp_filename, filename)
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X) -> np.ndarray:
+        """Returns the leaf node reached in every tree, shape (n_samples, n_trees)."""
+        X = np.asarray(X, dtype=np.float32) # Trees compare float32 features, as scikit-learn does
+        n_samples, n_trees = len(X), len(self.roots)
+        nodes = np.tile(self.roots, n_samples) # Flat (sample, tree) pairs
+        samples = np.repeat(np.arange(n_samples), n_trees)
+        active = np.flatnonzero(self.leaf_index[nodes] < 0)
+        while len(active): # One level per step, only for pairs not yet at a leaf
+            current = nodes[active]
+            go_left = X[samples[active], self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.children_left[current], self.children_right[current])
+            nodes[active] = current
+            active = active[self.leaf_index[current] < 0]
+        return nodes.reshape(n_samples, n_trees)
+
+    def predict_proba(self, X) -> np.ndarray:
+        leaf_rows = self.leaf_index[self.apply(X)]
+        proba = np.zeros((leaf_rows.shape[0], len(self.classes_)), dtype=np.float64)
+        for tree in range(self.n_estimators): # Summed in tree order, like the forest does
+            proba += self.leaf_values[leaf_rows[:, tree]]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
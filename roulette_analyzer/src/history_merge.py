@@ -0,0 +1,70 @@
+# Merging newly entered spins into a stored history without duplicates.
+#
+# Casino history boards show the last N results, so two screenshots taken a
+# few spins apart mostly show the same numbers: the end of what is already
+# stored reappears at the start of the new input. merge_new_spins finds the
+# longest such overlap (a suffix of the history equal to a prefix of the
+# input) with the Knuth-Morris-Pratt failure function, in time linear in the
+# input, and keeps only the spins after it.
+MIN_OVERLAP_SPINS = 3 # Shorter overlaps are too likely to be genuine repeats (1 in 37 for a single number)
+
+
+def _failure_function(pattern: list[int]) -> list[int]:
+    """failure[i] = length of the longest proper prefix of pattern[:i + 1] that is also its suffix."""
+    failure = [0] * len(pattern)
+    k = 0
+    for i in range(1, len(pattern)):
+        while k and pattern[i] != pattern[k]:
+            k = failure[k - 1]
+        if pattern[i] == pattern[k]:
+            k += 1
+        failure[i] = k
+    return failure
+
+
+def longest_overlap(history: list[int], new_numbers: list[int]) -> int:
+    """
+    Length of the longest suffix of history that equals a prefix of new_numbers.
+    Only the last len(new_numbers) spins of history can take part, so the
+    work is O(len(new_numbers)) however long the history is.
+    """
+    if not history or not new_numbers:
+        return 0
+    pattern = list(new_numbers)
+    failure = _failure_function(pattern)
+    k = 0 # Length of the pattern prefix matched so far
+    for number in history[-len(pattern):]:
+        while k and (k == len(pattern) or number != pattern[k]):
+            k = failure[k - 1]
+        if number == pattern[k]:
+            k += 1
+    return k
+
+
+def merge_new_spins(history: list[int], new_numbers: list[int], min_overlap: int = MIN_OVERLAP_SPINS) -> tuple[list[int], int]:
+    """
+    Drops the part of new_numbers that repeats the end of history.
+
+    Args:
+        history: The stored spins, oldest first (only its tail is read).
+        new_numbers: The newly entered or OCRed spins, oldest first.
+        min_overlap: Overlaps shorter than this are treated as genuine repeats
+                     and kept, so entering spins one by one never loses a
+                     number that happens to repeat the previous one.
+
+    Returns:
+        A tuple (new_spins, skipped): the spins to append and how many of
+        new_numbers were skipped as already stored.
+    """
+    overlap = longest_overlap(history, new_numbers)
+    if overlap < min_overlap:
+        overlap = 0
+    return list(new_numbers[overlap:]), overlap
+
+
+if __name__ == '__main__':
+    stored = [5, 17, 32, 0, 21, 4, 9]
+    screenshot = [0, 21, 4, 9, 13, 26]
+    new_spins, skipped = merge_new_spins(stored, screenshot)
+    print(f"Stored tail: {stored}, screenshot: {screenshot}")
+    print(f"Append {new_spins}, skipped {skipped} already stored")
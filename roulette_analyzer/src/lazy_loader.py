@@ -0,0 +1,43 @@
+# Deferred imports for the web app's heavy subsystems.
+#
+# Most requests only read and write spins, but importing OCR (pytesseract,
+# Pillow), training (scikit-learn) and ML inference (joblib) used to make up
+# most of the app's cold start. A LazyModule stands in for such a module and
+# imports it on first attribute access, so only the requests that need a
+# subsystem pay for loading it:
+#     prediction_engine = LazyModule('prediction_engine')
+#     prediction_engine.generate_predictions(...) # Imported here, once
+import importlib
+import time
+
+
+class LazyModule:
+    """A placeholder for a module that is imported the first time one of its attributes is used."""
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+        self.load_seconds = None # Time the import took, once loaded
+
+    def load(self):
+        """Imports the module if that has not happened yet and returns it."""
+        if self._module is None:
+            start_time = time.perf_counter()
+            module = importlib.import_module(self._module_name) # Thread-safe; concurrent first uses import once
+            self.load_seconds = time.perf_counter() - start_time
+            self._module = module
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not set in __init__, i.e. the module's own
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name) # Keep copy/pickle/inspect probes from triggering the import
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._module_name!r} ({state})>"
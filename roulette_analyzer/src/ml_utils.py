@@ -5,7 +5,7 @@ def extract_sequences(numbers_history: list[int], window_size: int) -> tuple[lis
     Extracts sequences of numbers (features) and their corresponding next number (label).
 
     Args:
-        numbers_history: A list of all historical roulette numbers in order.
+        numbers_history: A list (or 1-D array) of all historical roulette numbers in order.
         window_size: The number of past spins to use as features for predicting the next.
 
     Returns:
@@ -16,7 +16,7 @@ def extract_sequences(numbers_history: list[int], window_size: int) -> tuple[lis
     X_data = []
     y_data = []
 
-    if not numbers_history or len(numbers_history) <= window_size:
+    if numbers_history is None or len(numbers_history) <= window_size:
         # Not enough data to create any sequences
         return X_data, y_data
 
@@ -29,6 +29,42 @@ def extract_sequences(numbers_history: list[int], window_size: int) -> tuple[lis
 
     return X_data, y_data
 
+def sliding_windows(numbers_history, window_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Array-backed extract_sequences: the same windows and labels, as read-only
+    views over one uint8 buffer instead of copied Python lists.
+
+    Args:
+        numbers_history: A 1-D array or list of historical roulette numbers in order.
+                         A uint8 array is used as-is (no copy); anything else is
+                         converted to one uint8 array first.
+        window_size: The number of past spins to use as features for predicting the next.
+
+    Returns:
+        A tuple containing:
+        - X (n - window_size, window_size) strided view; row i is
+          numbers_history[i : i + window_size].
+        - y (n - window_size,) view; y[i] is the number that followed row i.
+        Both are empty if the history is not longer than window_size.
+    """
+    history = np.ascontiguousarray(numbers_history, dtype=np.uint8)
+    if len(history) <= window_size:
+        return np.empty((0, window_size), dtype=np.uint8), np.empty(0, dtype=np.uint8)
+    windows = np.lib.stride_tricks.sliding_window_view(history[:-1], window_size) # Read-only by default
+    labels = history[window_size:].view()
+    labels.flags.writeable = False
+    return windows, labels
+
+def multi_window_sequences(numbers_history, window_sizes) -> dict:
+    """
+    sliding_windows for several window sizes over one shared uint8 buffer.
+
+    Returns:
+        A dictionary mapping each window size to its (X, y) views.
+    """
+    history = np.ascontiguousarray(numbers_history, dtype=np.uint8) # Converted once, shared by every view
+    return {window_size: sliding_windows(history, window_size) for window_size in window_sizes}
+
 if __name__ == '__main__':
     # Example usage for illustration and basic testing
     sample_history_1 = [10, 20, 5, 0, 15, 30, 10, 25, 3, 12, 18, 7]
@@ -69,3 +105,9 @@ if __name__ == '__main__':
         print("  Correctly returned empty X_data and y_data for empty history.")
     else:
         print(f"  Incorrectly found data for empty history: X={X4}, y={y4}")
+
+    print("\nArray-backed windows over one uint8 buffer:")
+    history_array = np.array(sample_history_1, dtype=np.uint8)
+    for size, (X, y) in multi_window_sequences(history_array, [3, 5]).items():
+        print(f"  Window {size}: X shape {X.shape}, shares memory with history: {np.shares_memory(X, history_array)}")
+        print(f"    First: {X[0].tolist()} -> {y[0]}")
@@ -0,0 +1,112 @@
+# OCR engines behind one interface.
+#
+# pytesseract runs the tesseract command line tool for every image: it writes
+# the image to a temp file, starts a process, loads the language model and
+# parses the output files. For small result strips that start-up cost is
+# most of the OCR time. TesserocrBackend instead keeps one Tesseract API
+# (through the tesserocr binding) loaded for the lifetime of the process and
+# hands it images in memory. With the batch OCR pool in ocr_pipeline that
+# gives a pool of persistent worker processes, each holding a loaded engine.
+#
+# get_backend() picks the engine named by OCR_BACKEND: "auto" uses tesserocr
+# if it is installed and can load its language data, and falls back to
+# pytesseract otherwise.
+import threading
+
+from PIL import Image
+import pytesseract
+
+OCR_BACKEND = "auto" # "auto", "tesserocr" or "pytesseract"
+TESSERACT_PSM = 6 # Single uniform block of text; skips page layout analysis
+TESSERACT_WHITELIST = "0123456789"
+TESSERACT_CONFIG = f"--psm {TESSERACT_PSM} -c tessedit_char_whitelist={TESSERACT_WHITELIST}"
+
+
+def _mean_confidence(confidences: list) -> float:
+    """Mean word confidence (0-100), None if no words were recognized."""
+    return round(sum(confidences) / len(confidences), 1) if confidences else None
+
+
+class OcrBackend:
+    """An OCR engine. recognize() returns (text, mean word confidence) for a preprocessed image."""
+
+    name = None
+
+    def recognize(self, image: Image.Image) -> tuple[str, float]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PytesseractBackend(OcrBackend):
+    """Runs the tesseract command line tool once per image."""
+
+    name = "pytesseract"
+
+    def recognize(self, image: Image.Image) -> tuple[str, float]:
+        data = pytesseract.image_to_data(image, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
+        lines, confidences = {}, []
+        for word, confidence, *line_key in zip(data["text"], data["conf"], data["block_num"], data["par_num"], data["line_num"]):
+            if word.strip():
+                lines.setdefault(tuple(line_key), []).append(word.strip())
+                confidences.append(float(confidence))
+        text = "\n".join(" ".join(words) for words in lines.values())
+        return text, _mean_confidence(confidences)
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Keeps a Tesseract API with the language model loaded and reuses it for every image.
+    Raises ImportError if tesserocr is not installed and RuntimeError if Tesseract cannot initialize.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr # Optional dependency
+        self._api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_BLOCK)
+        self._api.SetVariable("tessedit_char_whitelist", TESSERACT_WHITELIST)
+        self._lock = threading.Lock() # One API handles one image at a time
+
+    def recognize(self, image: Image.Image) -> tuple[str, float]:
+        with self._lock:
+            self._api.SetImage(image)
+            text = self._api.GetUTF8Text()
+            confidences = [float(c) for c in self._api.AllWordConfidences()]
+        lines = [" ".join(line.split()) for line in text.splitlines() if line.strip()]
+        return "\n".join(lines), _mean_confidence(confidences)
+
+    def close(self):
+        self._api.End()
+
+
+_BACKEND_CLASSES = {backend.name: backend for backend in (TesserocrBackend, PytesseractBackend)}
+_backends = {} # name -> backend instance, one per process
+_backends_lock = threading.Lock()
+
+def create_backend(name: str) -> OcrBackend:
+    """Creates the named backend ("auto" tries tesserocr, then pytesseract)."""
+    if name != "auto":
+        return _BACKEND_CLASSES[name]()
+    try:
+        return TesserocrBackend()
+    except ImportError:
+        return PytesseractBackend()
+    except RuntimeError as e:
+        print(f"tesserocr could not initialize Tesseract ({e}); using pytesseract instead.")
+        return PytesseractBackend()
+
+def get_backend(name: str = None) -> OcrBackend:
+    """The process-wide backend for name (default OCR_BACKEND), created on first use and then kept."""
+    name = name or OCR_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = create_backend(name)
+        return _backends[name]
+
+def close_backends():
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.close()
+        _backends.clear()
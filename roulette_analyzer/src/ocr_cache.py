@@ -0,0 +1,274 @@
+# Cache of OCR results, keyed by the decoded image.
+#
+# Operators often upload the same screenshot again. OcrResultCache maps a
+# SHA-256 of the decoded pixels (so a PNG re-saved with other compression
+# still matches) to the OCR result, keeping the most recently used
+# max_entries results and persisting them to a JSON file next to the
+# database, so repeated uploads skip Tesseract even after a restart. The
+# hashes of the uploaded files are kept as aliases, so an identical file is
+# found without decoding it at all.
+#
+# Optionally, a 256-bit difference hash ("perceptual hash") also matches
+# re-encoded copies whose pixels differ slightly (JPEG artefacts, a resize).
+# It is off by default: two screenshots of the same board that differ only by
+# one new result can have near-identical perceptual hashes.
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+try:
+    from . import database_manager
+except ImportError:
+    import database_manager
+
+OCR_CACHE_MAX_ENTRIES = 500
+PERCEPTUAL_HASH_SIZE = 16 # 16 x 16 gradient bits
+PERCEPTUAL_HASH_MAX_DISTANCE = 6 # Differing bits (of 256) still treated as the same image
+
+
+def default_cache_path() -> str:
+    """The OCR cache of the current database lives next to it."""
+    return f"{database_manager.DATABASE_NAME}.ocr_cache.json"
+
+
+def pixel_hash(image: Image.Image, context: str = "") -> str:
+    """
+    SHA-256 of the decoded pixels, mode and size, plus a context string
+    (e.g. the OCR settings, so changing them invalidates old entries).
+    """
+    digest = hashlib.sha256(f"{context}|{image.mode}|{image.size}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def file_hash(image_bytes: bytes, context: str = "") -> str:
+    """SHA-256 of an uploaded file's bytes plus the context string (see pixel_hash)."""
+    digest = hashlib.sha256(f"{context}|file|".encode())
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+def image_keys(image: Image.Image, context: str = "", use_perceptual_hash: bool = False) -> tuple:
+    """The (pixel hash, perceptual hash or None) cache keys of a decoded image."""
+    return pixel_hash(image, context), perceptual_hash(image) if use_perceptual_hash else None
+
+
+def is_known(keys: tuple, known_keys: tuple) -> bool:
+    """
+    Whether image_keys() output matches a known_keys() snapshot, without the
+    cache itself (e.g. in an OCR worker process).
+    """
+    pixel_key, perceptual = keys[:2]
+    known_pixel_keys, known_perceptual_hashes = known_keys
+    if pixel_key in known_pixel_keys:
+        return True
+    return perceptual is not None and any(
+        (known ^ perceptual).bit_count() <= PERCEPTUAL_HASH_MAX_DISTANCE for known in known_perceptual_hashes)
+
+
+def perceptual_hash(image: Image.Image, hash_size: int = PERCEPTUAL_HASH_SIZE) -> int:
+    """Difference hash: one bit per horizontally adjacent pair of a downscaled grayscale copy."""
+    small = image.resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR, reducing_gap=2.0).convert("L")
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return bits
+
+
+class OcrResultCache:
+    """
+    A bounded LRU cache of OCR result dictionaries. Safe to use from several threads.
+
+    Args:
+        path: JSON file the cache is loaded from and saved to (None keeps it in memory only).
+        max_entries: Results kept; the least recently used ones are evicted first.
+        use_perceptual_hash: Also match images whose perceptual hashes differ by at
+                             most PERCEPTUAL_HASH_MAX_DISTANCE bits.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = OCR_CACHE_MAX_ENTRIES, use_perceptual_hash: bool = False):
+        self.path = path
+        self.max_entries = max_entries
+        self.use_perceptual_hash = use_perceptual_hash
+        # pixel hash -> {"perceptual_hash": int or None, "file_hashes": [str], "result": dict}, oldest first
+        self._entries = OrderedDict()
+        self._file_index = {} # file hash -> pixel hash
+        self._lock = threading.Lock()
+        self.stats = {"file_hits": 0, "hits": 0, "perceptual_hits": 0, "misses": 0}
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable OCR cache {self.path}: {e}")
+            return
+        for entry in stored.get("entries", [])[-self.max_entries:]:
+            perceptual = entry.get("perceptual_hash")
+            self._entries[entry["pixel_hash"]] = {
+                "perceptual_hash": int(perceptual, 16) if perceptual is not None else None,
+                "file_hashes": entry.get("file_hashes", []),
+                "result": entry["result"],
+            }
+            for key in entry.get("file_hashes", []):
+                self._file_index[key] = entry["pixel_hash"]
+
+    def save(self):
+        """Writes the cache to its file via a temporary file and an atomic rename."""
+        if not self.path:
+            return
+        with self._lock:
+            stored = {"entries": [{
+                "pixel_hash": key,
+                "perceptual_hash": format(entry["perceptual_hash"], 'x') if entry["perceptual_hash"] is not None else None,
+                "file_hashes": entry["file_hashes"],
+                "result": entry["result"],
+            } for key, entry in self._entries.items()]}
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(stored, f)
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _find_similar(self, image_perceptual_hash: int) -> str:
+        best_key, best_distance = None, PERCEPTUAL_HASH_MAX_DISTANCE + 1
+        for key, entry in self._entries.items():
+            if entry["perceptual_hash"] is None:
+                continue
+            distance = (entry["perceptual_hash"] ^ image_perceptual_hash).bit_count()
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
+
+    def _hit(self, key: str, file_key: str = None) -> dict:
+        """Marks an entry as most recently used and returns a copy of its result."""
+        entry = self._entries[key]
+        self._entries.move_to_end(key)
+        if file_key is not None and file_key not in self._file_index:
+            entry["file_hashes"].append(file_key)
+            self._file_index[file_key] = key
+        return json.loads(json.dumps(entry["result"]))
+
+    def lookup_file(self, image_bytes: bytes, context: str = "") -> tuple[dict, str]:
+        """
+        Looks up an uploaded file by its bytes, without decoding it.
+
+        Returns:
+            A tuple (result, file_key): a copy of the cached result or None,
+            and the file's key to pass to lookup() on a miss.
+        """
+        file_key = file_hash(image_bytes, context)
+        with self._lock:
+            key = self._file_index.get(file_key)
+            if key is None:
+                return None, file_key
+            self.stats["file_hits"] += 1
+            return self._hit(key), file_key
+
+    def lookup(self, image: Image.Image, context: str = "", file_key: str = None) -> tuple[dict, tuple]:
+        """
+        Looks up the OCR result for a decoded image.
+
+        Args:
+            image: The decoded upload.
+            context: The OCR settings, see pixel_hash.
+            file_key: The upload's key from lookup_file, remembered as an alias.
+
+        Returns:
+            A tuple (result, keys): a copy of the cached result dictionary, or
+            None on a miss, and the image's keys to pass to store() afterwards.
+        """
+        return self.lookup_keys(image_keys(image, context, self.use_perceptual_hash) + (file_key,))
+
+    def lookup_keys(self, keys: tuple) -> tuple[dict, tuple]:
+        """
+        lookup() with keys computed beforehand: image_keys() of the image plus
+        the file key (or None), e.g. by an OCR worker process.
+        """
+        perceptual, file_key = keys[1], keys[2]
+        with self._lock:
+            key = keys[0] if keys[0] in self._entries else None
+            if key is not None:
+                self.stats["hits"] += 1
+            elif perceptual is not None:
+                key = self._find_similar(perceptual)
+                if key is not None:
+                    self.stats["perceptual_hits"] += 1
+            if key is None:
+                self.stats["misses"] += 1
+                return None, keys
+            return self._hit(key, file_key), keys
+
+    def known_keys(self) -> tuple:
+        """
+        A picklable snapshot of the cached images' keys, for is_known():
+        (set of pixel hashes, tuple of perceptual hashes or None if perceptual
+        matching is off).
+        """
+        with self._lock:
+            pixel_keys = frozenset(self._entries)
+            if not self.use_perceptual_hash:
+                return pixel_keys, None
+            return pixel_keys, tuple(entry["perceptual_hash"] for entry in self._entries.values()
+                                     if entry["perceptual_hash"] is not None)
+
+    def store(self, keys: tuple, result: dict, save: bool = True):
+        """Caches result under keys from lookup(), evicting the least recently used entries if full."""
+        pixel_key, perceptual, file_key = keys
+        with self._lock:
+            self._entries[pixel_key] = {"perceptual_hash": perceptual, "file_hashes": [], "result": json.loads(json.dumps(result))}
+            self._hit(pixel_key, file_key)
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                for key in evicted["file_hashes"]:
+                    self._file_index.pop(key, None)
+        if save:
+            self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._file_index.clear()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_ocr_cache() -> OcrResultCache:
+    """The process-wide cache stored at default_cache_path(), created on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.path != default_cache_path():
+            _default_cache = OcrResultCache(default_cache_path())
+        return _default_cache
+
+
+if __name__ == '__main__':
+    import sys
+    cache = get_ocr_cache()
+    if len(sys.argv) > 1 and sys.argv[1] == '--clear':
+        cache.clear()
+        print(f"Cleared OCR cache {cache.path}")
+    else:
+        print(f"OCR cache {cache.path}: {len(cache)} of {cache.max_entries} entries")
+        start_time = time.perf_counter()
+        cache.lookup(Image.effect_noise((2532, 1170), 64))
+        print(f"Pixel hash lookup of a 2532x1170 image: {(time.perf_counter() - start_time) * 1000:.1f} ms")
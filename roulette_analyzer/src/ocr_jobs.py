@@ -0,0 +1,81 @@
+# Background OCR jobs.
+#
+# OCR of a large screenshot takes seconds, and a web worker waiting for it
+# cannot serve anyone else. OcrJobManager queues uploads as background jobs
+# (see background_jobs) and returns a job id at once; the page polls the
+# job's status and picks up the numbers when it is done. The queue is
+# bounded: once max_pending jobs are queued or running, submit() raises
+# OcrQueueFull and the upload is turned away (HTTP 503 with Retry-After)
+# instead of piling up work nobody waits for. The size of each upload is
+# capped by app.py (MAX_CONTENT_LENGTH), since queued jobs keep their bytes.
+import time
+
+try:
+    from .background_jobs import BackgroundJob, JobManager, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, FINISHED_STATUSES
+except ImportError:
+    from background_jobs import BackgroundJob, JobManager, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, FINISHED_STATUSES
+
+DEFAULT_MAX_WORKERS = 2 # Jobs handled at once; each can fan out to the OCR process pool
+DEFAULT_MAX_PENDING = 16 # Queued plus running jobs before new uploads are rejected
+MAX_FINISHED_JOBS_KEPT = 100 # Older finished jobs (and their results) are forgotten
+RETRY_AFTER_SECONDS = 5
+
+
+class OcrQueueFull(Exception):
+    """Raised by OcrJobManager.submit when max_pending jobs are already queued or running."""
+
+
+class OcrJob(BackgroundJob):
+    """State of one OCR job. Read it through to_dict() from other threads."""
+
+    def __init__(self, filenames: list[str]):
+        super().__init__()
+        self.filenames = filenames
+        self.result = None
+
+    def to_dict(self) -> dict:
+        return {
+            **super().to_dict(),
+            "filenames": self.filenames,
+            "queued_seconds": round((self.started_at or time.monotonic()) - self.created_at, 2),
+            "result": self.result if self.status == JOB_SUCCEEDED else None,
+        }
+
+
+class OcrJobManager(JobManager):
+    """
+    Runs OCR functions in the background with a bounded number of pending jobs.
+
+    An OCR function is called as ocr_function(images) with the uploaded
+    files' bytes and returns the job's result (a JSON-serializable dictionary).
+    """
+
+    job_kind = "OCR"
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_pending: int = DEFAULT_MAX_PENDING):
+        super().__init__(max_workers, MAX_FINISHED_JOBS_KEPT, thread_name_prefix="ocr")
+        self.max_pending = max_pending
+        self._pending = 0
+
+    def submit(self, filenames: list[str], images: list[bytes], ocr_function) -> OcrJob:
+        """Queues an OCR job. Raises OcrQueueFull if max_pending jobs are queued or running."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise OcrQueueFull(f"{self._pending} OCR jobs are already waiting. Please try again shortly.")
+            job = OcrJob(filenames)
+            self._pending += 1
+            self._add_job(job)
+        self._start(job, images, ocr_function)
+        return job
+
+    def _execute(self, job: OcrJob, images: list[bytes], ocr_function):
+        job.result = ocr_function(images)
+        job.status = JOB_SUCCEEDED
+        job.message = "OCR completed."
+
+    def _job_finished(self, job: OcrJob):
+        self._pending -= 1
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._pending
@@ -0,0 +1,361 @@
+# OCR of roulette result screenshots.
+#
+# The upload is decoded from memory (no temp files), reduced to what Tesseract
+# needs and only then handed to it:
+#   1. decode:     Pillow reads the bytes; JPEGs are decoded straight to
+#                  grayscale at a reduced scale (draft mode) when they are
+#                  larger than needed.
+#   2. preprocess: grayscale, downscale to OCR_MAX_SIDE, Otsu threshold to
+#                  black digits on white, crop to the area holding the results.
+#   3. ocr:        Tesseract with a digits-only whitelist in single-block mode
+#                  (--psm 6), which skips the page layout analysis a full
+#                  screenshot would otherwise get. The engine is a persistent
+#                  tesserocr API when available (see ocr_backends).
+#   4. parse:      roulette numbers (0-36) from the recognized text.
+# ocr_image_bytes reports how long each stage took and how confident
+# Tesseract was. ocr_images runs a batch of screenshots on a process pool,
+# one single-threaded Tesseract job per core, and can skip images already in
+# an OcrResultCache (see ocr_cache).
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from PIL import Image, ImageOps, UnidentifiedImageError
+from pytesseract import TesseractNotFoundError # Both errors are re-exported for app.py
+
+try:
+    from .ocr_cache import OcrResultCache, get_ocr_cache, image_keys, is_known
+    from .ocr_backends import TESSERACT_CONFIG, get_backend
+    from .utils import new_process_pool
+    from .history_merge import merge_new_spins
+except ImportError:
+    from ocr_cache import OcrResultCache, get_ocr_cache, image_keys, is_known
+    from ocr_backends import TESSERACT_CONFIG, get_backend
+    from utils import new_process_pool
+    from history_merge import merge_new_spins
+
+OCR_MAX_SIDE = 1600 # Longest image side after downscaling, in pixels; results boards stay legible
+SOLID_LINE_INK_FRACTION = 0.9 # Rows/columns darker than this are borders or bars, not digits
+CROP_MARGIN = 10 # Pixels of white kept around the cropped results
+OCR_MAX_WORKERS = os.cpu_count() or 1 # Batch OCR processes, one Tesseract job per core
+
+
+def decode_image(image_bytes: bytes, max_side: int = OCR_MAX_SIDE) -> Image.Image:
+    """Decodes an uploaded image from memory. Raises PIL.UnidentifiedImageError for non-images."""
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.format == "JPEG":
+        image.draft("L", (max_side, max_side)) # Lets libjpeg skip work: grayscale, scaled by 1/2, 1/4 or 1/8
+    image.load()
+    return image
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Returns the gray level that best separates dark from light pixels (Otsu's method)."""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_dark = np.cumsum(histogram)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(histogram * levels)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_dark = sum_dark / weight_dark
+        mean_light = (sum_dark[-1] - sum_dark) / weight_light
+        between_class_variance = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(np.nan_to_num(between_class_variance))) # All NaN (one gray level) gives 0
+
+
+def _content_bounds(is_ink: np.ndarray) -> tuple:
+    """Bounds (start, stop) along axis 0 of the lines holding ink, ignoring solid lines."""
+    ink_fraction = is_ink.mean(axis=1)
+    lines = np.flatnonzero((ink_fraction > 0) & (ink_fraction < SOLID_LINE_INK_FRACTION))
+    if not len(lines):
+        return 0, is_ink.shape[0]
+    return max(lines[0] - CROP_MARGIN, 0), min(lines[-1] + 1 + CROP_MARGIN, is_ink.shape[0])
+
+
+def preprocess_image(image: Image.Image, max_side: int = OCR_MAX_SIDE, crop_box: tuple = None) -> Image.Image:
+    """
+    Prepares a screenshot for Tesseract.
+
+    Args:
+        image: The decoded screenshot.
+        max_side: Longest side of the downscaled image.
+        crop_box: Optional (left, top, right, bottom) fractions of the image
+                  holding the results strip for a known table layout. Without
+                  it the image is cropped to the bounding box of its text.
+
+    Returns:
+        A black-on-white binary ("L" mode) image.
+    """
+    image = ImageOps.exif_transpose(image).convert("L")
+    if crop_box is not None:
+        left, top, right, bottom = crop_box
+        image = image.crop((round(left * image.width), round(top * image.height),
+                            round(right * image.width), round(bottom * image.height)))
+    if max(image.size) > max_side:
+        scale = max_side / max(image.size)
+        image = image.resize((max(round(image.width * scale), 1), max(round(image.height * scale), 1)), Image.Resampling.BILINEAR)
+
+    gray = np.asarray(image)
+    is_dark = gray <= otsu_threshold(gray)
+    # Text is the minority class: light digits on a dark table become dark digits on white
+    is_ink = is_dark if is_dark.mean() <= 0.5 else ~is_dark
+
+    if crop_box is None:
+        top, bottom = _content_bounds(is_ink)
+        left, right = _content_bounds(is_ink[top:bottom].T)
+        is_ink = is_ink[top:bottom, left:right]
+    return Image.fromarray(np.where(is_ink, 0, 255).astype(np.uint8), mode="L")
+
+
+def run_tesseract(image: Image.Image) -> tuple[str, float]:
+    """
+    Recognizes the digits in a preprocessed image with this process's OCR backend.
+    Raises TesseractNotFoundError if the pytesseract backend cannot find Tesseract.
+
+    Returns:
+        A tuple (text, confidence): the recognized words, one line per text
+        line, and Tesseract's mean word confidence (0-100, None if no words).
+    """
+    return get_backend().recognize(image)
+
+
+def parse_numbers_from_ocr_text(text: str) -> list[int]:
+    """
+    Extracts roulette numbers (0-36) from OCR text, in reading order.
+    Tokens are separated by whitespace, commas or semicolons; anything else is dropped.
+    """
+    cleaned_text = re.sub(r'[^0-9\s,;]', '', text)
+    numbers = []
+    for token in re.split(r'[\s,;]+', cleaned_text):
+        if token.isdigit() and 0 <= int(token) <= 36:
+            numbers.append(int(token))
+    return numbers
+
+
+def ocr_image_bytes(image_bytes: bytes, crop_box: tuple = None) -> dict:
+    """
+    Runs the whole pipeline on an uploaded image.
+
+    Returns:
+        A dictionary with the recognized "text", the parsed "numbers",
+        Tesseract's mean word "confidence", the preprocessed "image_size", the
+        OCR "backend" used and per-stage "timings" in milliseconds (decode,
+        preprocess, ocr, parse and total).
+    """
+    start_time = time.perf_counter()
+    image = decode_image(image_bytes)
+    return ocr_decoded_image(image, crop_box, {"decode": round((time.perf_counter() - start_time) * 1000, 2)}, start_time)
+
+
+def ocr_decoded_image(image: Image.Image, crop_box: tuple = None, timings: dict = None, start_time: float = None) -> dict:
+    """
+    The pipeline after decoding, for an image from decode_image. timings and
+    start_time carry the earlier stages' timings and the pipeline's start
+    (time.perf_counter()) into the result; see ocr_image_bytes.
+    """
+    timings = dict(timings or {})
+    stage_start = time.perf_counter()
+    if start_time is None:
+        start_time = stage_start
+
+    def finish_stage(stage: str):
+        nonlocal stage_start
+        now = time.perf_counter()
+        timings[stage] = round((now - stage_start) * 1000, 2)
+        stage_start = now
+
+    image = preprocess_image(image, crop_box=crop_box)
+    finish_stage("preprocess")
+    text, confidence = run_tesseract(image)
+    finish_stage("ocr")
+    numbers = parse_numbers_from_ocr_text(text)
+    finish_stage("parse")
+    timings["total"] = round((time.perf_counter() - start_time) * 1000, 2)
+    return {"text": text, "numbers": numbers, "confidence": confidence, "image_size": image.size,
+            "backend": get_backend().name, "timings": timings}
+
+
+# --- Batch OCR ---
+# The pool is created on first use and kept, so later batches skip the worker start-up.
+# Workers come from a forkserver, not a fork of the web process (see utils.POOL_START_METHOD).
+# A pool broken by a dying worker (crash, OOM kill) is replaced on next use.
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def _init_ocr_worker():
+    # Tesseract would otherwise start one OpenMP thread per core in every worker process
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    get_backend() # Load the engine (and its language model) before the first job
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = new_process_pool(OCR_MAX_WORKERS, initializer=_init_ocr_worker)
+        return _ocr_pool
+
+def _discard_broken_ocr_pool(pool: ProcessPoolExecutor):
+    """Drops pool if it is still the current one (another thread may have replaced it already)."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is pool:
+            _ocr_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_ocr_pool(wait: bool = True):
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=wait)
+            _ocr_pool = None
+
+def _ocr_task(image_bytes: bytes, crop_box: tuple = None, cache_context: str = None, known_keys: tuple = None) -> dict:
+    """
+    ocr_image_bytes for one batch item; failures are returned as an "error" instead of raised.
+
+    With a cache_context, the image's cache keys are computed right after
+    decoding and returned as "cache_keys". If they match known_keys (an
+    OcrResultCache.known_keys() snapshot), the image is not OCRed: the result
+    is just {"cache_keys": ..., "cache_hit": True, "timings": ...} and the
+    caller takes the result from its cache.
+    """
+    try:
+        if cache_context is None:
+            return ocr_image_bytes(image_bytes, crop_box)
+        start_time = time.perf_counter()
+        image = decode_image(image_bytes)
+        keys = image_keys(image, cache_context, use_perceptual_hash=known_keys[1] is not None)
+        elapsed_ms = round((time.perf_counter() - start_time) * 1000, 2)
+        if is_known(keys, known_keys):
+            return {"cache_keys": keys, "cache_hit": True, "timings": {"cache": elapsed_ms, "total": elapsed_ms}}
+        result = ocr_decoded_image(image, crop_box, {"decode": elapsed_ms}, start_time)
+        result["cache_keys"] = keys
+        return result
+    except TesseractNotFoundError:
+        return {"error": "Tesseract OCR engine is not installed or not found in PATH.", "tesseract_missing": True}
+    except UnidentifiedImageError:
+        return {"error": "The file could not be read as an image."}
+    except Exception as e:
+        return {"error": f"OCR failed: {e}"}
+
+def _run_ocr_tasks(images: list[bytes], crop_box: tuple = None, in_worker_processes: bool = False,
+                   cache_context: str = None, known_keys: tuple = None) -> list[dict]:
+    if not images:
+        return []
+    task_arguments = ([crop_box] * len(images), [cache_context] * len(images), [known_keys] * len(images))
+    if not in_worker_processes and (len(images) <= 1 or OCR_MAX_WORKERS <= 1):
+        return list(map(_ocr_task, images, *task_arguments))
+    pool = _get_ocr_pool()
+    try:
+        return list(pool.map(_ocr_task, images, *task_arguments))
+    except BrokenProcessPool:
+        print("An OCR worker process died; restarting the OCR pool and retrying once.")
+        _discard_broken_ocr_pool(pool)
+        return list(_get_ocr_pool().map(_ocr_task, images, *task_arguments))
+
+def _cache_context(crop_box: tuple = None) -> str:
+    """Settings that change the OCR result; part of every cache key."""
+    return f"{TESSERACT_CONFIG}|{OCR_MAX_SIDE}|{crop_box}"
+
+def ocr_images(images: list[bytes], crop_box: tuple = None, cache: OcrResultCache = None,
+               in_worker_processes: bool = False) -> list[dict]:
+    """
+    Runs the pipeline on several screenshots, in parallel when there is more than one.
+
+    Args:
+        images: The uploaded files' bytes.
+        crop_box: Optional results strip location, see preprocess_image.
+        cache: Optional OcrResultCache. Images found in it are not OCRed again
+               (their results have "cached": True and only a "cache" and
+               "total" timing); new results are added to it. Identical files
+               are found here by their bytes; decoding and the pixel hash of
+               the others happen in the OCR task, which skips Tesseract for
+               images already cached.
+        in_worker_processes: Use the process pool even for a single image or
+                             a single worker, keeping OCR (and decoding) off
+                             the calling process.
+
+    Returns:
+        One ocr_image_bytes-style dictionary per image, in the order given.
+        An image that could not be processed gets a dictionary with an
+        "error" message (and "tesseract_missing": True if Tesseract is not
+        installed) instead, so one bad file does not fail the batch.
+    """
+    results = [None] * len(images)
+    pending = [] # (index, file key or None) of the images to hand to OCR tasks
+    for i, image_bytes in enumerate(images):
+        file_key = None
+        if cache is not None:
+            start_time = time.perf_counter()
+            cached, file_key = cache.lookup_file(image_bytes, _cache_context(crop_box))
+            if cached is not None:
+                elapsed_ms = round((time.perf_counter() - start_time) * 1000, 2)
+                results[i] = dict(cached, cached=True, timings={"cache": elapsed_ms, "total": elapsed_ms})
+                continue
+        pending.append((i, file_key))
+
+    cache_context = _cache_context(crop_box) if cache is not None else None
+    known_keys = cache.known_keys() if cache is not None else None
+    stored = False
+    while pending:
+        computed = _run_ocr_tasks([images[i] for i, _ in pending], crop_box, in_worker_processes, cache_context, known_keys)
+        evicted = [] # Known to the task, but evicted from the cache before it finished
+        for (i, file_key), result in zip(pending, computed):
+            keys = result.pop("cache_keys", None)
+            if keys is not None:
+                cached, keys = cache.lookup_keys(tuple(keys) + (file_key,))
+                if result.pop("cache_hit", False):
+                    if cached is None:
+                        evicted.append((i, file_key))
+                        continue
+                    result = dict(cached, cached=True, timings=result["timings"])
+                elif "error" not in result:
+                    cache.store(keys, result, save=False)
+                    stored = True
+            results[i] = result
+        if evicted: # OCR them without consulting the cache again
+            known_keys = (frozenset(), None if known_keys[1] is None else ())
+        pending = evicted
+    if stored:
+        cache.save()
+    return results
+
+
+def merge_batch_numbers(results: list[dict]) -> list[int]:
+    """
+    The numbers of all successfully processed images, joined in upload order.
+    Screenshots of the same board taken a few spins apart overlap, so each
+    image's leading spins that repeat the end of the numbers so far are
+    dropped (see history_merge.merge_new_spins).
+    """
+    merged = []
+    for result in results:
+        if "error" not in result:
+            merged += merge_new_spins(merged, result["numbers"])[0]
+    return merged
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python src/ocr_pipeline.py <screenshot> [...]")
+        sys.exit(1)
+    images = []
+    for path in sys.argv[1:]:
+        with open(path, 'rb') as f:
+            images.append(f.read())
+    start_time = time.perf_counter()
+    results = ocr_images(images)
+    for path, result in zip(sys.argv[1:], results):
+        if "error" in result:
+            print(f"{path}: {result['error']}")
+        else:
+            print(f"{path}: {result['numbers']} (confidence {result['confidence']})")
+            print(f"    timings (ms): {result['timings']}")
+    print(f"{len(images)} images in {time.perf_counter() - start_time:.2f}s with {OCR_MAX_WORKERS} workers")
+    shutdown_ocr_pool()
@@ -2,14 +2,17 @@
 
 from collections import Counter
 import os
+import threading
 import joblib
 import numpy as np
 
 # Assuming ml_utils is in the same 'src' package
 try:
     from .ml_utils import extract_sequences
+    from .forest_inference import COMPACT_MODEL_EXTENSION, CompactForest, compact_model_filename
 except ImportError:
     from ml_utils import extract_sequences
+    from forest_inference import COMPACT_MODEL_EXTENSION, CompactForest, compact_model_filename
 
 # Define model path and feature window size (must match training)
 MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models'))
@@ -18,6 +21,12 @@ COLUMN_MODEL_FILENAME = os.path.join(MODEL_DIR, 'predict_next_column_model.jobli
 SECTION_MODEL_FILENAME = os.path.join(MODEL_DIR, 'predict_next_section_model.joblib') # For V/T/O/Z etc.
 NUMBER_MODEL_FILENAME = os.path.join(MODEL_DIR, 'predict_next_number_model.joblib')
 
+ALL_MODEL_FILENAMES = (DOZEN_MODEL_FILENAME, COLUMN_MODEL_FILENAME, SECTION_MODEL_FILENAME, NUMBER_MODEL_FILENAME)
+
+# Predict with the NumPy-only export of a forest (see forest_inference) when
+# one at least as new as the joblib file exists; it needs no scikit-learn.
+USE_COMPACT_MODELS = True
+
 FEATURE_WINDOW_SIZE = 5 # Assuming all models use the same window size for now
 
 MAX_PREDICTED_NUMBERS = 5
@@ -28,69 +37,199 @@ MAX_PREDICTED_HALVES_STATISTICAL = 1
 MAX_PREDICTED_EVEN_ODD_STATISTICAL = 1
 
 
-def _get_ml_prediction(model_filename: str, model_name: str, current_numbers_history: list[int], feature_window_size: int, value_map: dict = None) -> dict:
+# --- Model cache ---
+# Unpickling a forest takes far longer than predicting with it, so loaded
+# models are kept in memory. Each entry remembers the file's (mtime, size,
+# inode) and is reloaded as soon as the file on disk changes, e.g. after
+# train_models saves a newly trained model.
+_model_cache = {} # model_filename -> (file_signature, model)
+_model_cache_lock = threading.Lock()
+_model_cache_stats = {"hits": 0, "misses": 0, "reloads": 0}
+
+def _file_signature(model_filename: str) -> tuple:
+    stat = os.stat(model_filename)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def resolve_model_file(model_filename: str) -> str:
     """
-    Generic helper to load a trained model and predict for the current history.
-    Returns a dictionary with the prediction or error/status.
+    Returns the file to predict with for a joblib model file: its compact
+    .npz export if USE_COMPACT_MODELS is set and the export is not older
+    than the joblib file, otherwise model_filename itself.
     """
-    prediction_result = {
+    if not USE_COMPACT_MODELS:
+        return model_filename
+    compact_filename = compact_model_filename(model_filename)
+    try:
+        compact_mtime = os.stat(compact_filename).st_mtime_ns
+    except OSError:
+        return model_filename
+    try:
+        if compact_mtime < os.stat(model_filename).st_mtime_ns:
+            return model_filename # Stale export, e.g. the joblib file was replaced by hand
+    except OSError:
+        pass # Only the compact export was deployed
+    return compact_filename
+
+def load_model(model_filename: str):
+    """
+    Returns the model stored in model_filename, loading it only if it is not
+    cached or the file has changed since it was cached. .npz files are loaded
+    as a CompactForest, anything else with joblib.
+    Raises OSError if the file does not exist, and whatever the loader
+    raises if it cannot be read.
+    """
+    signature = _file_signature(model_filename)
+    with _model_cache_lock: # Held while loading, so concurrent requests load each file once
+        cached = _model_cache.get(model_filename)
+        if cached is not None and cached[0] == signature:
+            _model_cache_stats["hits"] += 1
+            return cached[1]
+        _model_cache_stats["misses"] += 1
+        if cached is not None:
+            _model_cache_stats["reloads"] += 1
+        if model_filename.endswith(COMPACT_MODEL_EXTENSION):
+            model = CompactForest.load(model_filename)
+        else:
+            model = joblib.load(model_filename)
+        _model_cache[model_filename] = (signature, model)
+        return model
+
+def preload_models(model_filenames=ALL_MODEL_FILENAMES, background: bool = True):
+    """
+    Loads every existing model file into the cache.
+
+    Args:
+        model_filenames: The model files to load; missing ones are skipped.
+        background: If True, loads in a daemon thread and returns the thread
+                    right away; otherwise loads before returning None.
+    """
+    def load_all():
+        for model_filename in model_filenames:
+            model_filename = resolve_model_file(model_filename)
+            if os.path.exists(model_filename):
+                try:
+                    load_model(model_filename)
+                except Exception as e:
+                    print(f"Could not preload model {os.path.basename(model_filename)}: {e}")
+
+    if not background:
+        load_all()
+        return None
+    thread = threading.Thread(target=load_all, name="model-preload", daemon=True)
+    thread.start()
+    return thread
+
+def get_model_cache_stats() -> dict:
+    """Returns the cache's hit, miss and reload counters and the number of cached models."""
+    with _model_cache_lock:
+        stats = dict(_model_cache_stats)
+        stats["cached_models"] = len(_model_cache)
+    return stats
+
+def clear_model_cache():
+    """Drops all cached models and resets the counters."""
+    with _model_cache_lock:
+        _model_cache.clear()
+        for key in _model_cache_stats:
+            _model_cache_stats[key] = 0
+
+
+def _format_ml_prediction(prediction_result: dict, predicted_code, value_map: dict = None):
+    """Fills in the prediction text for a model output code."""
+    if value_map:
+        prediction_result["prediction"] = value_map.get(predicted_code, f"Unknown Code: {predicted_code}")
+    else: # For direct number prediction
+        prediction_result["prediction"] = str(predicted_code) # Ensure it's string for consistency
+    prediction_result["status"] = "Prediction successful."
+
+
+def _batch_ml_predictions(model_filename: str, model_name: str, histories: list[list[int]], feature_window_size: int,
+                          value_map: dict = None, include_probabilities: bool = False) -> list[dict]:
+    """
+    Predicts with one model for many histories: the last feature_window_size
+    spins of every long enough history are stacked into one matrix, and the
+    model is called once for all of them.
+    Returns one _get_ml_prediction-style dictionary per history, in order.
+    """
+    results = [{
         "model_name": model_name,
         "prediction": "N/A",
         "status": "",
-        # "probabilities": {} # Optional placeholder
-    }
+    } for _ in histories]
 
     # MODEL_DIR is created by train_models.py if it doesn't exist.
-    # Here, we just check for the specific model file.
+    # Here, we just check for the specific model file (or its compact export).
+    model_filename = resolve_model_file(model_filename)
     if not os.path.exists(model_filename):
-        prediction_result["status"] = "Model file not found. Please train the corresponding AI/ML model first."
-        return prediction_result
-
-    if len(current_numbers_history) < feature_window_size:
-        prediction_result["status"] = f"Not enough data. Need at least {feature_window_size} spins for this AI/ML prediction."
-        return prediction_result
+        for prediction_result in results:
+            prediction_result["status"] = "Model file not found. Please train the corresponding AI/ML model first."
+        return results
+
+    eligible = []
+    for i, history in enumerate(histories):
+        if len(history) < feature_window_size:
+            results[i]["status"] = f"Not enough data. Need at least {feature_window_size} spins for this AI/ML prediction."
+        else:
+            eligible.append(i)
+    if not eligible:
+        return results
 
     try:
-        model = joblib.load(model_filename)
+        model = load_model(model_filename)
     except Exception as e:
-        prediction_result["status"] = f"Error loading model ({os.path.basename(model_filename)}): {str(e)}"
-        return prediction_result
-
-    last_sequence = np.array([current_numbers_history[-feature_window_size:]])
+        for i in eligible:
+            results[i]["status"] = f"Error loading model ({os.path.basename(model_filename)}): {str(e)}"
+        return results
 
-    if last_sequence.shape[1] != feature_window_size:
-        prediction_result["status"] = "Error preparing feature vector (sequence too short for window)."
-        return prediction_result
+    last_sequences = np.array([histories[i][-feature_window_size:] for i in eligible]) # (len(eligible), window)
 
     try:
-        predicted_code = model.predict(last_sequence)[0]
-        # if hasattr(model, 'predict_proba'):
-        #    probabilities = model.predict_proba(last_sequence)[0]
-        #    # Example: prediction_result["probabilities"] = dict(zip(model.classes_, probabilities))
-
-        if value_map:
-            prediction_result["prediction"] = value_map.get(predicted_code, f"Unknown Code: {predicted_code}")
-        else: # For direct number prediction
-            prediction_result["prediction"] = str(predicted_code) # Ensure it's string for consistency
-
-        prediction_result["status"] = "Prediction successful."
+        probabilities = None
+        if include_probabilities and hasattr(model, 'predict_proba'):
+            probabilities = model.predict_proba(last_sequences)
+            predicted_codes = model.classes_[np.argmax(probabilities, axis=1)] # Same as model.predict for forests
+        else:
+            predicted_codes = model.predict(last_sequences)
     except Exception as e:
-        prediction_result["status"] = f"Error during prediction with {os.path.basename(model_filename)}: {str(e)}"
+        for i in eligible:
+            results[i]["status"] = f"Error during prediction with {os.path.basename(model_filename)}: {str(e)}"
+        return results
 
-    return prediction_result
+    for row, i in enumerate(eligible):
+        _format_ml_prediction(results[i], predicted_codes[row], value_map)
+        if probabilities is not None:
+            results[i]["probabilities"] = {
+                (value_map.get(code, str(code)) if value_map else str(code)): round(float(p), 4)
+                for code, p in zip(model.classes_, probabilities[row])
+            }
+    return results
 
 
-def generate_predictions(analysis_results: dict, results_history: list[int]) -> dict:
+def _get_ml_prediction(model_filename: str, model_name: str, current_numbers_history: list[int], feature_window_size: int, value_map: dict = None) -> dict:
     """
-    Generates predictions based on the comprehensive analysis results,
-    including both statistical and ML-based predictions.
+    Generic helper to get a trained model (from the model cache) and predict for the current history.
+    Returns a dictionary with the prediction or error/status.
     """
-    # Initialize from statistical analysis if available, or set up structure
-    # This assumes analysis_results might contain 'statistical_predictions' and 'prediction_summary' from a prior step
-    # or that this function is the sole generator of all predictions.
-    # For clarity, this function will now generate statistical predictions internally first.
+    return _batch_ml_predictions(model_filename, model_name, [current_numbers_history], feature_window_size, value_map)[0]
+
+
+def _ml_model_configs() -> list[dict]:
+    """The ML models run for every prediction, in display order."""
+    # Define value maps for categorical predictions
+    dozen_map = {0: "Zero (0)", 1: "1st Dozen (1-12)", 2: "2nd Dozen (13-24)", 3: "3rd Dozen (25-36)"}
+    column_map = {0: "Zero (0)", 1: "Column 1", 2: "Column 2", 3: "Column 3"} # Assuming 0 for Zero's column if trained that way
+    section_map = {0: "Zero (0)", 1: "Voisins du Zéro", 2: "Tiers du Cylindre", 3: "Orphelins"} # Example mapping
+
+    return [
+        {"file": DOZEN_MODEL_FILENAME, "name": "Next Dozen (AI/ML)", "map": dozen_map},
+        {"file": COLUMN_MODEL_FILENAME, "name": "Next Column (AI/ML)", "map": column_map},
+        {"file": SECTION_MODEL_FILENAME, "name": "Next Section (AI/ML)", "map": section_map},
+        {"file": NUMBER_MODEL_FILENAME, "name": "Next Number (AI/ML)", "map": None},
+    ]
+
 
-    predictions = {
+def _new_predictions() -> dict:
+    return {
         "predicted_numbers": [],
         "predicted_dozens": [],
         "predicted_columns": [],
@@ -104,6 +243,8 @@ def generate_predictions(analysis_results: dict, results_history: list[int]) ->
         "confidence_note": "Predictions are based on statistical analysis and/or AI/ML models using past results and are not guarantees of future outcomes. The more data provided, the more meaningful the analysis."
     }
 
+
+def _add_statistical_predictions(predictions: dict, analysis_results: dict):
     # --- Statistical Predictions (copied and adapted from previous version) ---
     trends = analysis_results.get('trends', {})
     patterns = analysis_results.get('patterns', {})
@@ -203,39 +344,90 @@ def generate_predictions(analysis_results: dict, results_history: list[int]) ->
     if sorted_eo_candidates:
         predictions["prediction_summary"].append(f"Statistically suggesting Even/Odd bets that are trending.")
 
+
+def _add_ml_prediction(predictions: dict, ml_pred_info: dict):
+    predictions['ml_based_predictions'].append(ml_pred_info)
+
+    # Add to summary only if there's a meaningful status or prediction
+    if ml_pred_info["prediction"] != "N/A" and "successful" in ml_pred_info.get("status",""):
+         predictions["prediction_summary"].append(f"{ml_pred_info['model_name']} predicts: {ml_pred_info['prediction']}.")
+    elif "Model file not found" not in ml_pred_info.get("status",""): # Don't clutter summary if model just isn't trained
+         predictions["prediction_summary"].append(f"{ml_pred_info['model_name']}: {ml_pred_info['status']}")
+
+
+def _finish_summary(predictions: dict, history_length: int):
+    # Final check for summary
+    if not predictions["prediction_summary"] and history_length > 0 :
+         predictions["prediction_summary"].append("No strong statistical indicators found; AI/ML models might need training or more data.")
+    elif history_length == 0:
+        predictions["prediction_summary"] = ["No data provided for analysis, so no predictions can be generated."] # Overwrite if empty history
+
+
+def generate_predictions(analysis_results: dict, results_history: list[int]) -> dict:
+    """
+    Generates predictions based on the comprehensive analysis results,
+    including both statistical and ML-based predictions.
+    """
+    predictions = _new_predictions()
+    _add_statistical_predictions(predictions, analysis_results)
+
     # --- ML-based Predictions ---
     if results_history: # Only run ML if there's some history
-        # Define value maps for categorical predictions
-        dozen_map = {0: "Zero (0)", 1: "1st Dozen (1-12)", 2: "2nd Dozen (13-24)", 3: "3rd Dozen (25-36)"}
-        column_map = {0: "Zero (0)", 1: "Column 1", 2: "Column 2", 3: "Column 3"} # Assuming 0 for Zero's column if trained that way
-        section_map = {0: "Zero (0)", 1: "Voisins du Zéro", 2: "Tiers du Cylindre", 3: "Orphelins"} # Example mapping
-
-        ml_preds_to_run = [
-            {"file": DOZEN_MODEL_FILENAME, "name": "Next Dozen (AI/ML)", "map": dozen_map},
-            {"file": COLUMN_MODEL_FILENAME, "name": "Next Column (AI/ML)", "map": column_map},
-            {"file": SECTION_MODEL_FILENAME, "name": "Next Section (AI/ML)", "map": section_map},
-            {"file": NUMBER_MODEL_FILENAME, "name": "Next Number (AI/ML)", "map": None},
-        ]
-
-        for ml_config in ml_preds_to_run:
+        for ml_config in _ml_model_configs():
             ml_pred_info = _get_ml_prediction(
                 ml_config["file"], ml_config["name"], results_history, FEATURE_WINDOW_SIZE, ml_config["map"]
             )
-            predictions['ml_based_predictions'].append(ml_pred_info)
+            _add_ml_prediction(predictions, ml_pred_info)
 
-            # Add to summary only if there's a meaningful status or prediction
-            if ml_pred_info["prediction"] != "N/A" and "successful" in ml_pred_info.get("status",""):
-                 predictions["prediction_summary"].append(f"{ml_pred_info['model_name']} predicts: {ml_pred_info['prediction']}.")
-            elif "Model file not found" not in ml_pred_info.get("status",""): # Don't clutter summary if model just isn't trained
-                 predictions["prediction_summary"].append(f"{ml_pred_info['model_name']}: {ml_pred_info['status']}")
+    _finish_summary(predictions, len(results_history))
+    return predictions
 
-    # Final check for summary
-    if not predictions["prediction_summary"] and len(results_history) > 0 :
-         predictions["prediction_summary"].append("No strong statistical indicators found; AI/ML models might need training or more data.")
-    elif len(results_history) == 0:
-        predictions["prediction_summary"] = ["No data provided for analysis, so no predictions can be generated."] # Overwrite if empty history
 
-    return predictions
+def batch_generate_predictions(histories: list[list[int]], analysis_results_list: list[dict] = None,
+                               include_probabilities: bool = False) -> list[dict]:
+    """
+    Generates predictions for many histories (e.g. one per table) at once.
+
+    Each ML model is loaded once and called once for all histories, with the
+    last FEATURE_WINDOW_SIZE spins of every history stacked into one matrix.
+
+    Args:
+        histories: One list of spin results per table.
+        analysis_results_list: Optional analysis results per history, as passed
+                               to generate_predictions. Computed with
+                               batch_analysis.batch_analyze_histories if omitted.
+        include_probabilities: If True, the ML predictions come from one
+                               predict_proba call per model and carry a
+                               "probabilities" dictionary (label -> probability).
+
+    Returns:
+        One generate_predictions-style dictionary per history, in order.
+    """
+    if analysis_results_list is None:
+        try:
+            from .batch_analysis import batch_analyze_histories
+        except ImportError:
+            from batch_analysis import batch_analyze_histories
+        analysis_results_list = batch_analyze_histories(histories)
+
+    predictions_list = []
+    for analysis_results in analysis_results_list:
+        predictions = _new_predictions()
+        _add_statistical_predictions(predictions, analysis_results)
+        predictions_list.append(predictions)
+
+    with_history = [i for i, history in enumerate(histories) if len(history)] # Only run ML if there's some history
+    for ml_config in _ml_model_configs():
+        ml_pred_infos = _batch_ml_predictions(
+            ml_config["file"], ml_config["name"], [histories[i] for i in with_history], FEATURE_WINDOW_SIZE,
+            ml_config["map"], include_probabilities
+        )
+        for i, ml_pred_info in zip(with_history, ml_pred_infos):
+            _add_ml_prediction(predictions_list[i], ml_pred_info)
+
+    for predictions, history in zip(predictions_list, histories):
+        _finish_summary(predictions, len(history))
+    return predictions_list
 
 
 if __name__ == '__main__':
@@ -0,0 +1,169 @@
+# Prefix-count index for frequency queries over any range of a stored history.
+import numpy as np
+
+try:
+    from .batch_analysis import CATEGORY_COLUMNS, CATEGORY_MEMBERSHIP, histograms_to_frequencies
+except ImportError:
+    from batch_analysis import CATEGORY_COLUMNS, CATEGORY_MEMBERSHIP, histograms_to_frequencies
+
+DEFAULT_WINDOW_SIZES = (50, 200, 1000) # "Last N spins" windows shown next to the full history
+
+# Row labels for window_table(), in CATEGORY_COLUMNS order
+_CATEGORY_LABELS = {
+    "color_frequencies": "{}",
+    "dozen_frequencies": "Dozen {}",
+    "column_frequencies": "Column {}",
+    "half_frequencies": "Half {}",
+    "even_odd_frequencies": "{}",
+}
+_HALF_LABELS = {1: "1-18", 2: "19-36"}
+
+
+class SpinRangeIndex:
+    """
+    Answers "how often did each number come up between spin i and j" in O(37).
+
+    The index stores cumulative per-number counts at every block_size-th
+    spin. A query [start, stop) subtracts two cumulative rows and, when the
+    bounds are not on a block boundary, adds a bincount of at most
+    2 * block_size raw spins. block_size=1 keeps a full (n + 1) x 37 prefix
+    matrix (pure O(37) queries, 148 bytes per spin); larger blocks trade a
+    little query time for proportionally less memory.
+    """
+
+    def __init__(self, results: list[int] = None, block_size: int = 1):
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1.")
+        self.block_size = block_size
+        self.total_spins = 0
+        self._spins = np.zeros(1024, dtype=np.uint8)
+        # _prefix[b] = counts of spins [0, b * block_size)
+        self._prefix = np.zeros((1024 // block_size + 1, 37), dtype=np.int32)
+        self._num_blocks = 0 # Complete blocks with a prefix row
+        if results is not None and len(results):
+            self.append(results)
+
+    def append(self, new_numbers):
+        """Appends spin results (numbers 0-36) to the index. Amortized O(37 / block_size) per spin."""
+        new_numbers = np.asarray(new_numbers, dtype=np.uint8)
+        start, end = self.total_spins, self.total_spins + len(new_numbers)
+        if end > len(self._spins):
+            grown = np.zeros(max(end, 2 * len(self._spins)), dtype=np.uint8)
+            grown[:start] = self._spins[:start]
+            self._spins = grown
+        self._spins[start:end] = new_numbers
+        self.total_spins = end
+
+        num_blocks = end // self.block_size
+        if num_blocks > self._num_blocks:
+            if num_blocks + 1 > len(self._prefix):
+                grown = np.zeros((max(num_blocks + 1, 2 * len(self._prefix)), 37), dtype=np.int32)
+                grown[:self._num_blocks + 1] = self._prefix[:self._num_blocks + 1]
+                self._prefix = grown
+            # Per-block counts for the newly completed blocks, then a running sum
+            first = self._num_blocks * self.block_size
+            block_ids = np.arange(num_blocks * self.block_size - first) // self.block_size
+            spins = self._spins[first:num_blocks * self.block_size].astype(np.int64)
+            new_blocks = num_blocks - self._num_blocks
+            block_counts = np.bincount(block_ids * 37 + spins, minlength=new_blocks * 37).reshape(new_blocks, 37)
+            self._prefix[self._num_blocks + 1:num_blocks + 1] = self._prefix[self._num_blocks] + np.cumsum(block_counts, axis=0)
+            self._num_blocks = num_blocks
+
+    def _prefix_counts(self, position: int) -> np.ndarray:
+        """Counts of spins [0, position)."""
+        block = position // self.block_size
+        counts = self._prefix[block].astype(np.int64)
+        remainder_start = block * self.block_size
+        if position > remainder_start:
+            counts = counts + np.bincount(self._spins[remainder_start:position], minlength=37)
+        return counts
+
+    def number_counts(self, start: int = None, stop: int = None) -> np.ndarray:
+        """
+        Returns the 37 per-number counts for spins [start, stop).
+        start and stop follow Python slice rules (None, negative indices).
+        """
+        start, stop, _ = slice(start, stop).indices(self.total_spins)
+        if stop <= start:
+            return np.zeros(37, dtype=np.int64)
+        return self._prefix_counts(stop) - self._prefix_counts(start)
+
+    def frequencies(self, start: int = None, stop: int = None) -> dict:
+        """Returns calculate_frequencies-style results for spins [start, stop)."""
+        counts = self.number_counts(start, stop)
+        return histograms_to_frequencies(counts, counts @ CATEGORY_MEMBERSHIP, int(counts.sum()))
+
+    def last(self, n: int) -> dict:
+        """Returns frequencies for the last n spins (all spins if fewer)."""
+        return self.frequencies(max(self.total_spins - n, 0), None)
+
+    def window_table(self, window_sizes=DEFAULT_WINDOW_SIZES) -> dict:
+        """
+        Category counts for several "last N spins" windows side by side.
+
+        Windows not smaller than the history are skipped; the full history
+        is always the last column.
+
+        Returns:
+            A dictionary with "labels" (one per window) and "rows", each row a
+            dictionary with the category "label" and its "counts" per window.
+        """
+        sizes = [size for size in window_sizes if size < self.total_spins]
+        counts = [self.number_counts(-size, None) for size in sizes] + [self.number_counts()]
+        return _window_table(sizes, counts, self.total_spins)
+
+
+def _window_table(sizes: list[int], number_counts: list, total_spins: int) -> dict:
+    """Builds a window_table() result from the per-number counts of each window and of the full history (last)."""
+    category_counts = np.array(number_counts) @ CATEGORY_MEMBERSHIP
+    rows = []
+    for k, (key, item) in enumerate(CATEGORY_COLUMNS):
+        label = _HALF_LABELS[item] if key == "half_frequencies" else str(item)
+        rows.append({"label": _CATEGORY_LABELS[key].format(label).capitalize(), "counts": category_counts[:, k].tolist()})
+    return {
+        "labels": [f"Last {size}" for size in sizes] + [f"All {total_spins}"],
+        "rows": rows,
+    }
+
+
+def recent_window_table(recent_spins: list[int], frequencies: dict, window_sizes=DEFAULT_WINDOW_SIZES) -> dict:
+    """
+    SpinRangeIndex.window_table() for a history that is not indexed, e.g. one
+    web request's view of a stored session: each window is a bincount of the
+    last spins and the full-history column comes from frequencies that are
+    kept up to date anyway (SpinStatsAccumulator.frequencies()). The cost is
+    O(max(window_sizes)) whatever the history length.
+
+    Args:
+        recent_spins: At least the last max(window_sizes) spins of the history (all of it if shorter).
+        frequencies: calculate_frequencies-style results for the whole history.
+        window_sizes: The "last N spins" windows.
+    """
+    total_spins = frequencies["total_spins"]
+    total_counts = np.zeros(37, dtype=np.int64)
+    for number, count in frequencies["number_frequencies"].items():
+        total_counts[number] = count
+    sizes = [size for size in window_sizes if size < total_spins]
+    recent = np.asarray(recent_spins, dtype=np.int64)
+    counts = [np.bincount(recent[-size:], minlength=37) for size in sizes] + [total_counts]
+    return _window_table(sizes, counts, total_spins)
+
+
+if __name__ == '__main__':
+    import time
+    rng = np.random.default_rng(0)
+    history = rng.integers(0, 37, size=1_000_000)
+    start_time = time.perf_counter()
+    index = SpinRangeIndex(history, block_size=16)
+    print(f"Indexed {index.total_spins} spins in {time.perf_counter() - start_time:.3f}s")
+
+    start_time = time.perf_counter()
+    for _ in range(1000):
+        index.number_counts(123_457, 876_543)
+    print(f"1000 range queries: {time.perf_counter() - start_time:.3f}s")
+    print(f"Matches bincount: {np.array_equal(index.number_counts(123_457, 876_543), np.bincount(history[123_457:876_543], minlength=37))}")
+
+    table = index.window_table()
+    print("  ".join(["Category".ljust(12)] + [label.rjust(12) for label in table["labels"]]))
+    for row in table["rows"]:
+        print("  ".join([row["label"].ljust(12)] + [str(c).rjust(12) for c in row["counts"]]))
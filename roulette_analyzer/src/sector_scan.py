@@ -0,0 +1,122 @@
+# Multi-scale wheel sector scan.
+#
+# Every arc on the wheel is a contiguous slice of WHEEL_ORDER, so with a
+# circular prefix sum over the per-pocket counts the hit count of any arc is
+# a single subtraction. arc_sums() evaluates every (arc size, start position)
+# pair at once - an O(37^2) array operation whose cost does not depend on how
+# many spins the counts were built from.
+import numpy as np
+
+try:
+    from .wheel_layout import WHEEL_ORDER
+except ImportError:
+    from wheel_layout import WHEEL_ORDER
+
+MIN_SECTOR_ARC_SIZE = 3
+MAX_SECTOR_ARC_SIZE = 37
+
+
+def number_counts_from_frequencies(frequencies: dict) -> np.ndarray:
+    """
+    Converts the number_frequencies of a calculate_frequencies dictionary into a
+    37-element count array indexed by number. Accepts int or str keys (as after
+    a JSON round trip).
+    """
+    number_frequencies = frequencies.get("number_frequencies", {})
+    counts = np.zeros(37, dtype=np.int64)
+    for num, count in number_frequencies.items():
+        num = int(num)
+        if 0 <= num <= 36:
+            counts[num] += count
+    return counts
+
+
+def arc_sums(number_counts, arc_sizes, wheel_order: list[int] = WHEEL_ORDER) -> np.ndarray:
+    """
+    Sums the hits of every arc of the given sizes around the wheel.
+
+    Args:
+        number_counts: Counts indexed by number, shape (..., 37). Leading
+                       dimensions (e.g. one row per table) are kept.
+        arc_sizes: The arc sizes (1-37) to evaluate.
+        wheel_order: The physical order of numbers on the wheel.
+
+    Returns:
+        An array of shape (..., len(arc_sizes), 37) where [..., k, i] is the hit
+        count of the arc of size arc_sizes[k] starting at wheel position i.
+    """
+    number_counts = np.asarray(number_counts)
+    slots = len(wheel_order)
+    pocket_counts = number_counts[..., np.asarray(wheel_order)] # counts in wheel order
+    doubled = np.concatenate((pocket_counts, pocket_counts), axis=-1)
+    prefix = np.concatenate((np.zeros(doubled.shape[:-1] + (1,), dtype=doubled.dtype), np.cumsum(doubled, axis=-1)), axis=-1)
+
+    starts = np.arange(slots)
+    ends = starts[None, :] + np.asarray(arc_sizes)[:, None]
+    return prefix[..., ends] - prefix[..., starts][..., None, :]
+
+
+def scan_wheel_sectors(number_counts, wheel_order: list[int] = WHEEL_ORDER,
+                       min_arc_size: int = MIN_SECTOR_ARC_SIZE, max_arc_size: int = MAX_SECTOR_ARC_SIZE) -> dict:
+    """
+    Finds the hottest and coldest wheel sector at every arc size.
+
+    Args:
+        number_counts: 37 counts indexed by number (e.g. np.bincount of a history,
+                       or number_counts_from_frequencies(frequencies)).
+        wheel_order: The physical order of numbers on the wheel.
+        min_arc_size: Smallest arc size to scan (default 3).
+        max_arc_size: Largest arc size to scan (default 37, the whole wheel).
+
+    Returns:
+        A dictionary with total_spins and a "scales" list, one entry per arc
+        size, holding the hottest and coldest arc in the same format as the
+        zones returned by analyze_wheel_clusters. For even arc sizes the
+        center_number is the pocket just before the middle of the arc.
+    """
+    number_counts = np.asarray(number_counts)
+    slots = len(wheel_order)
+    total_spins = int(number_counts.sum())
+    sector_scan = {"total_spins": total_spins, "scales": []}
+    if total_spins == 0:
+        sector_scan["message"] = "No spins to scan."
+        return sector_scan
+
+    arc_sizes = np.arange(min_arc_size, min(max_arc_size, slots) + 1)
+    sums = arc_sums(number_counts, arc_sizes, wheel_order)
+    hottest_starts = np.argmax(sums, axis=1)
+    coldest_starts = np.argmin(sums, axis=1)
+    expected_per_slot = total_spins / float(slots)
+
+    def arc_data(arc_size, start, observed):
+        expected = arc_size * expected_per_slot
+        arc = [wheel_order[(start + j) % slots] for j in range(arc_size)]
+        return {
+            "center_number": arc[(arc_size - 1) // 2],
+            "arc": arc,
+            "observed_freq": observed,
+            "expected_freq": round(expected, 2),
+            "percent_deviation": round((observed - expected) / expected, 2)
+        }
+
+    for k, arc_size in enumerate(arc_sizes.tolist()):
+        hot, cold = int(hottest_starts[k]), int(coldest_starts[k])
+        sector_scan["scales"].append({
+            "arc_size": arc_size,
+            "hottest": arc_data(arc_size, hot, int(sums[k, hot])),
+            "coldest": arc_data(arc_size, cold, int(sums[k, cold])),
+        })
+    sector_scan["message"] = f"Scanned arc sizes {int(arc_sizes[0])}-{int(arc_sizes[-1])}."
+    return sector_scan
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(5)
+    spins = rng.integers(0, 37, size=1_000_000)
+    spins[:20000] = rng.choice(WHEEL_ORDER[:5], size=20000) # Make the arc around 15 a little hot
+    counts = np.bincount(spins, minlength=37)
+    result = scan_wheel_sectors(counts)
+    for scale in result["scales"][:5]:
+        hot = scale["hottest"]
+        print(f"Arc size {scale['arc_size']}: hottest centered at {hot['center_number']} "
+              f"(observed {hot['observed_freq']}, expected {hot['expected_freq']}, dev {hot['percent_deviation']:.1%})")
@@ -0,0 +1,197 @@
+# Run-length streak engine backing detect_patterns.
+#
+# Every streak detect_patterns reports is a run of equal consecutive values
+# in some per-spin code:
+#   - single number streaks: the number itself
+#   - dozen / column streaks: the dozen / column (zero breaks the streak)
+#   - alternating red/black streaks: the color bit XOR the spin's parity,
+#     which stays constant exactly while the colors keep alternating
+#     (green breaks the streak)
+# So all four are found from the run boundaries (np.diff) of a single
+# 4 x n code matrix. StreakState carries the open run of each streak type,
+# which lets the streaks continue across appended spins without rescanning.
+from collections import Counter
+
+import numpy as np
+
+try:
+    from .wheel_layout import ROULETTE_WHEEL, NUMBER_TO_DOZEN, NUMBER_TO_COLUMN
+except ImportError:
+    from wheel_layout import ROULETTE_WHEEL, NUMBER_TO_DOZEN, NUMBER_TO_COLUMN
+
+MIN_SPINS_FOR_PATTERNS = 5 # Minimum spins for some basic pattern detection
+
+# Per-number lookup tables (index = roulette number). 0 means "breaks the streak".
+_COLOR_BIT = np.array([{'red': 0, 'black': 1}.get(ROULETTE_WHEEL[n], -1) for n in range(37)], dtype=np.int16)
+_DOZEN_CODE = np.array([NUMBER_TO_DOZEN[n] or 0 for n in range(37)], dtype=np.int16)
+_COLUMN_CODE = np.array([NUMBER_TO_COLUMN[n] or 0 for n in range(37)], dtype=np.int16)
+
+# Row order of the code matrix and of StreakState's run trackers
+STREAK_TYPES = ("number", "alternating_color", "dozen", "column")
+# Rows whose code 0 marks a streak breaker rather than a value (numbers can legitimately be 0)
+_ROWS_WITH_BREAKER = (False, True, True, True)
+
+
+def _streak_codes(numbers: np.ndarray, start_index: int) -> np.ndarray:
+    """
+    Builds the 4 x n code matrix (see STREAK_TYPES) for a chunk of spins.
+    start_index is the position of the chunk's first spin in the full history,
+    needed so the alternating-color parity lines up across chunks.
+    """
+    parity = (np.arange(len(numbers)) + start_index) & 1
+    color_bit = _COLOR_BIT[numbers]
+    alternating_key = np.where(color_bit >= 0, (color_bit ^ parity) + 1, 0)
+    return np.vstack((numbers, alternating_key, _DOZEN_CODE[numbers], _COLUMN_CODE[numbers])).astype(np.int16)
+
+
+def _runs(codes: np.ndarray, changes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the (values, lengths) of the runs in one code row, given its np.diff != 0 mask."""
+    starts = np.concatenate(([0], np.flatnonzero(changes) + 1))
+    lengths = np.diff(np.append(starts, len(codes)))
+    return codes[starts], lengths
+
+
+class StreakState:
+    """
+    Resumable streak tracking for a growing list of roulette results.
+
+    For each streak type it keeps the longest closed run seen so far and the
+    currently open run, plus the immediate-repeat counts. update() processes
+    a chunk of new spins in one vectorized pass; to_patterns() produces the
+    detect_patterns dictionary for all spins seen.
+    """
+
+    def __init__(self, results: list[int] = None):
+        self.total_spins = 0
+        self.last_number = None
+        # Per streak type: [open_value, open_len, best_len, best_value]
+        self.runs = {streak_type: [None, 0, 0, None] for streak_type in STREAK_TYPES}
+        self.total_immediate_repeats = 0
+        self.repeat_counts = {} # number -> immediate repeats, in order of first repeat
+        if results:
+            self.update(results)
+
+    def update(self, new_numbers: list[int]):
+        """Extends the streaks with new spin results (numbers 0-36), in order."""
+        if len(new_numbers) == 0:
+            return
+        numbers = np.asarray(new_numbers, dtype=np.int16)
+
+        # Immediate repeats, including the one joining this chunk to the previous spin
+        repeat_mask = numbers[1:] == numbers[:-1]
+        repeated = numbers[1:][repeat_mask]
+        if self.last_number is not None and numbers[0] == self.last_number:
+            repeated = np.concatenate((numbers[:1], repeated))
+        if len(repeated):
+            values, first_index, counts = np.unique(repeated, return_index=True, return_counts=True)
+            for i in np.argsort(first_index, kind="stable"):
+                number = int(values[i])
+                self.repeat_counts[number] = self.repeat_counts.get(number, 0) + int(counts[i])
+            self.total_immediate_repeats += len(repeated)
+
+        codes = _streak_codes(numbers, self.total_spins)
+        changes = np.diff(codes, axis=1) != 0
+        for row, streak_type in enumerate(STREAK_TYPES):
+            values, lengths = _runs(codes[row], changes[row])
+            if _ROWS_WITH_BREAKER[row]:
+                lengths = np.where(values == 0, 0, lengths)
+            self._extend_runs(self.runs[streak_type], values, lengths)
+
+        self.total_spins += len(numbers)
+        self.last_number = int(numbers[-1])
+
+    @staticmethod
+    def _extend_runs(run: list, values: np.ndarray, lengths: np.ndarray):
+        open_value, open_len, best_len, best_value = run
+        if open_len and values[0] == open_value:
+            # The chunk's first run continues the open run
+            lengths = lengths.copy()
+            lengths[0] += open_len
+        elif open_len > best_len:
+            # The open run ended right before this chunk
+            best_len, best_value = open_len, open_value
+
+        # All runs but the last are now closed; ties go to the earliest run
+        if len(lengths) > 1:
+            i = int(np.argmax(lengths[:-1]))
+            if lengths[i] > best_len:
+                best_len, best_value = int(lengths[i]), int(values[i])
+        run[:] = [int(values[-1]), int(lengths[-1]), best_len, best_value]
+
+    def longest(self, streak_type: str) -> tuple[int, int]:
+        """Returns (length, value) of the longest run so far, counting the open run."""
+        open_value, open_len, best_len, best_value = self.runs[streak_type]
+        if open_len > best_len:
+            return open_len, open_value
+        return best_len, best_value
+
+    def to_patterns(self) -> dict:
+        """Returns the detect_patterns dictionary for all spins seen so far."""
+        if self.total_spins < MIN_SPINS_FOR_PATTERNS:
+            return insufficient_pattern_data(self.total_spins)
+
+        number_streak, streak_number = self.longest("number")
+        alternating_streak, _ = self.longest("alternating_color")
+        dozen_streak, dozen = self.longest("dozen")
+        column_streak, column = self.longest("column")
+
+        number_repeats = {
+            "counts": Counter(self.repeat_counts),
+            "longest_streak": number_streak,
+            "number_for_longest_streak": streak_number,
+            "total_immediate_repeats": self.total_immediate_repeats,
+        }
+        if not number_repeats["counts"]:
+            del number_repeats["counts"]
+
+        return {
+            "message": "Pattern detection complete.",
+            "number_repeats": number_repeats,
+            "alternating_color_streak": alternating_streak,
+            "consecutive_dozen_streak": {"longest_streak": dozen_streak, "dozen": dozen if dozen_streak else None},
+            "consecutive_column_streak": {"longest_streak": column_streak, "column": column if column_streak else None},
+        }
+
+    def to_state(self) -> dict:
+        """Returns a JSON-serializable snapshot (see SpinStatsAccumulator.to_state)."""
+        return {
+            "total_spins": self.total_spins,
+            "last_number": self.last_number,
+            "runs": [self.runs[streak_type] for streak_type in STREAK_TYPES],
+            "total_immediate_repeats": self.total_immediate_repeats,
+            "repeat_counts": [[number, count] for number, count in self.repeat_counts.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "StreakState":
+        """Rebuilds a StreakState from a to_state() snapshot."""
+        streaks = cls()
+        streaks.total_spins = int(state.get("total_spins", 0))
+        streaks.last_number = state.get("last_number")
+        for streak_type, run in zip(STREAK_TYPES, state.get("runs", [])):
+            streaks.runs[streak_type] = list(run)
+        streaks.total_immediate_repeats = int(state.get("total_immediate_repeats", 0))
+        streaks.repeat_counts = {number: count for number, count in state.get("repeat_counts", [])}
+        return streaks
+
+
+def insufficient_pattern_data(total_spins: int) -> dict:
+    """Pattern result returned when there are fewer than MIN_SPINS_FOR_PATTERNS spins."""
+    return {
+        "message": f"Insufficient data for pattern detection (minimum {MIN_SPINS_FOR_PATTERNS} spins required, got {total_spins}).",
+        "number_repeats": {"longest_streak": 0, "number": None, "total_immediate_repeats": 0},
+        "alternating_color_streak": 0,
+        "consecutive_dozen_streak": {"longest_streak": 0, "dozen": None},
+        "consecutive_column_streak": {"longest_streak": 0, "column": None},
+    }
+
+
+if __name__ == '__main__':
+    import json
+    sample = [1, 2, 2, 3, 4, 4, 4, 5, 6, 7, 7, 8, 9, 10, 10, 10, 10, 11]
+    print(f"Sample: {sample}")
+    print(json.dumps(StreakState(sample).to_patterns(), indent=4))
+
+    resumed = StreakState(sample[:7])
+    resumed.update(sample[7:])
+    print(f"Resumed in two chunks matches single pass: {resumed.to_patterns() == StreakState(sample).to_patterns()}")
@@ -1,25 +1,46 @@
+import datetime
 import os
+from concurrent.futures import as_completed
 import joblib
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier # Example model
 # from sklearn.linear_model import LogisticRegression # Alternative
 from sklearn.metrics import accuracy_score, classification_report
+from sklearn.utils.class_weight import compute_sample_weight
 
 # Assuming database_manager and ml_utils are in the same 'src' package
 try:
-    from .database_manager import get_all_spins_for_training, get_total_spins_count # Added get_total_spins_count for example
-    from .ml_utils import extract_sequences
+    from .database_manager import count_spins_up_to
+    from .ml_utils import sliding_windows
+    from .wheel_layout import WHEEL_SECTIONS, NUMBER_TO_COLUMN
+    from .feature_store import FeatureStore
+    from .forest_inference import CompactForest, compact_model_filename
+    from .utils import new_process_pool
 except ImportError: # Handle running script directly for testing
-    from database_manager import get_all_spins_for_training, get_total_spins_count, init_db, add_multiple_spin_results
-    from ml_utils import extract_sequences
+    from database_manager import count_spins_up_to, get_total_spins_count, init_db, add_multiple_spin_results
+    from ml_utils import sliding_windows
+    from wheel_layout import WHEEL_SECTIONS, NUMBER_TO_COLUMN
+    from feature_store import FeatureStore
+    from forest_inference import CompactForest, compact_model_filename
+    from utils import new_process_pool
 
 MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models') # Place models dir in project root
 MODEL_FILENAME_DOZEN = os.path.join(MODEL_DIR, 'predict_next_dozen_model.joblib')
+MODEL_FILENAME_COLUMN = os.path.join(MODEL_DIR, 'predict_next_column_model.joblib')
+MODEL_FILENAME_SECTION = os.path.join(MODEL_DIR, 'predict_next_section_model.joblib')
+MODEL_FILENAME_NUMBER = os.path.join(MODEL_DIR, 'predict_next_number_model.joblib')
 FEATURE_WINDOW_SIZE = 5 # Number of past spins to consider for features
 
 MIN_SAMPLES_FOR_TRAINING = 50 # Minimum number of sequences needed to attempt training
 
+# Incremental training: new spins grow extra trees on the saved forest (warm_start)
+# instead of refitting it; a full refit is forced by the limits below.
+N_ESTIMATORS = 50 # Trees in a fully refitted forest
+TREES_PER_UPDATE = 10 # Trees grown from each batch of new spins
+MAX_INCREMENTAL_UPDATES = 10 # Full refit after this many incremental updates...
+MAX_TREES = 200 # ...or once the forest would grow past this many trees
+
 def get_dozen(number: int) -> int:
     """ Returns the dozen for a given roulette number (0 for 0, 1 for 1-12, etc.). """
     if not isinstance(number, int): # Basic type check
@@ -36,57 +57,290 @@ def get_dozen(number: int) -> int:
         return 3
     return -1 # Should not happen for valid numbers 0-36 if logic is correct
 
-def train_predict_next_dozen_model():
-    print("Starting model training for predicting the next dozen...")
+# Label lookup tables indexed by number, for converting whole label arrays at once.
+# As for dozens, zero gets its own class 0 for columns and wheel sections.
+DOZEN_BY_NUMBER = np.array([get_dozen(n) for n in range(37)]) # DOZEN_BY_NUMBER[n] == get_dozen(n)
+COLUMN_BY_NUMBER = np.array([NUMBER_TO_COLUMN[n] or 0 for n in range(37)])
+SECTION_NAMES = list(WHEEL_SECTIONS) # Section class k + 1 is SECTION_NAMES[k]
+SECTION_BY_NUMBER = np.array([0] + [next(k + 1 for k, name in enumerate(SECTION_NAMES) if n in WHEEL_SECTIONS[name])
+                                    for n in range(1, 37)])
+NUMBER_LABELS = np.arange(37) # The next-number model predicts the number itself
 
-    if not os.path.exists(MODEL_DIR):
-        print(f"Creating model directory: {MODEL_DIR}")
-        os.makedirs(MODEL_DIR)
+# Targets trained by train_all_models. Model files match prediction_engine's.
+TRAINING_TARGETS = {
+    "dozen": {"plural": "dozens", "labels_by_number": DOZEN_BY_NUMBER},
+    "column": {"plural": "columns", "labels_by_number": COLUMN_BY_NUMBER},
+    "section": {"plural": "sections", "labels_by_number": SECTION_BY_NUMBER},
+    "number": {"plural": "numbers", "labels_by_number": NUMBER_LABELS},
+}
 
-    # 1. Load data
-    all_spins_data = get_all_spins_for_training() # Returns list of (number, timestamp_str)
-    if not all_spins_data:
-        print("No data available from database for training.")
+def _training_targets() -> dict:
+    """TRAINING_TARGETS with each target's current model_filename."""
+    filenames = {
+        "dozen": MODEL_FILENAME_DOZEN,
+        "column": MODEL_FILENAME_COLUMN,
+        "section": MODEL_FILENAME_SECTION,
+        "number": MODEL_FILENAME_NUMBER,
+    }
+    return {name: dict(config, model_filename=filenames[name]) for name, config in TRAINING_TARGETS.items()}
+
+def export_forest(model: RandomForestClassifier) -> CompactForest:
+    """
+    Flattens a fitted forest classifier into a CompactForest, which predicts
+    with NumPy only and gives bit-identical results to model.predict_proba.
+    """
+    n_classes = len(model.classes_)
+    roots, features, thresholds, lefts, rights, leaf_indices, leaf_values = [], [], [], [], [], [], []
+    node_offset = leaf_offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count) + node_offset
+        is_leaf = tree.children_left == -1
+        leaf_index = np.full(tree.node_count, -1)
+        leaf_index[is_leaf] = np.arange(is_leaf.sum()) + leaf_offset
+
+        roots.append(node_offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        lefts.append(np.where(is_leaf, nodes, tree.children_left + node_offset)) # Leaves loop to themselves
+        rights.append(np.where(is_leaf, nodes, tree.children_right + node_offset))
+        leaf_indices.append(leaf_index)
+        leaf_values.append(tree.value[is_leaf, 0, :n_classes]) # Class fractions since scikit-learn 1.4 (see requirements.txt)
+        node_offset += tree.node_count
+        leaf_offset += int(is_leaf.sum())
+
+    return CompactForest(roots, np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+                         np.concatenate(rights), np.concatenate(leaf_indices), np.concatenate(leaf_values), model.classes_)
+
+def save_model(model, model_filename: str):
+    """
+    Saves a model with joblib via a temporary file and an atomic rename, so a
+    running app never loads a half-written file. The new modification time
+    makes prediction_engine's model cache reload it on the next prediction.
+
+    Forests are also exported next to it in the compact format (same name,
+    .npz extension), which prediction_engine prefers when it is up to date.
+    """
+    temp_filename = f"{model_filename}.{os.getpid()}.tmp"
+    try:
+        joblib.dump(model, temp_filename)
+        os.replace(temp_filename, model_filename)
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+    if isinstance(model, RandomForestClassifier):
+        export_forest(model).save(compact_model_filename(model_filename))
+
+def _no_progress(stage: str, samples: int = None):
+    pass
+
+def _now_iso() -> str:
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+def _training_metadata(last_spin_id: int, numbers_history: np.ndarray, samples_seen: int, n_estimators: int) -> dict:
+    """What a freshly refitted model has seen; stored on the model as training_metadata_."""
+    now = _now_iso()
+    return {
+        "window_size": FEATURE_WINDOW_SIZE,
+        "last_spin_id": int(last_spin_id), # High-water mark: spins with a larger id are new
+        "spins_seen": int(len(numbers_history)),
+        "samples_seen": int(samples_seen),
+        "n_estimators": int(n_estimators),
+        "full_refit_at": now,
+        "updated_at": now,
+        "updates_since_full_refit": 0,
+    }
+
+def _full_refit_reason(metadata: dict) -> str:
+    """Returns why a model must be refitted from scratch instead of updated, or None."""
+    if not metadata:
+        return "the saved model has no training metadata"
+    if metadata["window_size"] != FEATURE_WINDOW_SIZE:
+        return "the feature window size changed"
+    if metadata["updates_since_full_refit"] >= MAX_INCREMENTAL_UPDATES:
+        return f"{MAX_INCREMENTAL_UPDATES} incremental updates since the last full refit"
+    if metadata["n_estimators"] + TREES_PER_UPDATE > MAX_TREES:
+        return f"the forest would exceed {MAX_TREES} trees"
+    if count_spins_up_to(metadata["last_spin_id"]) != metadata["spins_seen"]:
+        return "spins the model was trained on have been deleted"
+    return None
+
+def _synced_feature_store(progress=None) -> FeatureStore:
+    """The feature store, brought up to date (only spins stored since its last sync are read)."""
+    (progress or _no_progress)("loading data")
+    store = FeatureStore()
+    store.sync()
+    return store
+
+def update_model_incrementally(model_filename: str, labels_by_number: np.ndarray, progress=None, store: FeatureStore = None):
+    """
+    Updates a saved forest with the spins stored since it was last trained.
+
+    The forest is loaded with its training_metadata_, the spins with an id
+    above its high-water mark are read from the feature store (the rows after
+    the spins_seen it was trained on), and TREES_PER_UPDATE new trees are
+    grown on just those windows (warm_start), weighted so every class counts
+    equally as in a full fit. The metadata is then advanced and the model saved.
+
+    Args:
+        model_filename: The saved model to update.
+        labels_by_number: Label for each number 0-36 (e.g. DOZEN_BY_NUMBER).
+        progress: Optional progress callback, as for train_predict_next_dozen_model.
+        store: A synced FeatureStore to read from (default: sync one).
+
+    Returns:
+        True if the model was updated (or has fewer than MIN_SAMPLES_FOR_TRAINING
+        new spins to learn from), False on errors, and None if it needs a full
+        refit instead (no model yet, refit policy, or new spins lacking a class).
+    """
+    progress = progress or _no_progress
+    if not os.path.exists(model_filename):
+        return None
+    try:
+        model = joblib.load(model_filename)
+    except Exception as e:
+        print(f"Could not load {model_filename} for an incremental update: {e}")
+        return None
+    metadata = getattr(model, 'training_metadata_', None)
+    reason = _full_refit_reason(metadata)
+    if reason:
+        print(f"Full refit required: {reason}.")
+        return None
+
+    if store is None:
+        store = _synced_feature_store(progress)
+    # Store rows are the spins in id order; the model has seen the first spins_seen of them
+    numbers_history, last_spin_id = store.numbers(), store.last_spin_id
+    new_numbers = numbers_history[metadata["spins_seen"]:]
+    if len(new_numbers) < MIN_SAMPLES_FOR_TRAINING:
+        print(f"Only {len(new_numbers)} new spins since the last training (need {MIN_SAMPLES_FOR_TRAINING}). Model left unchanged.")
+        return True
+    if len(new_numbers) > metadata["spins_seen"]:
+        print("More new spins than the model has seen so far. Full refit required.")
+        return None
+
+    progress("building features", samples=len(new_numbers))
+    # Windows ending in the new spins start among the last spins already seen
+    history = numbers_history[metadata["spins_seen"] - FEATURE_WINDOW_SIZE:]
+    X_new, y_next_numbers = sliding_windows(history, FEATURE_WINDOW_SIZE)
+    y_new = labels_by_number[y_next_numbers]
+    if not np.array_equal(np.unique(y_new), model.classes_):
+        # The new trees must know every class the existing ones predict
+        print("New spins do not cover every class the model predicts. Full refit required.")
+        return None
+
+    progress("training", samples=len(X_new))
+    n_estimators = len(model.estimators_) + TREES_PER_UPDATE
+    print(f"Growing the forest to {n_estimators} trees with {len(X_new)} new samples...")
+    try:
+        model.set_params(warm_start=True, n_estimators=n_estimators, oob_score=False, class_weight=None)
+        model.fit(X_new, y_new, sample_weight=compute_sample_weight('balanced', y_new))
+    except Exception as e:
+        print(f"Error during incremental training: {e}")
         return False
 
-    numbers_history = [spin[0] for spin in all_spins_data] # Extract just the numbers
+    metadata.update({
+        "last_spin_id": int(last_spin_id),
+        "spins_seen": metadata["spins_seen"] + len(new_numbers),
+        "samples_seen": metadata["samples_seen"] + len(X_new),
+        "n_estimators": n_estimators,
+        "updated_at": _now_iso(),
+        "updates_since_full_refit": metadata["updates_since_full_refit"] + 1,
+    })
+    model.training_metadata_ = metadata
+
+    progress("saving")
+    save_model(model, model_filename)
+    print(f"Model updated incrementally and saved to {model_filename}.")
+    return True
+
+def _load_training_data(progress=None, store: FeatureStore = None):
+    """
+    Loads every stored spin and builds the feature windows shared by all targets.
+
+    Args:
+        progress: Optional progress callback.
+        store: A synced FeatureStore to read from (default: sync one).
+
+    Returns:
+        A tuple (numbers_history, last_spin_id, X_sequences, y_next_numbers),
+        or None if there is not enough data to train.
+    """
+    progress = progress or _no_progress
+
+    # 1. Load data: bring the feature store up to date (only spins stored since
+    # its last sync are read from the database), then map its numbers
+    if store is None:
+        store = _synced_feature_store(progress)
+    numbers_history, last_spin_id = store.numbers(), store.last_spin_id
+    if len(numbers_history) == 0:
+        print("No data available from database for training.")
+        return None
 
     if len(numbers_history) < FEATURE_WINDOW_SIZE + 1:
         print(f"Not enough historical data (need at least {FEATURE_WINDOW_SIZE + 1} spins, got {len(numbers_history)}) to create sequences.")
-        return False
+        return None
 
     # 2. Feature Engineering
+    progress("building features", samples=len(numbers_history))
     print(f"Extracting sequences with window size {FEATURE_WINDOW_SIZE}...")
-    X_sequences, y_next_numbers = extract_sequences(numbers_history, FEATURE_WINDOW_SIZE)
+    # Read-only views over numbers_history: no per-window copies
+    X_sequences, y_next_numbers = sliding_windows(numbers_history, FEATURE_WINDOW_SIZE)
 
-    if not X_sequences: # Check if extract_sequences returned empty (should be caught by len(numbers_history) check too)
+    if len(X_sequences) == 0: # Check if sliding_windows returned empty (should be caught by len(numbers_history) check too)
         print("No sequences were extracted. Aborting training.")
-        return False
+        return None
 
     if len(X_sequences) < MIN_SAMPLES_FOR_TRAINING:
         print(f"Insufficient samples ({len(X_sequences)}) to train model. Need at least {MIN_SAMPLES_FOR_TRAINING} sequences.")
-        return False
+        return None
+
+    return numbers_history, last_spin_id, X_sequences, y_next_numbers
+
+def _fit_and_save_model(target_name: str, model_filename: str, labels_by_number: np.ndarray, X_sequences: np.ndarray,
+                        y_next_numbers: np.ndarray, numbers_history: np.ndarray, last_spin_id: int, progress=None) -> bool:
+    """
+    Fits a forest for one target on shared features, evaluates it and saves it.
+
+    Args:
+        target_name: The target's name in TRAINING_TARGETS, e.g. "dozen".
+        model_filename: Where to save the model.
+        labels_by_number: The target label for each number 0-36.
+        X_sequences: Feature windows, one row per sample.
+        y_next_numbers: The number that followed each window.
+        numbers_history, last_spin_id: The spins the features came from, for the training metadata.
+        progress: Optional progress callback.
+
+    Returns:
+        True if the model was trained and saved, False otherwise.
+    """
+    progress = progress or _no_progress
+    plural = TRAINING_TARGETS[target_name]["plural"]
 
-    # 3. Transform labels (y) to Dozens
-    y_dozens = np.array([get_dozen(n) for n in y_next_numbers if get_dozen(n) != -1])
-    # Filter X_features based on valid y_dozens (if any n in y_next_numbers was invalid for get_dozen)
-    X_features = np.array([X_sequences[i] for i, n in enumerate(y_next_numbers) if get_dozen(n) != -1])
+    # 3. Transform labels (y) to the target's classes
+    valid = y_next_numbers < len(labels_by_number) # Filter out anything that is not a roulette number
+    if valid.all():
+        y_labels = labels_by_number[y_next_numbers]
+        X_features = X_sequences # Still the view; train_test_split makes the only copy
+    else:
+        y_labels = labels_by_number[y_next_numbers[valid]]
+        X_features = X_sequences[valid]
 
-    if len(X_features) != len(y_dozens) or len(y_dozens) == 0:
-        print("Mismatch in feature/label count after filtering invalid dozens, or no valid labels. Aborting.")
+    if len(X_features) != len(y_labels) or len(y_labels) == 0:
+        print(f"Mismatch in feature/label count after filtering invalid {plural}, or no valid labels. Aborting.")
         return False
 
-    unique_classes, counts = np.unique(y_dozens, return_counts=True)
-    print(f"Unique dozen classes in labels: {unique_classes} with counts: {counts}")
+    unique_classes, counts = np.unique(y_labels, return_counts=True)
+    print(f"Unique {target_name} classes in labels: {unique_classes} with counts: {counts}")
 
     if len(unique_classes) < 2:
-        print(f"Not enough class diversity in target labels (dozens). Found only {len(unique_classes)} unique class(es). Training aborted.")
+        print(f"Not enough class diversity in target labels ({plural}). Found only {len(unique_classes)} unique class(es). Training aborted.")
         return False
 
-    print(f"Generated {len(X_features)} feature sets and {len(y_dozens)} labels for dozens.")
+    print(f"Generated {len(X_features)} feature sets and {len(y_labels)} labels for {plural}.")
 
     # 4. Split data
-    stratify_option = y_dozens if len(unique_classes) > 1 and all(c >= 2 for c in counts) else None
+    stratify_option = y_labels if len(unique_classes) > 1 and all(c >= 2 for c in counts) else None
 
     test_size = 0.25
     if len(X_features) * test_size < len(unique_classes) * 2 and stratify_option is not None: # Ensure test set can have at least 2 samples per class if stratifying
@@ -101,12 +355,12 @@ def train_predict_next_dozen_model():
 
     try:
         X_train, X_test, y_train, y_test = train_test_split(
-            X_features, y_dozens, test_size=test_size, random_state=42, stratify=stratify_option
+            X_features, y_labels, test_size=test_size, random_state=42, stratify=stratify_option
         )
     except ValueError as e:
         print(f"Could not stratify data (error: {e}), splitting without stratification.")
         X_train, X_test, y_train, y_test = train_test_split(
-            X_features, y_dozens, test_size=test_size, random_state=42
+            X_features, y_labels, test_size=test_size, random_state=42
         )
 
     print(f"Training with {len(X_train)} samples, testing with {len(X_test)} samples.")
@@ -115,8 +369,9 @@ def train_predict_next_dozen_model():
         return False
 
     # 5. Train Model
-    print("Training RandomForestClassifier model for dozens...")
-    model = RandomForestClassifier(n_estimators=50, random_state=42, class_weight='balanced', min_samples_leaf=2, oob_score=True)
+    progress("training", samples=len(X_train))
+    print(f"Training RandomForestClassifier model for {plural}...")
+    model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=42, class_weight='balanced', min_samples_leaf=2, oob_score=True)
 
     try:
         model.fit(X_train, y_train)
@@ -126,22 +381,142 @@ def train_predict_next_dozen_model():
         return False
 
     # 6. Evaluate Model
+    progress("evaluating", samples=len(X_test))
     print("Evaluating model...")
     y_pred = model.predict(X_test)
     accuracy = accuracy_score(y_test, y_pred)
-    print(f"Model Accuracy (Dozens): {accuracy:.4f}")
-    print("Classification Report (Dozens):")
-    # Ensure all unique classes present in y_dozens are used as labels if y_test/y_pred is sparse
+    print(f"Model Accuracy ({plural.capitalize()}): {accuracy:.4f}")
+    print(f"Classification Report ({plural.capitalize()}):")
+    # Ensure all unique classes present in y_labels are used as labels if y_test/y_pred is sparse
     report_labels = sorted(unique_classes)
     print(classification_report(y_test, y_pred, labels=report_labels, zero_division=0))
 
     # 7. Save Model
-    print(f"Saving dozen prediction model to {MODEL_FILENAME_DOZEN}...")
-    joblib.dump(model, MODEL_FILENAME_DOZEN)
-    print("Dozen prediction model training complete and model saved.")
+    progress("saving")
+    model.training_metadata_ = _training_metadata(last_spin_id, numbers_history, len(X_train), N_ESTIMATORS)
+    print(f"Saving {target_name} prediction model to {model_filename}...")
+    save_model(model, model_filename)
+    print(f"{target_name.capitalize()} prediction model training complete and model saved.")
     return True
 
+def train_predict_next_dozen_model(progress=None, incremental: bool = False):
+    """
+    Trains the next-dozen model on every spin in the database and saves it.
+
+    Args:
+        progress: Optional callback progress(stage, samples=None), called at each
+                  stage (see training_jobs). It may raise to abort training.
+        incremental: If True, update the saved model with only the spins stored
+                     since its last training (update_model_incrementally),
+                     falling back to a full refit when the refit policy requires one.
+
+    Returns:
+        True if a model was trained and saved, False otherwise.
+    """
+    progress = progress or _no_progress
+    print("Starting model training for predicting the next dozen...")
+
+    if not os.path.exists(MODEL_DIR):
+        print(f"Creating model directory: {MODEL_DIR}")
+        os.makedirs(MODEL_DIR)
+
+    store = _synced_feature_store(progress)
+    if incremental:
+        updated = update_model_incrementally(MODEL_FILENAME_DOZEN, DOZEN_BY_NUMBER, progress, store)
+        if updated is not None:
+            return updated
+        print("Running a full refit...")
+
+    data = _load_training_data(progress, store)
+    if data is None:
+        return False
+    numbers_history, last_spin_id, X_sequences, y_next_numbers = data
+    return _fit_and_save_model("dozen", MODEL_FILENAME_DOZEN, DOZEN_BY_NUMBER, X_sequences, y_next_numbers,
+                               numbers_history, last_spin_id, progress)
+
+def _train_target_task(task: tuple) -> bool:
+    """Process pool entry point: trains and saves one target's model."""
+    return _fit_and_save_model(*task)
+
+def train_all_models(progress=None, incremental: bool = False, targets=None, max_workers: int = None) -> dict:
+    """
+    Trains the models for several targets (default: all of TRAINING_TARGETS).
+
+    The spins are loaded and the feature matrix is built once; each target
+    only derives its own label vector from it. The models are fitted
+    concurrently in a process pool, so the total time is about that of the
+    slowest model rather than the sum.
+
+    Args:
+        progress: Optional progress callback (see training_jobs). Cancelling
+                  drops targets not yet started; running fits still finish.
+        incremental: If True, first try update_model_incrementally for each
+                     target; only targets that need a full refit are refitted.
+        targets: Target names to train (default: all).
+        max_workers: Process count (default: one per target, up to the CPU count). 1 trains in-process.
+
+    Returns:
+        A dictionary mapping each target name to True (trained) or False.
+    """
+    progress = progress or _no_progress
+    target_configs = _training_targets()
+    targets = list(targets or target_configs)
+    if not os.path.exists(MODEL_DIR):
+        print(f"Creating model directory: {MODEL_DIR}")
+        os.makedirs(MODEL_DIR)
+
+    results = {}
+    store = _synced_feature_store(progress) # Synced once, shared by every target
+    if incremental:
+        for target_name in targets:
+            config = target_configs[target_name]
+            updated = update_model_incrementally(config["model_filename"], config["labels_by_number"], progress, store)
+            if updated is not None:
+                results[target_name] = updated
+    pending = [target_name for target_name in targets if target_name not in results]
+    if not pending:
+        return results
+
+    data = _load_training_data(progress, store)
+    if data is None:
+        results.update({target_name: False for target_name in pending})
+        return results
+    numbers_history, last_spin_id, X_sequences, y_next_numbers = data
+    X_features = np.ascontiguousarray(X_sequences) # The one feature matrix every process receives
+
+    tasks = {
+        target_name: (target_name, target_configs[target_name]["model_filename"], target_configs[target_name]["labels_by_number"],
+                      X_features, y_next_numbers, numbers_history, last_spin_id)
+        for target_name in pending
+    }
+    progress("training", samples=len(X_features))
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        for target_name, task in tasks.items():
+            results[target_name] = _train_target_task(task)
+            progress(f"trained {target_name}", samples=len(X_features))
+        return results
+
+    executor = new_process_pool(workers) # Not a fork: this runs inside the threaded web process
+    try:
+        futures = {executor.submit(_train_target_task, task): target_name for target_name, task in tasks.items()}
+        for future in as_completed(futures):
+            target_name = futures[future]
+            try:
+                results[target_name] = future.result()
+            except Exception as e:
+                print(f"Error training the {target_name} model: {e}")
+                results[target_name] = False
+            progress(f"trained {target_name}", samples=len(X_features))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the next-dozen model on the spins database.")
+    parser.add_argument('--incremental', action='store_true', help="Update the saved model with new spins only, if possible.")
+    args = parser.parse_args()
     print("Running train_models.py directly...")
     # Initialize DB and add sample data if DB is empty or has too few records
     init_db()
@@ -163,4 +538,4 @@ if __name__ == '__main__':
         add_multiple_spin_results(sample_data)
         print(f"Added {len(sample_data)} sample records. New total: {get_total_spins_count()}")
 
-    train_predict_next_dozen_model()
+    train_predict_next_dozen_model(incremental=args.incremental)
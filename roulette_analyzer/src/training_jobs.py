@@ -0,0 +1,154 @@
+# Background training jobs.
+#
+# Training a model can take minutes on a large database, far too long to run
+# inside an HTTP request. TrainingJobManager runs training functions as
+# background jobs (see background_jobs) and keeps a record per job (status,
+# stage, samples processed, elapsed time) that the web UI can poll. At most
+# one job per model runs at a time.
+#
+# Training functions take a `progress` callback and call it at each stage:
+#     progress("training", samples=len(X_train))
+# The callback raises TrainingCancelled once cancel() has been requested, so
+# cancellation takes effect at the next stage boundary (a forest that is
+# already fitting finishes its fit first).
+import threading
+
+try:
+    from .background_jobs import (
+        BackgroundJob, JobManager, JobCancelled,
+        JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED, FINISHED_STATUSES
+    )
+except ImportError:
+    from background_jobs import (
+        BackgroundJob, JobManager, JobCancelled,
+        JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED, FINISHED_STATUSES
+    )
+
+DEFAULT_MAX_WORKERS = 2
+MAX_FINISHED_JOBS_KEPT = 50 # Older finished jobs are forgotten
+
+
+class TrainingCancelled(JobCancelled):
+    """Raised by a job's progress callback after the job was cancelled."""
+
+
+class TrainingJob(BackgroundJob):
+    """State of one training job. Read it through to_dict() from other threads."""
+
+    def __init__(self, model_name: str):
+        super().__init__()
+        self.model_name = model_name
+        self.stage = "queued"
+        self.samples_processed = 0
+        self.model_results = None # {model: succeeded} when the function trains several models
+        self.cancel_event = threading.Event()
+
+    def describe(self) -> str:
+        return f"{self.job_id} ({self.model_name})"
+
+    def progress(self, stage: str, samples: int = None):
+        """Progress callback handed to the training function."""
+        if self.cancel_event.is_set():
+            raise TrainingCancelled(f"Cancelled during stage '{self.stage}'.")
+        self.stage = stage
+        if samples is not None:
+            self.samples_processed = samples
+
+    def to_dict(self) -> dict:
+        return {
+            **super().to_dict(),
+            "model_name": self.model_name,
+            "stage": self.stage,
+            "samples_processed": self.samples_processed,
+            "cancel_requested": self.cancel_event.is_set(),
+            "model_results": self.model_results,
+        }
+
+
+class TrainingJobManager(JobManager):
+    """
+    Runs training functions in the background, one job per model at a time.
+
+    A training function is called as train_function(progress=job.progress)
+    and returns True on success and False when training was not possible
+    (e.g. insufficient data), like train_predict_next_dozen_model. A function
+    training several models returns {model: succeeded} instead, like
+    train_all_models; the job succeeds only if every model was trained.
+    """
+
+    job_kind = "training"
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        super().__init__(max_workers, MAX_FINISHED_JOBS_KEPT, thread_name_prefix="training")
+        self._active_jobs = {} # model_name -> job_id of its queued or running job
+
+    def submit(self, model_name: str, train_function) -> tuple[TrainingJob, bool]:
+        """
+        Queues a training job for model_name unless one is already queued or running.
+
+        Returns:
+            A tuple (job, started): the new job and True, or the job already
+            active for this model and False.
+        """
+        with self._lock:
+            active_id = self._active_jobs.get(model_name)
+            if active_id is not None:
+                return self._jobs[active_id], False
+            job = TrainingJob(model_name)
+            self._active_jobs[model_name] = job.job_id
+            self._add_job(job)
+        self._start(job, train_function)
+        return job, True
+
+    def _execute(self, job: TrainingJob, train_function):
+        job.progress("starting")
+        result = train_function(progress=job.progress)
+        if isinstance(result, dict): # {model: succeeded} from a function training several models
+            job.model_results = result
+            failed_models = [name for name, trained in result.items() if not trained]
+            succeeded = bool(result) and not failed_models
+        else:
+            failed_models, succeeded = [], bool(result)
+        job.status = JOB_SUCCEEDED if succeeded else JOB_FAILED
+        if succeeded:
+            job.stage = "done"
+            job.message = "Training completed."
+        elif failed_models:
+            job.message = f"No model was produced for: {', '.join(failed_models)}. Check server logs."
+        else:
+            job.message = "Training did not produce a model. Check server logs."
+
+    def _job_finished(self, job: TrainingJob):
+        if self._active_jobs.get(job.model_name) == job.job_id:
+            del self._active_jobs[job.model_name]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Requests cancellation of a queued or running job.
+        Returns False if the job is unknown or already finished.
+        """
+        job = self.get_job(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return False
+        job.cancel_event.set()
+        return True
+
+
+if __name__ == '__main__':
+    import time
+
+    def slow_training(progress=None):
+        for stage in ("loading data", "training", "saving"):
+            progress(stage, samples=1000)
+            time.sleep(0.5)
+        return True
+
+    manager = TrainingJobManager()
+    job, started = manager.submit("demo", slow_training)
+    _, started_again = manager.submit("demo", slow_training)
+    print(f"Started: {started}, second submit started another job: {started_again}")
+    while job.status not in FINISHED_STATUSES:
+        print(job.to_dict())
+        time.sleep(0.4)
+    print(job.to_dict())
+    manager.shutdown()
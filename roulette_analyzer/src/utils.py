@@ -1 +1,14 @@
 # Contains helper functions for Roulette Analyzer.
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Process pools (OCR, training, Monte Carlo tests) start their workers from a
+# forkserver rather than a fork of the web process: that process runs
+# training, preload and OCR job threads, and a lock one of them holds at fork
+# time (the model cache's, a backend's) or an open per-thread SQLite
+# connection would be copied into the worker.
+POOL_START_METHOD = "forkserver"
+
+def new_process_pool(max_workers: int, **kwargs) -> ProcessPoolExecutor:
+    """A ProcessPoolExecutor whose workers start with POOL_START_METHOD."""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(POOL_START_METHOD), **kwargs)
@@ -0,0 +1,50 @@
+# Layout of the European roulette wheel and table, shared by the analysis modules.
+#
+# Kept apart from analysis_engine so that the modules it builds on (streak_engine,
+# sector_scan, bias_testing, ...) can import these tables without a cycle.
+ROULETTE_WHEEL = {
+    0: 'green',
+    1: 'red', 2: 'black', 3: 'red', 4: 'black', 5: 'red', 6: 'black', 7: 'red', 8: 'black', 9: 'red',
+    10: 'black', 11: 'black', 12: 'red', 13: 'black', 14: 'red', 15: 'black', 16: 'red', 17: 'black', 18: 'red',
+    19: 'red', 20: 'black', 21: 'red', 22: 'black', 23: 'red', 24: 'black', 25: 'red', 26: 'black', 27: 'red',
+    28: 'black', 29: 'black', 30: 'red', 31: 'black', 32: 'red', 33: 'black', 34: 'red', 35: 'black', 36: 'red'
+}
+
+NUMBER_TO_DOZEN = {n: ( (n-1)//12 ) + 1 for n in range(1, 37)} # 1st, 2nd, 3rd dozen
+NUMBER_TO_DOZEN[0] = None # 0 is not in any dozen
+
+NUMBER_TO_COLUMN = {n: ( (n-1)%3 ) + 1 for n in range(1, 37)} # 1st, 2nd, 3rd column
+NUMBER_TO_COLUMN[0] = None # 0 is not in any column
+
+# Simplified sections (halves and even/odd for now)
+# More complex sections like Voisins, Tiers, Orphelins can be added later
+NUMBER_TO_HALF = {n: 1 if 1 <= n <= 18 else (2 if 19 <= n <= 36 else None) for n in range(0, 37)} # 1st half (1-18), 2nd half (19-36)
+NUMBER_TO_EVEN_ODD = {n: 'even' if n != 0 and n % 2 == 0 else ('odd' if n != 0 and n % 2 != 0 else None) for n in range(0, 37)}
+
+# More detailed wheel sections
+# Voisins du Zéro (Neighbors of Zero): 0, 2, 3, 4, 7, 12, 15, 18, 19, 21, 22, 25, 26, 28, 29, 32, 35 (17 numbers)
+VOISINS_DU_ZERO = {0, 2, 3, 4, 7, 12, 15, 18, 19, 21, 22, 25, 26, 28, 29, 32, 35}
+# Tiers du Cylindre (Third of the Wheel): 5, 6, 8, 10, 11, 13, 16, 17, 23, 24, 27, 30, 33, 36 (12 numbers, but typically 6 numbers are bet with 6 splits)
+# For frequency analysis, we consider all numbers in the section.
+TIERS_DU_CYLINDRE = {5, 6, 8, 10, 11, 13, 16, 17, 23, 24, 27, 30, 33, 36} # Actually 12 numbers on the wheel: 27,13,36,11,30,8,23,10,5,24,16,33
+# Orphelins (Orphans): 1, 9, 14, 20, 31, 34 (6 numbers, but typically 5 numbers are bet, 1 straight up, 4 splits)
+# For frequency analysis, we consider all numbers in the section.
+ORPHELINS = {1, 9, 14, 20, 31, 34} # Actually 8 numbers on the wheel: 1,20,14,31,9,17,34,6 (17&6 are also Tiers/Voisins based on some layouts)
+# Let's use a common definition:
+# Voisins: 22,18,29,7,28,12,35,3,26,0,32,15,19,4,21,2,25 (17 numbers)
+VOISINS_NUMBERS = {22,18,29,7,28,12,35,3,26,0,32,15,19,4,21,2,25}
+# Tiers: 33,16,24,5,10,23,8,30,11,36,13,27 (12 numbers)
+TIERS_NUMBERS = {33,16,24,5,10,23,8,30,11,36,13,27}
+# Orphelins: 17,34,6,1,20,14,31,9 (8 numbers)
+ORPHELINS_NUMBERS = {17,34,6,1,20,14,31,9}
+
+# Sanity check: 17 + 12 + 8 = 37 numbers. All numbers covered.
+WHEEL_SECTIONS = {
+    "Voisins du Zero": VOISINS_NUMBERS,
+    "Tiers du Cylindre": TIERS_NUMBERS,
+    "Orphelins": ORPHELINS_NUMBERS
+}
+
+# Physical order of numbers on a standard European roulette wheel
+WHEEL_ORDER = [0, 32, 15, 19, 4, 21, 2, 25, 17, 34, 6, 27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33, 1, 20, 14, 31, 9, 22, 18, 29, 7, 28, 12, 35, 3, 26]
+# len(WHEEL_ORDER) should be 37
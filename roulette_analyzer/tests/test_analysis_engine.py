@@ -8,6 +8,7 @@ from src.analysis_engine import (
     detect_patterns,
     detect_biases,
     analyze_wheel_clusters,
+    SpinStatsAccumulator,
     WHEEL_ORDER,
     MIN_SPINS_FOR_TRENDS,
     MIN_SPINS_FOR_PATTERNS,
@@ -49,6 +50,28 @@ class TestAnalysisEngine(unittest.TestCase):
         self.assertEqual(actual["even_odd_frequencies"], expected_eo_freq)
         self.assertEqual(actual["total_spins"], 5)
 
+    # --- Test SpinStatsAccumulator ---
+    def test_accumulator_empty_matches_calculate_frequencies(self):
+        self.assertEqual(SpinStatsAccumulator().frequencies(), calculate_frequencies([]))
+
+    def test_accumulator_incremental_matches_calculate_frequencies(self):
+        results = [0, 1, 10, 13, 36, 7, 7, 0, 22, 19, 18, 5, 32, 36]
+        accumulator = SpinStatsAccumulator()
+        for i, number in enumerate(results):
+            accumulator.add(number)
+            expected = calculate_frequencies(results[:i + 1])
+            actual = accumulator.frequencies()
+            self.assertEqual(actual, expected)
+            # Key order matters for display (e.g. color list in the web template)
+            for key in ("number_frequencies", "color_frequencies", "dozen_frequencies"):
+                self.assertEqual(list(actual[key]), list(expected[key]))
+
+    def test_accumulator_state_round_trip(self):
+        accumulator = SpinStatsAccumulator([3, 0, 26, 3, 15])
+        restored = SpinStatsAccumulator.from_state(json.loads(json.dumps(accumulator.to_state())))
+        restored.extend([4, 21])
+        self.assertEqual(restored.frequencies(), calculate_frequencies([3, 0, 26, 3, 15, 4, 21]))
+
     # --- Test identify_trends ---
     def test_identify_trends_insufficient_data(self):
         results_short = [1] * (MIN_SPINS_FOR_TRENDS - 1)
@@ -0,0 +1,57 @@
+import unittest
+
+from src.background_jobs import (
+    BackgroundJob, JobManager, JobCancelled, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED
+)
+
+class EchoJobManager(JobManager):
+    """Runs a function per job; its return value becomes the job's message."""
+
+    def __init__(self, max_finished_jobs: int = 10):
+        super().__init__(max_workers=1, max_finished_jobs=max_finished_jobs, thread_name_prefix="test")
+        self.finished = []
+
+    def submit(self, function) -> BackgroundJob:
+        job = BackgroundJob()
+        with self._lock:
+            self._add_job(job)
+        self._start(job, function)
+        return job
+
+    def _execute(self, job, function):
+        job.message = function()
+        job.status = JOB_SUCCEEDED
+
+    def _job_finished(self, job):
+        self.finished.append(job.job_id)
+
+
+class TestJobManager(unittest.TestCase):
+
+    def test_statuses_and_finish_hook(self):
+        manager = EchoJobManager()
+        done = manager.submit(lambda: "done")
+        def fail():
+            raise RuntimeError("boom")
+        failed = manager.submit(fail)
+        def cancel():
+            raise JobCancelled("stopped")
+        cancelled = manager.submit(cancel)
+        manager.shutdown()
+        self.assertEqual((done.status, done.message), (JOB_SUCCEEDED, "done"))
+        self.assertEqual((failed.status, failed.message), (JOB_FAILED, "Error: boom"))
+        self.assertEqual((cancelled.status, cancelled.message), (JOB_CANCELLED, "stopped"))
+        self.assertEqual(manager.finished, [done.job_id, failed.job_id, cancelled.job_id])
+        self.assertGreaterEqual(done.to_dict()["elapsed_seconds"], 0)
+
+    def test_oldest_finished_jobs_are_forgotten(self):
+        manager = EchoJobManager(max_finished_jobs=2)
+        jobs = [manager.submit(lambda: "ok") for _ in range(3)]
+        manager.shutdown()
+        with manager._lock:
+            manager._add_job(BackgroundJob()) # Pruning happens when a job is added
+        self.assertIsNone(manager.get_job(jobs[0].job_id))
+        self.assertIs(manager.get_job(jobs[2].job_id), jobs[2])
+
+if __name__ == '__main__':
+    unittest.main()
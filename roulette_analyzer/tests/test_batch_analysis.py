@@ -0,0 +1,58 @@
+import unittest
+import random
+
+import numpy as np
+
+from src.analysis_engine import calculate_frequencies, detect_patterns, detect_biases, identify_trends, analyze_wheel_clusters, WHEEL_ORDER
+from src.batch_analysis import (
+    batch_analyze_histories,
+    batch_calculate_frequencies,
+    batch_category_histograms,
+    to_padded_array,
+    CATEGORY_MEMBERSHIP,
+    PAD_VALUE
+)
+
+class TestBatchAnalysis(unittest.TestCase):
+
+    def test_membership_matrix_row_sums(self):
+        # Zero is only green; every other number has a color, dozen, column, half and parity.
+        row_sums = CATEGORY_MEMBERSHIP.sum(axis=1)
+        self.assertEqual(row_sums[0], 1)
+        self.assertTrue(np.all(row_sums[1:] == 5))
+
+    def test_ragged_histories_match_calculate_frequencies(self):
+        rng = random.Random(3)
+        histories = [[rng.randint(0, 36) for _ in range(size)] for size in (0, 1, 7, 50, 333)]
+        batch = batch_calculate_frequencies(histories)
+        self.assertEqual(len(batch), len(histories))
+        for history, frequencies in zip(histories, batch):
+            self.assertEqual(frequencies, calculate_frequencies(history))
+
+    def test_padded_array_input(self):
+        padded = np.array([[1, 2, 3, PAD_VALUE], [0, 0, 36, 36]])
+        histograms = batch_category_histograms(padded)
+        self.assertEqual(histograms["total_spins"].tolist(), [3, 4])
+        self.assertEqual(histograms["number_counts"][1, 36], 2)
+        self.assertEqual(batch_calculate_frequencies(padded)[0], calculate_frequencies([1, 2, 3]))
+
+    def test_to_padded_array(self):
+        packed = to_padded_array([[5], [1, 2]])
+        self.assertEqual(packed.tolist(), [[5, PAD_VALUE], [1, 2]])
+
+
+    def test_batch_analyze_histories_matches_single_analyses(self):
+        rng = random.Random(3)
+        histories = [[rng.randint(0, 36) for _ in range(size)] for size in (0, 8, 120)]
+        for history, analysis in zip(histories, batch_analyze_histories(histories)):
+            frequencies = calculate_frequencies(history)
+            self.assertEqual(analysis["frequencies"], frequencies)
+            self.assertEqual(analysis["trends"], identify_trends(frequencies, len(history)))
+            self.assertEqual(analysis["patterns"], detect_patterns(history, frequencies))
+            self.assertEqual(analysis["clusters"], analyze_wheel_clusters(frequencies, len(history), WHEEL_ORDER))
+            trends = identify_trends(frequencies, len(history))
+            self.assertEqual(analysis["biases"], detect_biases(frequencies, len(history), trends.get("number_deviations", {})))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from src.bias_testing import (
+    chi_squared_p_value,
+    exact_bias_tests,
+    monte_carlo_bias_tests,
+    SECTION_NAMES
+)
+
+class TestBiasTesting(unittest.TestCase):
+
+    def test_chi_squared_p_value_known_values(self):
+        self.assertAlmostEqual(chi_squared_p_value(3.841, 1), 0.05, places=3)
+        self.assertAlmostEqual(chi_squared_p_value(50.998, 36), 0.05, places=3)
+        self.assertAlmostEqual(chi_squared_p_value(5.991, 2), 0.05, places=3)
+        self.assertEqual(chi_squared_p_value(0.0, 36), 1.0)
+
+    def test_exact_tests_uniform_counts(self):
+        results = exact_bias_tests(np.full(37, 10))
+        self.assertEqual(results["number_test"]["statistic"], 0)
+        self.assertEqual(results["number_test"]["p_value"], 1.0)
+        self.assertEqual(set(results["sections"]), set(SECTION_NAMES))
+        self.assertFalse(any(s["is_significant"] for s in results["sections"].values()))
+
+    def test_exact_tests_biased_counts(self):
+        counts = np.full(37, 5)
+        counts[7] = 60
+        results = exact_bias_tests(counts)
+        self.assertTrue(results["number_test"]["is_significant"])
+        self.assertEqual(results["number_test"]["df"], 36)
+        self.assertEqual(results["section_test"]["df"], 2)
+
+    def test_monte_carlo_close_to_exact_for_large_sample(self):
+        counts = np.bincount(np.random.default_rng(4).integers(0, 37, size=3700), minlength=37)
+        exact = exact_bias_tests(counts)
+        mc = monte_carlo_bias_tests(counts, simulations=4000, chunk_size=1000, seed=3, max_workers=1)
+        self.assertEqual(mc["simulations"], 4000)
+        self.assertAlmostEqual(mc["number_test"]["p_value"], exact["number_test"]["p_value"], delta=0.05)
+
+    def test_monte_carlo_independent_of_worker_count(self):
+        counts = np.bincount([7] * 5 + list(range(20)), minlength=37)
+        single = monte_carlo_bias_tests(counts, simulations=3000, chunk_size=1000, seed=8, max_workers=1)
+        pooled = monte_carlo_bias_tests(counts, simulations=3000, chunk_size=1000, seed=8, max_workers=2)
+        self.assertEqual(single, pooled)
+
+    def test_monte_carlo_rejects_empty_simulation_settings(self):
+        counts = np.bincount(list(range(37)), minlength=37)
+        with self.assertRaisesRegex(ValueError, "simulations"):
+            monte_carlo_bias_tests(counts, simulations=0)
+        with self.assertRaisesRegex(ValueError, "chunk_size"):
+            monte_carlo_bias_tests(counts, chunk_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
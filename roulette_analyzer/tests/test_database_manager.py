@@ -0,0 +1,174 @@
+import unittest
+import os
+import tempfile
+import datetime
+import sqlite3
+import threading
+from unittest.mock import patch
+
+from src import database_manager
+
+class DatabaseTestCase(unittest.TestCase):
+    """Runs each test against a fresh database in a temporary directory."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'test_roulette.db')
+        self.db_patch = patch.object(database_manager, 'DATABASE_NAME', self.db_path)
+        self.db_patch.start()
+        database_manager.init_db()
+
+    def tearDown(self):
+        database_manager.close_connection()
+        self.db_patch.stop()
+        self.temp_dir.cleanup()
+
+
+class TestConnectionManagement(DatabaseTestCase):
+
+    def test_connection_is_reused_and_uses_wal(self):
+        conn = database_manager.get_connection()
+        self.assertIs(database_manager.get_connection(), conn)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_threads_get_their_own_connection(self):
+        connections = []
+        worker = threading.Thread(target=lambda: connections.append(database_manager.get_connection()))
+        worker.start()
+        worker.join()
+        self.assertIsNot(connections[0], database_manager.get_connection())
+
+    def test_reopens_when_database_changes(self):
+        conn = database_manager.get_connection()
+        with patch.object(database_manager, 'DATABASE_NAME', os.path.join(self.temp_dir.name, 'other.db')):
+            self.assertIsNot(database_manager.get_connection(), conn)
+
+
+class TestSessionHistoryStore(DatabaseTestCase):
+
+    def test_append_and_read_history(self):
+        session_id = database_manager.create_history_session()
+        database_manager.append_session_spins(session_id, [1, 2, 3])
+        database_manager.append_session_spins(session_id, [0, 36], {"total_spins": 5})
+        self.assertEqual(database_manager.get_session_spins(session_id), [1, 2, 3, 0, 36])
+        self.assertEqual(database_manager.get_session_spins(session_id, last_n=2), [0, 36])
+        info = database_manager.get_session_info(session_id)
+        self.assertEqual(info["spin_count"], 5)
+        self.assertEqual(info["analysis_state"], {"total_spins": 5})
+
+    def test_sessions_are_isolated(self):
+        first = database_manager.create_history_session()
+        second = database_manager.create_history_session()
+        database_manager.append_session_spins(first, [7, 7])
+        self.assertEqual(database_manager.get_session_spins(second), [])
+        database_manager.delete_history_session(first)
+        self.assertFalse(database_manager.history_session_exists(first))
+        self.assertTrue(database_manager.history_session_exists(second))
+
+    def test_append_to_unknown_session_fails(self):
+        with self.assertRaises(KeyError):
+            database_manager.append_session_spins("missing", [1])
+
+    def test_evict_idle_sessions(self):
+        idle = database_manager.create_history_session()
+        active = database_manager.create_history_session()
+        database_manager.append_session_spins(idle, [4, 5])
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute("UPDATE history_sessions SET last_seen = ? WHERE session_id = ?",
+                         (datetime.datetime.now() - datetime.timedelta(hours=2), idle))
+        conn.close()
+        self.assertEqual(database_manager.evict_idle_sessions(3600), 1)
+        self.assertFalse(database_manager.history_session_exists(idle))
+        self.assertEqual(database_manager.get_session_spins(idle), [])
+        self.assertTrue(database_manager.history_session_exists(active))
+
+
+class TestTrainingDataLoader(DatabaseTestCase):
+
+    def test_load_spins_array_matches_insertion_order(self):
+        numbers = [(i * 7) % 37 for i in range(1000)]
+        database_manager.add_multiple_spin_results(numbers)
+        loaded, last_id = database_manager.load_spins_array(chunk_size=64)
+        self.assertEqual(loaded.dtype.name, 'uint8')
+        self.assertEqual(loaded.tolist(), numbers)
+        self.assertEqual(last_id, 1000)
+
+    def test_load_spins_array_after_id(self):
+        database_manager.add_multiple_spin_results([1, 2, 3])
+        _, last_id = database_manager.load_spins_array()
+        database_manager.add_multiple_spin_results([4, 5])
+        loaded, new_last_id = database_manager.load_spins_array(after_id=last_id)
+        self.assertEqual(loaded.tolist(), [4, 5])
+        self.assertEqual(new_last_id, 5)
+
+    def test_load_spins_array_empty(self):
+        loaded, last_id = database_manager.load_spins_array()
+        self.assertEqual(len(loaded), 0)
+        self.assertEqual(last_id, 0)
+
+    def test_count_spins_up_to(self):
+        database_manager.add_multiple_spin_results([1, 2, 3, 4])
+        self.assertEqual(database_manager.count_spins_up_to(3), 3)
+        database_manager.clear_all_spins_from_db()
+        database_manager.add_multiple_spin_results([5, 6, 7, 8]) # Ids are not reused
+        self.assertEqual(database_manager.count_spins_up_to(3), 0)
+        self.assertEqual(database_manager.count_spins_up_to(8), 4)
+
+    def test_iter_spin_chunks(self):
+        database_manager.add_multiple_spin_results(list(range(10)))
+        chunks = list(database_manager.iter_spin_chunks(chunk_size=4))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+
+
+class TestSpinNumberCounts(DatabaseTestCase):
+
+    def test_counts_follow_inserts_updates_and_deletes(self):
+        database_manager.add_multiple_spin_results([5, 5, 0, 36])
+        database_manager.add_spin_result(5)
+        counts = database_manager.get_number_counts()
+        self.assertEqual((counts[5], counts[0], counts[36]), (3, 1, 1))
+        self.assertEqual(database_manager.get_total_spins_count(), 5)
+
+        conn = database_manager.get_connection()
+        with conn:
+            conn.execute("UPDATE spins SET number_spun = 7 WHERE number_spun = 0")
+            conn.execute("DELETE FROM spins WHERE number_spun = 36")
+        counts = database_manager.get_number_counts()
+        self.assertEqual((counts[0], counts[7], counts[36]), (0, 1, 0))
+        self.assertEqual(database_manager.get_total_spins_count(), 4)
+        self.assertEqual(database_manager.verify_spin_number_counts(), {})
+
+        database_manager.clear_all_spins_from_db()
+        self.assertEqual(database_manager.get_total_spins_count(), 0)
+
+    def test_database_frequencies_match_calculate_frequencies(self):
+        from src.analysis_engine import calculate_frequencies
+        numbers = [(i * 11) % 37 for i in range(500)]
+        database_manager.add_multiple_spin_results(numbers)
+        self.assertEqual(database_manager.get_database_frequencies(), calculate_frequencies(numbers))
+
+    def test_verify_and_rebuild(self):
+        database_manager.add_multiple_spin_results([1, 2, 2])
+        conn = database_manager.get_connection()
+        with conn:
+            conn.execute("UPDATE spin_number_counts SET spin_count = 9 WHERE number_spun = 2")
+        self.assertEqual(database_manager.verify_spin_number_counts(), {2: (9, 2)})
+        database_manager.rebuild_spin_number_counts()
+        self.assertEqual(database_manager.verify_spin_number_counts(), {})
+        self.assertEqual(database_manager.get_total_spins_count(), 3)
+
+    def test_init_db_backfills_existing_spins(self):
+        conn = database_manager.get_connection()
+        with conn:
+            for trigger in ('spins_count_insert', 'spins_count_delete', 'spins_count_update'):
+                conn.execute(f"DROP TRIGGER {trigger}")
+            conn.execute("DROP TABLE spin_number_counts") # A database from before the aggregate existed
+            conn.execute("INSERT INTO spins (number_spun) VALUES (4), (4), (9)")
+        database_manager.init_db()
+        self.assertEqual(database_manager.get_number_counts()[4], 2)
+        self.assertEqual(database_manager.get_total_spins_count(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+
+from src import database_manager
+from src import feature_store
+from src.feature_store import FeatureStore
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_dir = os.path.join(self.temp_dir.name, 'features')
+        self.history = np.random.default_rng(1).integers(0, 37, size=3000).astype(np.uint8)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_appends_grow_the_file_and_keep_order(self):
+        store = FeatureStore(self.store_dir)
+        with patch.object(feature_store, 'INITIAL_CAPACITY', 100):
+            for batch in np.array_split(self.history, 7):
+                store.append(batch)
+        self.assertGreaterEqual(store.capacity, len(self.history))
+        self.assertTrue(np.array_equal(store.numbers(), self.history))
+
+    def test_persists_and_reopens(self):
+        store = FeatureStore(self.store_dir)
+        store.append(self.history[:1000], last_spin_id=1000)
+        reopened = FeatureStore(self.store_dir)
+        self.assertEqual((reopened.length, reopened.last_spin_id), (1000, 1000))
+        reopened.append(self.history[1000:])
+        self.assertTrue(np.array_equal(FeatureStore(self.store_dir).numbers(), self.history))
+
+    def test_store_with_derived_columns_is_rebuilt(self):
+        os.makedirs(self.store_dir)
+        with open(os.path.join(self.store_dir, 'metadata.json'), 'w') as f:
+            json.dump({"length": 10, "capacity": 4096, "last_spin_id": 10, "columns": ["number", "gap"]}, f)
+        store = FeatureStore(self.store_dir)
+        self.assertEqual((store.length, store.last_spin_id), (0, 0))
+
+    def test_numbers_are_memory_mapped_read_only(self):
+        store = FeatureStore(self.store_dir)
+        store.append(self.history)
+        numbers = store.numbers()
+        self.assertIsInstance(numbers.base, np.memmap)
+        with self.assertRaises(ValueError):
+            numbers[0] = 1
+
+
+class TestFeatureStoreSync(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_patch = patch.object(database_manager, 'DATABASE_NAME', os.path.join(self.temp_dir.name, 'test_roulette.db'))
+        self.db_patch.start()
+        database_manager.init_db()
+
+    def tearDown(self):
+        database_manager.close_connection()
+        self.db_patch.stop()
+        self.temp_dir.cleanup()
+
+    def test_sync_appends_only_new_spins(self):
+        database_manager.add_multiple_spin_results([1, 2, 3, 1])
+        store = FeatureStore()
+        self.assertEqual(store.sync(), 4)
+        database_manager.add_multiple_spin_results([2, 1])
+        with patch.object(database_manager, 'load_spins_array', wraps=database_manager.load_spins_array) as loader:
+            self.assertEqual(FeatureStore().sync(), 2)
+        loader.assert_called_once_with(after_id=4)
+        self.assertEqual(FeatureStore().numbers().tolist(), [1, 2, 3, 1, 2, 1])
+
+    def test_sync_rebuilds_after_deletes(self):
+        database_manager.add_multiple_spin_results([5, 6, 7])
+        store = FeatureStore()
+        store.sync()
+        database_manager.clear_all_spins_from_db()
+        database_manager.add_multiple_spin_results([8])
+        self.assertEqual(store.sync(), 1)
+        self.assertEqual(store.numbers().tolist(), [8])
+
+    def test_sync_rebuilds_when_as_many_spins_replace_deleted_ones(self):
+        database_manager.add_multiple_spin_results([1, 2, 3])
+        store = FeatureStore()
+        store.sync()
+        database_manager.clear_all_spins_from_db()
+        database_manager.add_multiple_spin_results([7, 8, 9, 10])
+        store.sync()
+        self.assertEqual(store.numbers().tolist(), [7, 8, 9, 10])
+
+if __name__ == '__main__':
+    unittest.main()
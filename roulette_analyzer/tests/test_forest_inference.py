@@ -0,0 +1,69 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src import prediction_engine
+from src.forest_inference import CompactForest, compact_model_filename
+from src.train_models import export_forest, save_model
+
+class TestCompactForest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.integers(0, 37, size=(2000, 5))
+        self.y = (self.X[:, -1] + 11) // 12 # Dozen of the last number, 0 for zero
+        self.X_test = np.vstack([rng.integers(0, 37, size=(500, 5)), self.X[:100]])
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        prediction_engine.clear_model_cache()
+        self.temp_dir.cleanup()
+
+    def assert_identical_predictions(self, model, compact):
+        self.assertTrue(np.array_equal(compact.predict_proba(self.X_test), model.predict_proba(self.X_test)))
+        self.assertTrue(np.array_equal(compact.predict(self.X_test), model.predict(self.X_test)))
+        self.assertTrue(np.array_equal(compact.apply(self.X_test) - compact.roots, model.apply(self.X_test)))
+
+    def test_bit_identical_to_sklearn(self):
+        model = RandomForestClassifier(n_estimators=20, random_state=0).fit(self.X, self.y)
+        self.assert_identical_predictions(model, export_forest(model))
+
+    def test_bit_identical_after_warm_start_and_many_classes(self):
+        model = RandomForestClassifier(n_estimators=10, random_state=0, warm_start=True)
+        model.fit(self.X, self.X[:, -1]) # 37 classes
+        model.n_estimators += 5
+        model.fit(self.X[:1000], self.X[:1000, -1])
+        self.assert_identical_predictions(model, export_forest(model))
+
+    def test_save_and_load_round_trip(self):
+        model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(self.X, self.y)
+        path = os.path.join(self.temp_dir.name, 'forest.npz')
+        export_forest(model).save(path)
+        loaded = CompactForest.load(path)
+        self.assert_identical_predictions(model, loaded)
+
+    def test_prediction_engine_prefers_up_to_date_export(self):
+        model_path = os.path.join(self.temp_dir.name, 'model.joblib')
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y)
+        save_model(model, model_path)
+        self.assertTrue(os.path.exists(compact_model_filename(model_path)))
+        self.assertEqual(prediction_engine.resolve_model_file(model_path), compact_model_filename(model_path))
+        self.assertIsInstance(prediction_engine.load_model(prediction_engine.resolve_model_file(model_path)), CompactForest)
+
+        history = self.X_test[0].tolist()
+        result = prediction_engine._get_ml_prediction(model_path, "Next Dozen", history, 5)
+        self.assertEqual(result["prediction"], str(model.predict([history])[0]))
+
+        stat = os.stat(model_path)
+        os.utime(model_path, ns=(stat.st_atime_ns, os.stat(compact_model_filename(model_path)).st_mtime_ns + 1))
+        self.assertEqual(prediction_engine.resolve_model_file(model_path), model_path) # Export is stale
+        with patch.object(prediction_engine, 'USE_COMPACT_MODELS', False):
+            os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self.assertEqual(prediction_engine.resolve_model_file(model_path), model_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import random
+
+from src.history_merge import longest_overlap, merge_new_spins
+
+def brute_force_overlap(history, new_numbers):
+    for k in range(min(len(history), len(new_numbers)), 0, -1):
+        if history[-k:] == new_numbers[:k]:
+            return k
+    return 0
+
+class TestHistoryMerge(unittest.TestCase):
+
+    def test_overlapping_screenshot(self):
+        history = [5, 17, 32, 0, 21, 4, 9]
+        self.assertEqual(merge_new_spins(history, [0, 21, 4, 9, 13, 26]), ([13, 26], 4))
+
+    def test_identical_screenshot_adds_nothing(self):
+        self.assertEqual(merge_new_spins([1, 2, 3, 4, 5], [2, 3, 4, 5]), ([], 4))
+
+    def test_short_overlaps_are_kept_as_genuine_repeats(self):
+        self.assertEqual(merge_new_spins([3, 8, 9], [9]), ([9], 0))
+        self.assertEqual(merge_new_spins([3, 8, 9], [8, 9, 1]), ([8, 9, 1], 0))
+        self.assertEqual(merge_new_spins([3, 8, 9], [8, 9, 1], min_overlap=2), ([1], 2))
+
+    def test_no_history_or_no_overlap(self):
+        self.assertEqual(merge_new_spins([], [1, 2, 3]), ([1, 2, 3], 0))
+        self.assertEqual(merge_new_spins([1, 2, 3], [4, 5, 6]), ([4, 5, 6], 0))
+        self.assertEqual(merge_new_spins([1, 2, 3], []), ([], 0))
+
+    def test_matches_brute_force_on_repetitive_sequences(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            history = [rng.choice((0, 1, 2)) for _ in range(rng.randint(0, 15))]
+            new_numbers = [rng.choice((0, 1, 2)) for _ in range(rng.randint(0, 15))]
+            self.assertEqual(longest_overlap(history, new_numbers), brute_force_overlap(history, new_numbers),
+                             (history, new_numbers))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+
+from src.lazy_loader import LazyModule
+
+APP_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+class TestLazyModule(unittest.TestCase):
+
+    def test_imports_on_first_attribute_access(self):
+        sys.modules.pop('colorsys', None)
+        colorsys = LazyModule('colorsys')
+        self.assertFalse(colorsys.loaded)
+        self.assertNotIn('colorsys', sys.modules)
+        self.assertEqual(colorsys.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertTrue(colorsys.loaded)
+        self.assertIs(colorsys.load(), sys.modules['colorsys'])
+        self.assertIsNotNone(colorsys.load_seconds)
+
+    def test_missing_module_raises_on_use(self):
+        missing = LazyModule('no_such_module_for_lazy_loader')
+        with self.assertRaises(ImportError):
+            missing.anything
+        self.assertFalse(missing.loaded)
+
+    def test_importing_app_skips_heavy_modules_and_database(self):
+        script = (
+            "import sys\n"
+            f"sys.path.insert(0, {os.path.abspath(APP_DIRECTORY)!r})\n"
+            "import app\n"
+            "print(','.join(name for name in ('sklearn', 'joblib', 'pytesseract', 'PIL') if name in sys.modules))\n"
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            completed = subprocess.run([sys.executable, "-c", script], cwd=temp_dir, capture_output=True, text=True)
+            self.assertEqual(completed.returncode, 0, completed.stderr)
+            self.assertEqual(completed.stdout.strip(), "")
+            self.assertFalse(os.path.exists(os.path.join(temp_dir, 'roulette_data.db'))) # init_db waits for the first request
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from src.ml_utils import extract_sequences, sliding_windows, multi_window_sequences
+
+class TestSlidingWindows(unittest.TestCase):
+
+    def setUp(self):
+        self.history = [10, 20, 5, 0, 15, 30, 10, 25, 3, 12, 18, 7]
+
+    def test_matches_extract_sequences(self):
+        for window_size in (1, 3, 5, 11):
+            X, y = sliding_windows(self.history, window_size)
+            X_expected, y_expected = extract_sequences(self.history, window_size)
+            self.assertEqual(X.tolist(), X_expected)
+            self.assertEqual(y.tolist(), y_expected)
+
+    def test_views_are_read_only_and_share_memory(self):
+        history = np.array(self.history, dtype=np.uint8)
+        X, y = sliding_windows(history, 5)
+        self.assertTrue(np.shares_memory(X, history))
+        self.assertTrue(np.shares_memory(y, history))
+        with self.assertRaises(ValueError):
+            X[0, 0] = 1
+        with self.assertRaises(ValueError):
+            y[0] = 1
+
+    def test_short_history(self):
+        X, y = sliding_windows(self.history[:3], 3)
+        self.assertEqual(X.shape, (0, 3))
+        self.assertEqual(len(y), 0)
+
+    def test_multiple_window_sizes_share_one_buffer(self):
+        windows = multi_window_sequences(self.history, [2, 4])
+        self.assertEqual(set(windows), {2, 4})
+        self.assertTrue(np.shares_memory(windows[2][0], windows[4][0]))
+        self.assertEqual(windows[4][0].shape, (8, 4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import sys
+import types
+from unittest.mock import patch
+
+from PIL import Image
+
+from src import ocr_backends
+from src.ocr_backends import PytesseractBackend, TesserocrBackend, create_backend, get_backend
+
+class FakeTessBaseAPI:
+    """Stands in for tesserocr.PyTessBaseAPI."""
+    instances = 0
+
+    def __init__(self, psm=None):
+        FakeTessBaseAPI.instances += 1
+        self.psm = psm
+        self.variables = {}
+        self.images = []
+
+    def SetVariable(self, name, value):
+        self.variables[name] = value
+
+    def SetImage(self, image):
+        self.images.append(image)
+
+    def GetUTF8Text(self):
+        return "17  4 32\n\n0 21\n"
+
+    def AllWordConfidences(self):
+        return [95, 90, 85, 88, 92]
+
+    def End(self):
+        pass
+
+def fake_tesserocr() -> types.ModuleType:
+    module = types.ModuleType("tesserocr")
+    module.PyTessBaseAPI = FakeTessBaseAPI
+    module.PSM = types.SimpleNamespace(SINGLE_BLOCK=6)
+    return module
+
+class TestOcrBackends(unittest.TestCase):
+
+    def setUp(self):
+        ocr_backends.close_backends()
+        FakeTessBaseAPI.instances = 0
+
+    def tearDown(self):
+        ocr_backends.close_backends()
+
+    def test_tesserocr_backend_reuses_one_api(self):
+        with patch.dict(sys.modules, {"tesserocr": fake_tesserocr()}):
+            backend = get_backend("auto")
+            self.assertIsInstance(backend, TesserocrBackend)
+            image = Image.new("L", (60, 20), 255)
+            for _ in range(3):
+                text, confidence = get_backend("auto").recognize(image)
+        self.assertEqual((text, confidence), ("17 4 32\n0 21", 90.0))
+        self.assertEqual(FakeTessBaseAPI.instances, 1)
+        self.assertEqual(backend._api.variables["tessedit_char_whitelist"], "0123456789")
+        self.assertEqual(len(backend._api.images), 3)
+
+    def test_auto_falls_back_to_pytesseract(self):
+        with patch.dict(sys.modules, {"tesserocr": None}): # Not installed
+            self.assertIsInstance(create_backend("auto"), PytesseractBackend)
+        broken = fake_tesserocr()
+        broken.PyTessBaseAPI = lambda psm=None: (_ for _ in ()).throw(RuntimeError("Failed to init API"))
+        with patch.dict(sys.modules, {"tesserocr": broken}):
+            self.assertIsInstance(create_backend("auto"), PytesseractBackend)
+            with self.assertRaises(RuntimeError):
+                create_backend("tesserocr")
+
+    def test_pytesseract_backend_groups_words_by_line(self):
+        data = {"text": ["", "7", "", "12", "3"], "conf": [-1, 80, -1, 70, 90],
+                "block_num": [1, 1, 1, 1, 1], "par_num": [1, 1, 1, 1, 1], "line_num": [0, 1, 0, 2, 2]}
+        with patch.object(ocr_backends.pytesseract, 'image_to_data', return_value=data):
+            self.assertEqual(PytesseractBackend().recognize(Image.new("L", (10, 10))), ("7\n12 3", 80.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import io
+import os
+import tempfile
+from unittest.mock import patch
+
+from PIL import Image, ImageDraw
+
+from src import database_manager
+from src import ocr_backends
+from src import ocr_pipeline
+from src.ocr_cache import OcrResultCache, get_ocr_cache, perceptual_hash, pixel_hash
+
+def make_image(text="17 4 32 0 21", size=(600, 200)) -> Image.Image:
+    image = Image.new("L", size, 30)
+    ImageDraw.Draw(image).text((50, 90), text, fill=250)
+    return image
+
+def encode(image: Image.Image, image_format="PNG", **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+RESULT = {"text": "17 4", "numbers": [17, 4], "confidence": 91.0, "image_size": [54, 26], "timings": {"total": 500.0}}
+
+class TestOcrResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'ocr_cache.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_pixel_hash_ignores_encoding(self):
+        image = make_image()
+        reencoded = Image.open(io.BytesIO(encode(image, compress_level=9)))
+        self.assertEqual(pixel_hash(image), pixel_hash(reencoded))
+        self.assertNotEqual(pixel_hash(image), pixel_hash(make_image("17 4 32 0 22")))
+        self.assertNotEqual(pixel_hash(image), pixel_hash(image, context="--psm 7"))
+
+    def test_hit_miss_and_lru_eviction(self):
+        cache = OcrResultCache(max_entries=2)
+        images = [make_image(str(n)) for n in range(3)]
+        for image in images:
+            result, keys = cache.lookup(image)
+            self.assertIsNone(result)
+            cache.store(keys, RESULT)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.lookup(images[0])[0]) # Evicted
+        self.assertEqual(cache.lookup(images[2])[0]["numbers"], [17, 4])
+        self.assertEqual(cache.stats["hits"], 1)
+
+    def test_persists_across_instances(self):
+        cache = OcrResultCache(self.path, use_perceptual_hash=True)
+        upload = encode(make_image())
+        _, file_key = cache.lookup_file(upload)
+        _, keys = cache.lookup(make_image(), file_key=file_key)
+        cache.store(keys, RESULT)
+        reloaded = OcrResultCache(self.path, use_perceptual_hash=True)
+        self.assertEqual(reloaded.lookup_file(upload)[0], RESULT)
+        self.assertEqual(reloaded.lookup(make_image())[0], RESULT)
+
+    def test_evicted_entries_drop_their_file_aliases(self):
+        cache = OcrResultCache(max_entries=1)
+        uploads = [encode(make_image(str(n))) for n in range(2)]
+        for n, upload in enumerate(uploads):
+            _, file_key = cache.lookup_file(upload)
+            cache.store(cache.lookup(make_image(str(n)), file_key=file_key)[1], RESULT)
+        self.assertIsNone(cache.lookup_file(uploads[0])[0])
+        self.assertIsNotNone(cache.lookup_file(uploads[1])[0])
+
+    def test_perceptual_hash_matches_reencoded_jpeg_only_when_enabled(self):
+        image = make_image()
+        jpeg = Image.open(io.BytesIO(encode(image, "JPEG", quality=70)))
+        self.assertNotEqual(pixel_hash(image), pixel_hash(jpeg))
+        self.assertLessEqual((perceptual_hash(image) ^ perceptual_hash(jpeg)).bit_count(), 6)
+        for use_perceptual_hash, expected in ((False, None), (True, [17, 4])):
+            cache = OcrResultCache(use_perceptual_hash=use_perceptual_hash)
+            cache.store(cache.lookup(image)[1], RESULT)
+            result = cache.lookup(jpeg)[0]
+            self.assertEqual(result["numbers"] if result else None, expected)
+
+    def test_default_cache_follows_database_name(self):
+        with patch.object(database_manager, 'DATABASE_NAME', os.path.join(self.temp_dir.name, 'test.db')):
+            self.assertEqual(get_ocr_cache().path, os.path.join(self.temp_dir.name, 'test.db.ocr_cache.json'))
+
+@patch.object(ocr_backends, 'OCR_BACKEND', 'pytesseract')
+class TestCachedBatchOcr(unittest.TestCase):
+
+    def test_repeated_upload_skips_tesseract(self):
+        cache = OcrResultCache()
+        data = {"text": ["17", "4"], "conf": [90, 80], "block_num": [1, 1], "par_num": [1, 1], "line_num": [1, 1]}
+        uploads = [encode(make_image()), b"not an image"]
+        with patch.object(ocr_pipeline, 'OCR_MAX_WORKERS', 1), \
+             patch.object(ocr_backends.pytesseract, 'image_to_data', return_value=data) as image_to_data:
+            first = ocr_pipeline.ocr_images(uploads, cache=cache)
+            second = ocr_pipeline.ocr_images([encode(make_image(), compress_level=1)] + uploads, cache=cache)
+        self.assertEqual(image_to_data.call_count, 1)
+        self.assertEqual(cache.stats["file_hits"], 1) # The identical file was found without decoding it
+        self.assertEqual(cache.stats["hits"], 1) # The re-encoded one by its pixels
+        self.assertEqual(first[0]["numbers"], [17, 4])
+        self.assertFalse(first[0].get("cached", False))
+        self.assertEqual([result.get("cached") for result in second], [True, True, None])
+        self.assertEqual(second[0]["numbers"], [17, 4])
+        self.assertEqual(set(second[0]["timings"]), {"cache", "total"})
+        self.assertIn("error", second[2]) # Errors are not cached
+        self.assertEqual(len(cache), 1)
+
+    def test_pixel_lookup_happens_in_the_ocr_worker(self):
+        cache = OcrResultCache()
+        cache.store(cache.lookup(make_image(), ocr_pipeline._cache_context())[1], RESULT)
+        # Workers are separate processes without Tesseract mocks: a hit must skip OCR there,
+        # and the calling process must not decode the upload itself
+        with patch.object(ocr_pipeline, 'decode_image', side_effect=AssertionError("decoded in the caller")):
+            results = ocr_pipeline.ocr_images([encode(make_image(), compress_level=1)], cache=cache, in_worker_processes=True)
+        ocr_pipeline.shutdown_ocr_pool()
+        self.assertTrue(results[0]["cached"])
+        self.assertEqual(results[0]["numbers"], [17, 4])
+        self.assertEqual(cache.stats["hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
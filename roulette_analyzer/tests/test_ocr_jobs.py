@@ -0,0 +1,53 @@
+import unittest
+import threading
+
+from src.ocr_jobs import OcrJobManager, OcrQueueFull, JOB_SUCCEEDED, JOB_FAILED
+
+class TestOcrJobManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = OcrJobManager(max_workers=1, max_pending=2)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.manager.shutdown()
+
+    def blocking_ocr(self, images):
+        self.release.wait(5)
+        return {"numbers": [len(image) for image in images]}
+
+    def test_result_is_available_once_done(self):
+        job = self.manager.submit(["a.png"], [b"abc"], self.blocking_ocr)
+        self.assertIsNone(self.manager.get_job(job.job_id).to_dict()["result"])
+        self.release.set()
+        self.manager.shutdown()
+        status = self.manager.get_job(job.job_id).to_dict()
+        self.assertEqual(status["status"], JOB_SUCCEEDED)
+        self.assertEqual(status["result"], {"numbers": [3]})
+        self.assertEqual(self.manager.pending_count(), 0)
+
+    def test_rejects_uploads_beyond_max_pending(self):
+        self.manager.submit(["a.png"], [b"a"], self.blocking_ocr) # Running
+        self.manager.submit(["b.png"], [b"b"], self.blocking_ocr) # Queued
+        with self.assertRaises(OcrQueueFull):
+            self.manager.submit(["c.png"], [b"c"], self.blocking_ocr)
+        self.release.set()
+        self.manager.shutdown()
+        self.assertEqual(self.manager.pending_count(), 0)
+
+    def test_failed_job_reports_error(self):
+        def failing_ocr(images):
+            raise RuntimeError("engine crashed")
+        job = self.manager.submit(["a.png"], [b"a"], failing_ocr)
+        self.manager.shutdown()
+        status = job.to_dict()
+        self.assertEqual(status["status"], JOB_FAILED)
+        self.assertIn("engine crashed", status["message"])
+        self.assertIsNone(status["result"])
+
+    def test_unknown_job(self):
+        self.assertIsNone(self.manager.get_job("missing"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import io
+import os
+import signal
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src import ocr_backends
+from src import ocr_pipeline
+from src.ocr_pipeline import (
+    decode_image, otsu_threshold, preprocess_image, parse_numbers_from_ocr_text, ocr_image_bytes, ocr_images,
+    merge_batch_numbers, TESSERACT_CONFIG
+)
+
+def make_screenshot(size=(2400, 1200), image_format="PNG") -> bytes:
+    """A dark table with a light results strip of digits in the middle."""
+    image = Image.new("RGB", size, (20, 60, 20))
+    draw = ImageDraw.Draw(image)
+    draw.text((size[0] // 3, size[1] // 2), "17 4 32 0 21", fill=(250, 250, 250))
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+# pytesseract.image_to_data output for two lines of digits (plus Tesseract's non-word entries)
+TESSERACT_DATA = {
+    "text": ["", "17", "4", "32", "", "0", "21"],
+    "conf": [-1, 95, 90, 85, -1, 88, 92],
+    "block_num": [1, 1, 1, 1, 1, 1, 1],
+    "par_num": [1, 1, 1, 1, 1, 1, 1],
+    "line_num": [0, 1, 1, 1, 2, 2, 2],
+}
+
+@patch.object(ocr_backends, 'OCR_BACKEND', 'pytesseract') # The tests mock pytesseract, even where tesserocr is installed
+class TestOcrPipeline(unittest.TestCase):
+
+    def test_otsu_threshold_separates_two_levels(self):
+        gray = np.array([[30] * 10 + [200] * 5], dtype=np.uint8)
+        self.assertTrue(30 <= otsu_threshold(gray) < 200)
+        self.assertEqual(otsu_threshold(np.full((4, 4), 128, dtype=np.uint8)), 0) # No contrast at all
+
+    def test_preprocess_gives_cropped_black_on_white_digits(self):
+        image = preprocess_image(decode_image(make_screenshot()))
+        pixels = np.asarray(image)
+        self.assertEqual(image.mode, "L")
+        self.assertTrue(set(np.unique(pixels)) <= {0, 255})
+        self.assertGreater((pixels == 255).mean(), 0.5) # White background, dark digits
+        self.assertLess(image.width, 400) # Cropped to the strip of text
+        self.assertLess(image.height, 100)
+
+    def test_crop_box_and_downscale(self):
+        image = preprocess_image(decode_image(make_screenshot((4000, 2000))), max_side=1000, crop_box=(0, 0, 1, 0.5))
+        self.assertEqual(image.size, (1000, 250))
+
+    def test_jpeg_is_decoded_at_reduced_scale(self):
+        image = decode_image(make_screenshot((6400, 3200), "JPEG"), max_side=1600)
+        self.assertEqual(image.mode, "L")
+        self.assertLess(image.width, 6400)
+        self.assertGreaterEqual(image.width, 1600)
+
+    def test_parse_numbers(self):
+        self.assertEqual(parse_numbers_from_ocr_text("17 4\n32, 0;21 37 abc 99 5x"), [17, 4, 32, 0, 21, 5])
+        self.assertEqual(parse_numbers_from_ocr_text(""), [])
+
+    def test_ocr_image_bytes_runs_digits_only_single_block(self):
+        with patch.object(ocr_backends.pytesseract, 'image_to_data', return_value=TESSERACT_DATA) as image_to_data:
+            result = ocr_image_bytes(make_screenshot())
+        self.assertEqual(result["text"], "17 4 32\n0 21")
+        self.assertEqual(result["numbers"], [17, 4, 32, 0, 21])
+        self.assertEqual(result["confidence"], 90.0)
+        self.assertEqual(image_to_data.call_args.kwargs["config"], TESSERACT_CONFIG)
+        self.assertIn("--psm 6", TESSERACT_CONFIG)
+        self.assertEqual(set(result["timings"]), {"decode", "preprocess", "ocr", "parse", "total"})
+
+    def test_non_image_upload_raises(self):
+        with self.assertRaises(ocr_pipeline.UnidentifiedImageError):
+            ocr_image_bytes(b"not an image")
+
+@patch.object(ocr_backends, 'OCR_BACKEND', 'pytesseract')
+class TestBatchOcr(unittest.TestCase):
+
+    def tearDown(self):
+        ocr_pipeline.shutdown_ocr_pool()
+
+    def test_results_in_upload_order_with_per_image_errors(self):
+        with patch.object(ocr_pipeline, 'OCR_MAX_WORKERS', 1), \
+             patch.object(ocr_backends.pytesseract, 'image_to_data', return_value=TESSERACT_DATA):
+            results = ocr_images([make_screenshot(), b"not an image", make_screenshot()])
+        self.assertEqual([result.get("numbers") for result in results], [[17, 4, 32, 0, 21], None, [17, 4, 32, 0, 21]])
+        self.assertIn("could not be read", results[1]["error"])
+        self.assertEqual(merge_batch_numbers(results), [17, 4, 32, 0, 21]) # The second screenshot adds nothing new
+
+    def test_merge_drops_overlap_between_screenshots(self):
+        results = [{"numbers": [5, 17, 32, 0, 21]}, {"error": "could not be read"},
+                   {"numbers": [32, 0, 21, 4, 9]}, {"numbers": [4, 9, 4, 9]}]
+        self.assertEqual(merge_batch_numbers(results), [5, 17, 32, 0, 21, 4, 9, 4, 9, 4, 9]) # A 2-spin overlap is kept
+
+    def test_process_pool_keeps_upload_order(self):
+        # Workers are separate processes, so Tesseract is not mocked there; only the decode errors are predictable
+        with patch.object(ocr_pipeline, 'OCR_MAX_WORKERS', 2):
+            results = ocr_images([b"not an image", make_screenshot(), b"not an image either"])
+        self.assertEqual(len(results), 3)
+        self.assertIn("could not be read", results[0]["error"])
+        self.assertNotIn("could not be read", results[1].get("error") or "")
+        self.assertIn("could not be read", results[2]["error"])
+
+    def test_pool_is_replaced_after_a_worker_dies(self):
+        with patch.object(ocr_pipeline, 'OCR_MAX_WORKERS', 2):
+            ocr_images([b"not an image"] * 2) # Starts the workers
+            pool = ocr_pipeline._get_ocr_pool()
+            for process in list(pool._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+                process.join()
+            results = ocr_images([b"not an image", b"still not an image"])
+        self.assertIsNot(ocr_pipeline._get_ocr_pool(), pool)
+        self.assertTrue(all("could not be read" in result["error"] for result in results))
+
+    def test_tesseract_missing_is_reported_per_image(self):
+        with patch.object(ocr_backends.pytesseract, 'image_to_data', side_effect=ocr_pipeline.TesseractNotFoundError()):
+            results = ocr_images([make_screenshot()])
+        self.assertTrue(results[0]["tesseract_missing"])
+        self.assertEqual(merge_batch_numbers(results), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,16 @@
 import unittest
-from src.prediction_engine import generate_predictions
+import os
+import tempfile
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src import prediction_engine
+from src.batch_analysis import batch_analyze_histories
+from src.prediction_engine import generate_predictions, batch_generate_predictions
+from src.train_models import save_model
 
 class TestPredictionEngine(unittest.TestCase):
 
@@ -100,5 +111,87 @@ class TestPredictionEngine(unittest.TestCase):
         self.assertIn("No data provided for analysis", predictions["prediction_summary"][0])
 
 
+class TestModelCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.temp_dir.name, 'model.joblib')
+        prediction_engine.clear_model_cache()
+
+    def tearDown(self):
+        prediction_engine.clear_model_cache()
+        self.temp_dir.cleanup()
+
+    def test_hits_and_misses(self):
+        joblib.dump({"version": 1}, self.model_path)
+        first = prediction_engine.load_model(self.model_path)
+        self.assertIs(prediction_engine.load_model(self.model_path), first)
+        stats = prediction_engine.get_model_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["cached_models"]), (1, 1, 1))
+
+    def test_reloads_when_file_is_rewritten(self):
+        joblib.dump({"version": 1}, self.model_path)
+        prediction_engine.load_model(self.model_path)
+        save_model({"version": 2, "padding": "x"}, self.model_path)
+        self.assertEqual(prediction_engine.load_model(self.model_path)["version"], 2)
+        self.assertEqual(prediction_engine.get_model_cache_stats()["reloads"], 1)
+
+    def test_preload_skips_missing_files(self):
+        joblib.dump({"version": 1}, self.model_path)
+        missing_path = os.path.join(self.temp_dir.name, 'missing.joblib')
+        prediction_engine.preload_models([self.model_path, missing_path], background=False)
+        self.assertEqual(prediction_engine.get_model_cache_stats()["cached_models"], 1)
+
+    def test_missing_model_raises(self):
+        with self.assertRaises(OSError):
+            prediction_engine.load_model(os.path.join(self.temp_dir.name, 'missing.joblib'))
+
+
+class TestBatchPredictions(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        features = rng.integers(0, 37, size=(200, prediction_engine.FEATURE_WINDOW_SIZE))
+        self.dozen_model_path = os.path.join(self.temp_dir.name, 'dozen.joblib')
+        joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0).fit(features, rng.integers(0, 4, size=200)),
+                    self.dozen_model_path)
+        self.patches = [
+            patch.object(prediction_engine, 'DOZEN_MODEL_FILENAME', self.dozen_model_path),
+            patch.object(prediction_engine, 'COLUMN_MODEL_FILENAME', os.path.join(self.temp_dir.name, 'missing.joblib')),
+            patch.object(prediction_engine, 'SECTION_MODEL_FILENAME', os.path.join(self.temp_dir.name, 'missing.joblib')),
+            patch.object(prediction_engine, 'NUMBER_MODEL_FILENAME', os.path.join(self.temp_dir.name, 'missing.joblib')),
+        ]
+        for p in self.patches:
+            p.start()
+        prediction_engine.clear_model_cache()
+        self.histories = [rng.integers(0, 37, size=size).tolist() for size in (0, 3, 10, 60, 300)]
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        prediction_engine.clear_model_cache()
+        self.temp_dir.cleanup()
+
+    def test_matches_generate_predictions(self):
+        analyses = batch_analyze_histories(self.histories)
+        expected = [generate_predictions(a, h) for a, h in zip(analyses, self.histories)]
+        self.assertEqual(batch_generate_predictions(self.histories), expected)
+        self.assertEqual(batch_generate_predictions(self.histories, analyses), expected)
+
+    def test_model_loaded_once_for_all_histories(self):
+        batch_generate_predictions(self.histories)
+        stats = prediction_engine.get_model_cache_stats()
+        self.assertEqual((stats["misses"], stats["hits"]), (1, 0))
+
+    def test_probabilities(self):
+        predictions = batch_generate_predictions(self.histories, include_probabilities=True)
+        dozen_prediction = predictions[-1]["ml_based_predictions"][0]
+        self.assertAlmostEqual(sum(dozen_prediction["probabilities"].values()), 1.0, places=3)
+        self.assertEqual(max(dozen_prediction["probabilities"], key=dozen_prediction["probabilities"].get),
+                         dozen_prediction["prediction"])
+        self.assertNotIn("probabilities", predictions[1]["ml_based_predictions"][0]) # Too short to predict
+
+
 if __name__ == '__main__':
     unittest.main()
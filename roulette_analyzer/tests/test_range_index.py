@@ -0,0 +1,49 @@
+import unittest
+import random
+
+import numpy as np
+
+from src.analysis_engine import calculate_frequencies
+from src.range_index import SpinRangeIndex, recent_window_table
+
+class TestRangeIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.history = [rng.randint(0, 36) for _ in range(700)]
+
+    def test_range_counts_match_slices(self):
+        for block_size in (1, 7, 64):
+            index = SpinRangeIndex(self.history, block_size=block_size)
+            for start, stop in [(0, 700), (3, 4), (10, 650), (699, 700), (250, 250), (-50, None)]:
+                expected = np.bincount(self.history[start:stop], minlength=37)
+                self.assertTrue(np.array_equal(index.number_counts(start, stop), expected), (block_size, start, stop))
+
+    def test_frequencies_match_calculate_frequencies(self):
+        index = SpinRangeIndex(self.history, block_size=8)
+        self.assertEqual(index.frequencies(100, 333), calculate_frequencies(self.history[100:333]))
+        self.assertEqual(index.last(50), calculate_frequencies(self.history[-50:]))
+        self.assertEqual(index.frequencies(5, 5), calculate_frequencies([]))
+
+    def test_incremental_append(self):
+        index = SpinRangeIndex(block_size=5)
+        for i in range(0, len(self.history), 37):
+            index.append(self.history[i:i + 37])
+        self.assertEqual(index.total_spins, len(self.history))
+        self.assertEqual(index.frequencies(13, 601), calculate_frequencies(self.history[13:601]))
+
+    def test_window_table(self):
+        index = SpinRangeIndex(self.history)
+        table = index.window_table((50, 200, 1000))
+        self.assertEqual(table["labels"], ["Last 50", "Last 200", "All 700"])
+        red_row = table["rows"][0]
+        self.assertEqual(red_row["label"], "Red")
+        self.assertEqual(red_row["counts"][0], calculate_frequencies(self.history[-50:])["color_frequencies"].get("red", 0))
+
+    def test_recent_window_table_matches_index(self):
+        table = recent_window_table(self.history[-200:], calculate_frequencies(self.history), (50, 200, 1000))
+        self.assertEqual(table, SpinRangeIndex(self.history).window_table((50, 200, 1000)))
+
+
+if __name__ == '__main__':
+    unittest.main()
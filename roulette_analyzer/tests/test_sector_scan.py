@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from src.analysis_engine import WHEEL_ORDER
+from src.sector_scan import arc_sums, scan_wheel_sectors, number_counts_from_frequencies
+
+class TestSectorScan(unittest.TestCase):
+
+    def test_arc_sums_match_direct_sums(self):
+        counts = np.arange(37) % 7
+        sums = arc_sums(counts, [3, 8, 37])
+        for k, arc_size in enumerate([3, 8, 37]):
+            for start in range(37):
+                expected = sum(counts[WHEEL_ORDER[(start + j) % 37]] for j in range(arc_size))
+                self.assertEqual(sums[k, start], expected)
+
+    def test_hottest_sector_at_each_scale(self):
+        counts = np.ones(37, dtype=np.int64)
+        for num in WHEEL_ORDER[:5]: # 0, 32, 15, 19, 4
+            counts[num] = 10
+        scan = scan_wheel_sectors(counts)
+        self.assertEqual([s["arc_size"] for s in scan["scales"]], list(range(3, 38)))
+        size_5 = scan["scales"][2]
+        self.assertEqual(size_5["hottest"]["center_number"], 15)
+        self.assertEqual(size_5["hottest"]["observed_freq"], 50)
+        self.assertEqual(size_5["coldest"]["observed_freq"], 5)
+        # The whole-wheel arc always holds every spin
+        self.assertEqual(scan["scales"][-1]["hottest"]["observed_freq"], scan["total_spins"])
+
+    def test_counts_from_frequencies_accepts_str_keys(self):
+        counts = number_counts_from_frequencies({"number_frequencies": {"7": 3, 0: 1}})
+        self.assertEqual(counts[7], 3)
+        self.assertEqual(counts[0], 1)
+        self.assertEqual(counts.sum(), 4)
+
+    def test_empty_counts(self):
+        self.assertEqual(scan_wheel_sectors(np.zeros(37))["scales"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
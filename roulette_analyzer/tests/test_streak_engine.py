@@ -0,0 +1,50 @@
+import unittest
+import json
+import random
+
+from src.streak_engine import StreakState
+from src.analysis_engine import MIN_SPINS_FOR_PATTERNS
+
+class TestStreakEngine(unittest.TestCase):
+
+    def test_single_pass_streaks(self):
+        results = [1, 2, 2, 3, 4, 4, 4, 5, 6, 7, 7, 8, 9, 10, 10, 10, 10, 11]
+        patterns = StreakState(results).to_patterns()
+        self.assertEqual(patterns["number_repeats"]["total_immediate_repeats"], 7)
+        self.assertEqual(patterns["number_repeats"]["longest_streak"], 4)
+        self.assertEqual(patterns["number_repeats"]["number_for_longest_streak"], 10)
+        self.assertEqual(dict(patterns["number_repeats"]["counts"]), {2: 1, 4: 2, 7: 1, 10: 3})
+        self.assertEqual(patterns["consecutive_dozen_streak"], {"longest_streak": 18, "dozen": 1})
+
+    def test_zero_breaks_dozen_and_color_streaks(self):
+        results = [0, 1, 13, 2, 14, 3, 15, 0, 1, 2, 3]
+        patterns = StreakState(results).to_patterns()
+        self.assertEqual(patterns["consecutive_dozen_streak"], {"longest_streak": 3, "dozen": 1})
+        self.assertEqual(patterns["consecutive_column_streak"]["longest_streak"], 2)
+        self.assertNotIn("counts", patterns["number_repeats"])
+
+    def test_chunked_updates_match_single_pass(self):
+        rng = random.Random(11)
+        results = [rng.choice([0, 1, 2, 3, 13, 14, 26]) for _ in range(300)]
+        streaks = StreakState()
+        i = 0
+        while i < len(results):
+            size = rng.randint(1, 9)
+            streaks.update(results[i:i + size])
+            # Round-trip through JSON as app.py does with the session
+            streaks = StreakState.from_state(json.loads(json.dumps(streaks.to_state())))
+            i += size
+        self.assertEqual(streaks.to_patterns(), StreakState(results).to_patterns())
+
+    def test_alternating_streak_continues_across_chunks(self):
+        streaks = StreakState([1, 2, 3]) # R, B, R
+        streaks.update([4, 5, 6]) # B, R, B
+        self.assertEqual(streaks.to_patterns()["alternating_color_streak"], 6)
+
+    def test_insufficient_data(self):
+        patterns = StreakState([1] * (MIN_SPINS_FOR_PATTERNS - 1)).to_patterns()
+        self.assertTrue(patterns["message"].startswith("Insufficient data"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+
+from src import database_manager
+from src import train_models
+
+class TestIncrementalTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.temp_dir.name, 'dozen.joblib')
+        self.patches = [
+            patch.object(database_manager, 'DATABASE_NAME', os.path.join(self.temp_dir.name, 'test_roulette.db')),
+            patch.object(train_models, 'MODEL_DIR', self.temp_dir.name),
+            patch.object(train_models, 'MODEL_FILENAME_DOZEN', self.model_path),
+        ]
+        for p in self.patches:
+            p.start()
+        database_manager.init_db()
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        database_manager.close_connection()
+        for p in self.patches:
+            p.stop()
+        self.temp_dir.cleanup()
+
+    def add_spins(self, count):
+        database_manager.add_multiple_spin_results(self.rng.integers(0, 37, size=count).tolist())
+
+    def test_full_refit_records_metadata(self):
+        self.add_spins(400)
+        self.assertTrue(train_models.train_predict_next_dozen_model())
+        metadata = joblib.load(self.model_path).training_metadata_
+        self.assertEqual(metadata["last_spin_id"], 400)
+        self.assertEqual(metadata["spins_seen"], 400)
+        self.assertEqual(metadata["updates_since_full_refit"], 0)
+
+    def test_incremental_update_grows_forest_with_new_spins_only(self):
+        self.add_spins(400)
+        train_models.train_predict_next_dozen_model()
+        self.add_spins(200)
+        with patch.object(database_manager, 'load_spins_array', wraps=database_manager.load_spins_array) as loader:
+            self.assertTrue(train_models.train_predict_next_dozen_model(incremental=True))
+        loader.assert_called_once_with(after_id=400) # Only the new spins are read, into the feature store
+        model = joblib.load(self.model_path)
+        self.assertEqual(len(model.estimators_), train_models.N_ESTIMATORS + train_models.TREES_PER_UPDATE)
+        metadata = model.training_metadata_
+        self.assertEqual((metadata["last_spin_id"], metadata["spins_seen"], metadata["updates_since_full_refit"]), (600, 600, 1))
+        self.assertEqual(model.predict(np.zeros((1, train_models.FEATURE_WINDOW_SIZE), dtype=np.uint8)).shape, (1,))
+
+    def test_few_new_spins_leave_model_unchanged(self):
+        self.add_spins(400)
+        train_models.train_predict_next_dozen_model()
+        self.add_spins(10)
+        self.assertTrue(train_models.train_predict_next_dozen_model(incremental=True))
+        self.assertEqual(joblib.load(self.model_path).training_metadata_["last_spin_id"], 400)
+
+    def test_refit_policy_forces_full_refit(self):
+        self.add_spins(400)
+        train_models.train_predict_next_dozen_model()
+        model = joblib.load(self.model_path)
+        model.training_metadata_["updates_since_full_refit"] = train_models.MAX_INCREMENTAL_UPDATES
+        joblib.dump(model, self.model_path)
+        self.add_spins(200)
+        self.assertTrue(train_models.train_predict_next_dozen_model(incremental=True))
+        model = joblib.load(self.model_path)
+        self.assertEqual(len(model.estimators_), train_models.N_ESTIMATORS)
+        self.assertEqual(model.training_metadata_["spins_seen"], 600)
+
+    def test_deleted_spins_force_full_refit(self):
+        self.add_spins(400)
+        train_models.train_predict_next_dozen_model()
+        database_manager.clear_all_spins_from_db()
+        self.add_spins(600)
+        self.assertTrue(train_models.train_predict_next_dozen_model(incremental=True))
+        model = joblib.load(self.model_path)
+        self.assertEqual(len(model.estimators_), train_models.N_ESTIMATORS)
+        self.assertEqual((model.training_metadata_["last_spin_id"], model.training_metadata_["spins_seen"]), (1000, 600))
+
+    def test_incremental_without_model_trains_from_scratch(self):
+        self.add_spins(400)
+        self.assertTrue(train_models.train_predict_next_dozen_model(incremental=True))
+        self.assertEqual(joblib.load(self.model_path).training_metadata_["updates_since_full_refit"], 0)
+
+class TestTrainAllModels(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_paths = {name: os.path.join(self.temp_dir.name, f'{name}.joblib')
+                            for name in ('dozen', 'column', 'section', 'number')}
+        self.patches = [
+            patch.object(database_manager, 'DATABASE_NAME', os.path.join(self.temp_dir.name, 'test_roulette.db')),
+            patch.object(train_models, 'MODEL_DIR', self.temp_dir.name),
+            patch.object(train_models, 'MODEL_FILENAME_DOZEN', self.model_paths['dozen']),
+            patch.object(train_models, 'MODEL_FILENAME_COLUMN', self.model_paths['column']),
+            patch.object(train_models, 'MODEL_FILENAME_SECTION', self.model_paths['section']),
+            patch.object(train_models, 'MODEL_FILENAME_NUMBER', self.model_paths['number']),
+        ]
+        for p in self.patches:
+            p.start()
+        database_manager.init_db()
+        database_manager.add_multiple_spin_results(np.random.default_rng(1).integers(0, 37, size=1500).tolist())
+
+    def tearDown(self):
+        database_manager.close_connection()
+        for p in self.patches:
+            p.stop()
+        self.temp_dir.cleanup()
+
+    def test_section_labels_follow_wheel_sections(self):
+        from src.analysis_engine import WHEEL_SECTIONS
+        self.assertEqual(train_models.SECTION_BY_NUMBER[0], 0)
+        for k, name in enumerate(train_models.SECTION_NAMES):
+            for number in WHEEL_SECTIONS[name]:
+                if number:
+                    self.assertEqual(train_models.SECTION_BY_NUMBER[number], k + 1)
+
+    def check_models(self):
+        expected_classes = {'dozen': [0, 1, 2, 3], 'column': [0, 1, 2, 3], 'section': [0, 1, 2, 3], 'number': list(range(37))}
+        for name, path in self.model_paths.items():
+            model = joblib.load(path)
+            self.assertEqual(model.classes_.tolist(), expected_classes[name])
+            self.assertEqual(model.training_metadata_["last_spin_id"], 1500)
+
+    def test_trains_every_target_in_process(self):
+        results = train_models.train_all_models(max_workers=1)
+        self.assertEqual(results, {'dozen': True, 'column': True, 'section': True, 'number': True})
+        self.check_models()
+
+    def test_trains_every_target_in_process_pool(self):
+        results = train_models.train_all_models(max_workers=2)
+        self.assertTrue(all(results.values()))
+        self.check_models()
+
+    def test_matches_single_target_training(self):
+        train_models.train_all_models(targets=['dozen'], max_workers=1)
+        batch_model = joblib.load(self.model_paths['dozen'])
+        train_models.train_predict_next_dozen_model()
+        single_model = joblib.load(self.model_paths['dozen'])
+        probe = np.random.default_rng(2).integers(0, 37, size=(50, train_models.FEATURE_WINDOW_SIZE))
+        self.assertTrue(np.array_equal(batch_model.predict_proba(probe), single_model.predict_proba(probe)))
+
+
+if __name__ == '__main__':
+    unittest.main()
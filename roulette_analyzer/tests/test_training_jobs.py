@@ -0,0 +1,85 @@
+import unittest
+import threading
+
+from src.training_jobs import (
+    TrainingJobManager, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED, FINISHED_STATUSES
+)
+
+class TestTrainingJobManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = TrainingJobManager()
+        self.release = threading.Event()
+        self.entered = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.manager.shutdown()
+
+    def blocking_training(self, progress=None):
+        progress("training", samples=123)
+        self.entered.set()
+        self.release.wait(5)
+        progress("saving")
+        return True
+
+    def wait_for(self, job):
+        for _ in range(500):
+            if job.status in FINISHED_STATUSES:
+                return
+            threading.Event().wait(0.01)
+        self.fail("Training job did not finish.")
+
+    def test_progress_and_success(self):
+        job, started = self.manager.submit("dozen", self.blocking_training)
+        self.assertTrue(started)
+        self.entered.wait(5)
+        status = job.to_dict()
+        self.assertEqual((status["status"], status["stage"], status["samples_processed"]), ("running", "training", 123))
+        self.release.set()
+        self.wait_for(job)
+        self.assertEqual(job.status, JOB_SUCCEEDED)
+        self.assertIs(self.manager.get_job(job.job_id), job)
+
+    def test_one_job_per_model(self):
+        job, _ = self.manager.submit("dozen", self.blocking_training)
+        same_job, started = self.manager.submit("dozen", self.blocking_training)
+        self.assertFalse(started)
+        self.assertIs(same_job, job)
+        self.release.set()
+        self.wait_for(job)
+        _, started = self.manager.submit("dozen", lambda progress=None: True)
+        self.assertTrue(started)
+
+    def test_cancel_takes_effect_at_next_stage(self):
+        job, _ = self.manager.submit("dozen", self.blocking_training)
+        self.entered.wait(5)
+        self.assertTrue(self.manager.cancel(job.job_id))
+        self.release.set()
+        self.wait_for(job)
+        self.assertEqual(job.status, JOB_CANCELLED)
+        self.assertFalse(self.manager.cancel(job.job_id))
+
+    def test_failures_are_reported(self):
+        def broken_training(progress=None):
+            raise RuntimeError("boom")
+        job, _ = self.manager.submit("dozen", broken_training)
+        self.wait_for(job)
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertIn("boom", job.message)
+        job, _ = self.manager.submit("column", lambda progress=None: False)
+        self.wait_for(job)
+        self.assertEqual(job.status, JOB_FAILED)
+
+    def test_per_model_results(self):
+        job, _ = self.manager.submit("all", lambda progress=None: {"dozen": True, "column": False, "number": False})
+        self.wait_for(job)
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertIn("column, number", job.message)
+        self.assertEqual(job.to_dict()["model_results"], {"dozen": True, "column": False, "number": False})
+        job, _ = self.manager.submit("all", lambda progress=None: {"dozen": True, "column": True})
+        self.wait_for(job)
+        self.assertEqual(job.status, JOB_SUCCEEDED)
+
+if __name__ == '__main__':
+    unittest.main()